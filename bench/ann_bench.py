@@ -0,0 +1,76 @@
+# spellbook/bench/ann_bench.py
+# Compare IVF-flat recall@k and latency against exact cosine search.
+
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mnemos"))
+from ann_index import ExactIndex, IVFFlatIndex
+
+def clustered_vectors(n, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+def run(index, queries, k, **kwargs):
+    results, times = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append([n for n, _ in index.search(q, k, **kwargs)])
+        times.append(time.perf_counter() - t0)
+    return results, times
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN vs exact search benchmark")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = clustered_vectors(args.nodes, args.dim, max(8, args.nodes // 500), rng)
+    queries = data[rng.choice(args.nodes, args.queries, replace=False)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = ExactIndex(os.path.join(tmp, "exact"))
+        ivf = IVFFlatIndex(os.path.join(tmp, "ivf"), min_train=args.nodes + 1)
+        t0 = time.perf_counter()
+        for i, vec in enumerate(data):
+            exact.add(i, vec)
+        exact_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i, vec in enumerate(data):
+            ivf.add(i, vec)
+        ivf.train()
+        ivf_build = time.perf_counter() - t0
+
+        truth, times = run(exact, queries, args.k)
+        report = {
+            "nodes": args.nodes, "dim": args.dim, "k": args.k,
+            "nlist": len(ivf.centroids),
+            "exact": {"build_s": round(exact_build, 2), **percentiles(times)},
+            "ivf": {"build_s": round(ivf_build, 2), "runs": []},
+        }
+        for nprobe in args.nprobe:
+            found, times = run(ivf, queries, args.k, nprobe=nprobe)
+            recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+            report["ivf"]["runs"].append({"nprobe": nprobe, f"recall@{args.k}": round(float(recall), 4),
+                                          **percentiles(times)})
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
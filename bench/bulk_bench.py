@@ -0,0 +1,73 @@
+# spellbook/bench/bulk_bench.py
+# Insert throughput over HTTP: one POST /node + /link per item vs POST /bulk.
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+
+def start_server(port):
+    """uvicorn in a scratch directory laid out like the repo (work/ next to db/)."""
+    tmp = tempfile.mkdtemp()
+    os.makedirs(os.path.join(tmp, "db"))
+    os.makedirs(os.path.join(tmp, "work"))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([os.path.join(ROOT, "mnemos"), ROOT]),
+           "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench")}
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+                             "--log-level", "warning"], cwd=os.path.join(tmp, "work"), env=env)
+    return proc
+
+def wait_ready(client, proc):
+    for _ in range(100):
+        try:
+            client.session.get(f"{client.BASE}/graph", params={"limit": 1}).raise_for_status()
+            return
+        except Exception:
+            if proc.poll() is not None:
+                raise RuntimeError("server exited")
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk insert benchmark")
+    parser.add_argument("--single", type=int, default=1000, help="items sent one request each")
+    parser.add_argument("--bulk", type=int, default=50_000, help="nodes (and as many edges) sent via /bulk")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    os.environ["MNEMOS_API"] = f"http://localhost:{args.port}"
+    sys.path.insert(0, ROOT)
+    import orin_client as client
+
+    proc = start_server(args.port)
+    try:
+        wait_ready(client, proc)
+        report = {}
+
+        t0 = time.perf_counter()
+        for i in range(args.single // 2):
+            client.remember(f"single {i}", "concept", {"i": i})
+        for i in range(args.single // 2):
+            client.link(f"single {i}", f"single {(i + 1) % (args.single // 2)}", "related_to")
+        report["single_items_per_s"] = round(args.single / (time.perf_counter() - t0))
+
+        t0 = time.perf_counter()
+        client.remember_many(((f"bulk {i}", "concept", {"i": i}) for i in range(args.bulk)), args.batch)
+        client.link_many(((f"bulk {i}", f"bulk {(i * 7) % args.bulk}", "related_to")
+                          for i in range(args.bulk)), args.batch)
+        report["bulk_items_per_s"] = round(2 * args.bulk / (time.perf_counter() - t0))
+        report["batch"] = args.batch
+        print(json.dumps(report, indent=2))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# spellbook/bench/context_bench.py
+# Prompt size and build time of /api/query context: every edge of every hit
+# (the old formatter) vs the token-budgeted builder, cold and cached.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from graph_store import CompactGraph
+from keyword_index import KeywordIndex
+from context_builder import ContextBuilder, estimate_tokens
+
+TYPES = ["concept", "technology", "project", "task", "person"]
+
+def synthetic_graph(conversations, entities, links, seed=0):
+    """Conversation hubs, each with `links` contains_entity edges into a shared entity pool."""
+    rng = random.Random(seed)
+    G = CompactGraph()
+    words = [f"w{i}" for i in range(2000)]
+    for i in range(entities):
+        G.add_node(f"{rng.choice(words)} {rng.choice(words)} {i}", type=rng.choice(TYPES),
+                   meta={"desc": " ".join(rng.choices(words, k=8))})
+    pool = list(G.nodes)
+    for c in range(conversations):
+        title = f"Conversation {c} about {rng.choice(words)}"
+        G.add_node(title, type="conversation", meta={"source": "ChatGPT", "date": "2024-01-01"})
+        for target in rng.sample(pool, links):
+            G.add_edge(title, target, relation="contains_entity")
+    return G
+
+def legacy_context(nodes, graph):
+    """The formatter /api/query used before: every in- and out-edge of every hit."""
+    parts = []
+    for node in nodes:
+        entry = f"Node: {node['label']} (Type: {node['type']})\n"
+        if node.get("meta"):
+            entry += "Metadata:\n" + "\n".join(f"- {k}: {v}" for k, v in node["meta"].items()) + "\n"
+        connections = []
+        for u, v, data in graph.out_edges(node["id"], data=True):
+            connections.append(f"- Related to {v} ({graph.nodes[v].get('type', 'unknown')}) via {data.get('relation', 'link')}")
+        for u, v, data in graph.in_edges(node["id"], data=True):
+            connections.append(f"- {u} ({graph.nodes[u].get('type', 'unknown')}) is related via {data.get('relation', 'link')}")
+        if connections:
+            entry += "Connections:\n" + "\n".join(connections) + "\n"
+        parts.append(entry)
+    return "\n\n".join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Query context benchmark")
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--entities", type=int, default=20000)
+    parser.add_argument("--links", type=int, default=300, help="contains_entity edges per conversation")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--hits", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--prefill-tps", type=float, default=2000,
+                        help="assumed prompt tokens/s before the first answer token")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    G = synthetic_graph(args.conversations, args.entities, args.links)
+    keywords = KeywordIndex()
+    keywords.rebuild(G)
+    hubs = [n for n in G.nodes if G.nodes[n].get("type") == "conversation"]
+    queries = []
+    for _ in range(args.queries):
+        picked = rng.sample(hubs, args.hits)
+        nodes = [{"id": n, "label": n, **G.nodes[n].copy()} for n in picked]
+        queries.append((" ".join(picked[0].split()[-2:]), nodes))
+
+    report = {"nodes": len(G), "edges": G.number_of_edges(), "hits_per_query": args.hits}
+    t0 = time.perf_counter()
+    legacy = [estimate_tokens(legacy_context(nodes, G)) for _, nodes in queries]
+    report["legacy"] = {"mean_tokens": round(sum(legacy) / len(legacy)),
+                        "build_ms": round((time.perf_counter() - t0) / len(queries) * 1000, 2)}
+
+    builder = ContextBuilder(budget=args.budget)
+    for label in ("cold", "cached"):
+        t0 = time.perf_counter()
+        tokens = [builder.build(G, nodes, query, keywords.idf)[1]["tokens"] for query, nodes in queries]
+        report[f"budgeted_{label}"] = {"mean_tokens": round(sum(tokens) / len(tokens)),
+                                       "build_ms": round((time.perf_counter() - t0) / len(queries) * 1000, 2)}
+    report["summary_cache"] = builder.stats()
+    for key in ("legacy", "budgeted_cached"):
+        report[key]["est_prefill_s"] = round(report[key]["mean_tokens"] / args.prefill_tps, 2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# spellbook/bench/dedupe_bench.py
+# Entity resolution cost: a full pass over a synthetic graph seeded with
+# label variants, then incremental resolution of newly inserted nodes.
+# Precision and recall are measured against the planted variants: a merge is
+# correct when it joins a variant with the label it was made from.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from graph_store import CompactGraph
+from meta_sorter import EntityResolver, resolve_entities
+
+VARIANTS = [lambda s: s.lower() + ".js", lambda s: s + "s", lambda s: s.upper(), lambda s: s.replace(" ", "-")]
+
+def synthetic_labels(count, seed=0):
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+             for _ in range(max(100, count // 20))]
+    labels = set()
+    while len(labels) < count:
+        labels.add(" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 3))).title())
+    return sorted(labels)
+
+def score(merges, origin, planted):
+    """(precision, recall): merged nodes that joined their own origin, and
+    planted (variant, label) pairs that ended up in one merge group."""
+    group = {}
+    merged = correct = 0
+    for i, m in enumerate(merges):
+        group[m["survivor"]] = i
+        for d in m["merged"]:
+            group[d] = i
+            merged += 1
+            correct += origin.get(d, d) == origin.get(m["survivor"], m["survivor"])
+    found = sum(1 for v, label in planted if v in group and group[v] == group.get(label))
+    return (round(correct / merged, 3) if merged else 1.0,
+            round(found / len(planted), 3) if planted else 1.0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Entity resolution benchmark")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--variants", type=float, default=0.1, help="fraction of nodes given a variant")
+    parser.add_argument("--incremental", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    labels = synthetic_labels(args.nodes + args.incremental)
+    base, fresh = labels[:args.nodes], labels[args.nodes:]
+    G = CompactGraph()
+    for label in base:
+        G.add_node(label, type="concept", meta={"source": "bench"})
+    origin, planted = {}, []   # variant -> the label it was made from
+    for label in rng.sample(base, int(args.nodes * args.variants)):
+        variant = rng.choice(VARIANTS)(label)
+        if variant not in G:
+            G.add_node(variant, type="concept", meta={"variant": True})
+            G.add_edge(variant, label, relation="related_to")
+            origin[variant] = label
+            planted.append((variant, label))
+    report = {"nodes": len(G), "planted_variants": len(planted)}
+
+    t0 = time.perf_counter()
+    resolver = EntityResolver().rebuild(G)
+    report["index_s"] = round(time.perf_counter() - t0, 2)
+    t0 = time.perf_counter()
+    merges = resolve_entities(G, resolver)
+    report["full_pass_s"] = round(time.perf_counter() - t0, 2)
+    report["merged"] = sum(len(m["merged"]) for m in merges)
+    report["precision"], report["recall"] = score(merges, origin, planted)
+    report["naive_pairs"] = report["nodes"] * (report["nodes"] - 1) // 2
+
+    resolver.rebuild(G)
+    new, planted = [], []
+    for label in fresh:
+        source = rng.choice(base)
+        variant = rng.choice(VARIANTS)(source)
+        for node in (label, variant):
+            if node not in G:
+                G.add_node(node, type="concept", meta={"source": "bench"})
+                new.append(node)
+        if variant in new and source in G:  # not merged away in the full pass
+            origin[variant] = origin.get(source, source)
+            planted.append((variant, source))
+    t0 = time.perf_counter()
+    for node in new:
+        resolver.add(node, G.nodes[node])
+    merges = resolve_entities(G, resolver, nodes=new)
+    elapsed = time.perf_counter() - t0
+    report["incremental_nodes"] = len(new)
+    report["incremental_merged"] = sum(len(m["merged"]) for m in merges)
+    report["incremental_precision"], report["incremental_recall"] = score(merges, origin, planted)
+    report["incremental_us_per_node"] = round(elapsed / max(1, len(new)) * 1e6, 1)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
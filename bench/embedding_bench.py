@@ -0,0 +1,104 @@
+# spellbook/bench/embedding_bench.py
+# Backfill time for a fresh graph's embeddings: one text per call (the old
+# get_embedding) vs the batched, deduplicated, concurrent EmbeddingService.
+# The remote backend is simulated: fixed latency per request plus a small
+# cost per text, so no network or API key is needed.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from graph_store import CompactGraph
+from embedding_index import EmbeddingIndex, node_text
+from embeddings import EmbeddingService, HashingBackend
+from ann_index import IVFFlatIndex
+
+class SimulatedRemote:
+    """Stands in for an embeddings API: `latency` s per request, `per_text` s
+    per input, a request failing now and then, vectors from a hashing model."""
+
+    def __init__(self, latency=0.3, per_text=0.0005, failure_rate=0.01, dim=256, seed=0):
+        self.latency = latency
+        self.per_text = per_text
+        self.failure_rate = failure_rate
+        self.model = HashingBackend(dim)
+        self.rng = random.Random(seed)
+        self.name = "simulated"
+
+    def embed(self, texts):
+        time.sleep(self.latency + self.per_text * len(texts))
+        if self.rng.random() < self.failure_rate:
+            raise ConnectionError("simulated outage")
+        return self.model.embed(texts)
+
+def synthetic_graph(nodes, duplicate_rate, seed=0):
+    """Nodes with short labels and meta; `duplicate_rate` of them share text
+    with an earlier node (same label/type/meta under another id)."""
+    rng = random.Random(seed)
+    G = CompactGraph()
+    texts = []
+    for i in range(nodes):
+        if texts and rng.random() < duplicate_rate:
+            label, type_, meta = rng.choice(texts)
+        else:
+            label = f"topic {rng.randrange(10**6)} {rng.choice(['python', 'rust', 'graph', 'memory'])}"
+            type_ = rng.choice(["concept", "technology", "project"])
+            meta = {"desc": " ".join(rng.choices(["fast", "async", "index", "cache", "embed"], k=6))}
+            texts.append((label, type_, meta))
+        G.add_node(f"n{i}", label=label, type=type_, meta=meta)
+    return G
+
+def backfill(G, service, tmp, name):
+    path = os.path.join(tmp, name)
+    index = EmbeddingIndex(service, path=path, ann=IVFFlatIndex(path + ".ann"))
+    index.sync(G)
+    t0 = time.perf_counter()
+    embedded = index.backfill()
+    seconds = time.perf_counter() - t0
+    return {"embedded": embedded, "missing": index.stats()["missing"], "seconds": round(seconds, 2),
+            "nodes_per_s": round(embedded / seconds), **{k: v for k, v in service.stats().items()
+                                                          if k in ("requests", "deduplicated", "cached", "retries", "failed")}}
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backfill benchmark")
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of nodes repeating another's text")
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per API request")
+    parser.add_argument("--per-text", type=float, default=0.0005)
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--sample", type=int, default=20, help="single-text calls timed to extrapolate the old path")
+    args = parser.parse_args()
+
+    G = synthetic_graph(args.nodes, args.duplicates)
+    remote = lambda: SimulatedRemote(args.latency, args.per_text, args.failure_rate)
+    report = {"nodes": args.nodes, "unique_texts": len({node_text(n, G.nodes[n]) for n in G.nodes})}
+
+    # Old path: one request per node, sequential; timed on a sample
+    one = remote()
+    t0 = time.perf_counter()
+    for n in list(G.nodes)[:args.sample]:
+        try:
+            one.embed([node_text(n, G.nodes[n])])
+        except ConnectionError:
+            pass
+    per_node = (time.perf_counter() - t0) / args.sample
+    report["single_estimated_s"] = round(per_node * args.nodes)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report["batched_remote"] = backfill(G, EmbeddingService(
+            remote(), batch_size=args.batch, concurrency=args.concurrency, backoff=0.05), tmp, "remote")
+        report["local_hashing"] = backfill(G, EmbeddingService(
+            HashingBackend(), batch_size=args.batch, concurrency=1), tmp, "local")
+    report["speedup"] = round(report["single_estimated_s"] / report["batched_remote"]["seconds"], 1)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
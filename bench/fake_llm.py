@@ -0,0 +1,139 @@
+# spellbook/bench/fake_llm.py
+# Deterministic offline stand-ins for the OpenAI chat and embeddings APIs.
+#
+# FakeLLM is a plain complete(system, content) function for the import
+# pipeline. OfflineOpenAI / OfflineAsyncOpenAI mimic the client objects
+# mnemos talks to (chat.completions.create with or without streaming,
+# embeddings.create, with_options), so whole request paths run without a
+# network or API key.
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mnemos"))
+from embeddings import HashingBackend
+
+WORD = re.compile(r"[A-Z][a-zA-Z]{3,}")
+
+class FakeLLM:
+    """Answers entity-extraction prompts after a simulated network latency.
+
+    Capitalised words in the user message become entities, so the same
+    input always yields the same output. `failure_rate` injects transient
+    errors to exercise retry paths.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.2, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def complete(self, system, content, model="gpt-4"):
+        self.calls += 1
+        time.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+        if self.rng.random() < self.failure_rate:
+            raise RuntimeError("fake rate limit")
+        return respond(system, content)
+
+def respond(system, content):
+    """Entities for an extraction prompt, else a short answer quoting the context."""
+    if "entity extraction" in system:
+        labels = sorted(set(WORD.findall(content)))[:5]
+        return json.dumps([{"label": l, "type": "concept", "meta": {"source": "fake"}} for l in labels])
+    context = [line.strip() for line in system.splitlines() if line.startswith("Node:")][:3]
+    return f"From your memory ({len(context)} nodes): " + "; ".join(context)
+
+def _usage(messages, answer):
+    prompt = sum(len(m["content"]) for m in messages) // 4
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=len(answer) // 4,
+                           total_tokens=prompt + len(answer) // 4)
+
+def _completion(messages, answer):
+    message = SimpleNamespace(role="assistant", content=answer)
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+                           usage=_usage(messages, answer))
+
+def _chunks(messages, answer, include_usage):
+    for word in re.findall(r"\S+\s*", answer):
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=word))], usage=None)
+    if include_usage:
+        yield SimpleNamespace(choices=[], usage=_usage(messages, answer))
+
+def _answer(messages):
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    return respond(system, messages[-1]["content"])
+
+class _Embeddings:
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, input, model=None, **_):
+        self.client.wait()
+        texts = [input] if isinstance(input, str) else input
+        vectors = self.client.backend.embed(texts)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=v.tolist()) for i, v in enumerate(vectors)])
+
+class OfflineOpenAI:
+    """Synchronous client: answers after `latency` s (plus per-embedding-call latency)."""
+
+    def __init__(self, latency=0.0, embed_latency=0.0, dim=256):
+        self.latency = latency
+        self.embed_latency = embed_latency
+        self.backend = HashingBackend(dim)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.embeddings = _Embeddings(self)
+
+    def with_options(self, **_):
+        return self
+
+    def wait(self):
+        self.calls += 1
+        if self.embed_latency:
+            time.sleep(self.embed_latency)
+
+    def _create(self, model, messages, stream=False, stream_options=None, **_):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        answer = _answer(messages)
+        if stream:
+            return _chunks(messages, answer, bool((stream_options or {}).get("include_usage")))
+        return _completion(messages, answer)
+
+class _AsyncStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+class OfflineAsyncOpenAI(OfflineOpenAI):
+    """The async client: same answers, awaited; streamed word by word."""
+
+    def __init__(self, latency=0.0, dim=256):
+        super().__init__(latency, dim=dim)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._acreate))
+
+    async def _acreate(self, model, messages, stream=False, stream_options=None, **_):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        answer = _answer(messages)
+        if stream:
+            return _AsyncStream(_chunks(messages, answer, bool((stream_options or {}).get("include_usage"))))
+        return _completion(messages, answer)
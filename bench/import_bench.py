@@ -0,0 +1,78 @@
+# spellbook/bench/import_bench.py
+# Time main.process_conversations against a fake LLM, sequential vs pipelined.
+
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from fake_llm import FakeLLM
+
+TOPICS = ["React", "Postgres", "Kubernetes", "Python", "Rust", "GraphQL", "Redis", "Docker",
+          "Terraform", "Kafka", "NumPy", "FastAPI", "Vite", "Spark", "Airflow", "Elastic"]
+
+def synthetic_conversations(count, messages, seed=0):
+    rng = random.Random(seed)
+    convos = []
+    for c in range(count):
+        mapping = {}
+        for m in range(messages * 2):
+            role = "user" if m % 2 == 0 else "assistant"
+            words = " ".join(rng.choice(TOPICS) for _ in range(rng.randint(2, 6)))
+            mapping[f"{c}-{m}"] = {
+                "create_time": f"2024-03-{1 + c % 28:02d}T10:{m % 60:02d}:00",
+                "message": {"author": {"role": role}, "content": {"parts": [f"How do I use {words} together?"]}},
+            }
+        convos.append({"title": f"Conversation {c}", "mapping": mapping})
+    return convos
+
+def run(main, convos, llm, concurrency, batch_chars, warm=False):
+    if not warm:
+        main.llm_cache.clear()
+    main.G.clear()
+    main.EXTRACT_CONCURRENCY = concurrency
+    main.EXTRACT_BATCH_CHARS = batch_chars
+    main.LLM_RPS = 1e6
+    t0 = time.perf_counter()
+    status = asyncio.run(main.process_conversations(convos, llm=llm.complete))
+    elapsed = time.perf_counter() - t0
+    return {"concurrency": concurrency, "batch_chars": batch_chars, "warm_cache": warm,
+            "seconds": round(elapsed, 2),
+            "llm_calls": status.llm_calls, "nodes": status.created_nodes, "links": status.created_links,
+            "errors": status.errors, "conversations_per_s": round(len(convos) / elapsed, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Import pipeline benchmark")
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    # main.py resolves its save path relative to the working directory
+    tmp = tempfile.mkdtemp()
+    os.makedirs(os.path.join(tmp, "db"))
+    os.makedirs(os.path.join(tmp, "work"))
+    os.chdir(os.path.join(tmp, "work"))
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+    import main as mnemos_main
+
+    convos = synthetic_conversations(args.conversations, args.messages)
+    results = [
+        run(mnemos_main, convos, FakeLLM(args.latency, jitter=0), 1, 0),
+        run(mnemos_main, convos, FakeLLM(args.latency, jitter=0), args.concurrency, 0),
+        run(mnemos_main, convos, FakeLLM(args.latency, jitter=0), args.concurrency, args.batch_chars),
+        run(mnemos_main, convos, FakeLLM(args.latency, jitter=0), args.concurrency, args.batch_chars, warm=True),
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
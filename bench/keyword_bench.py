@@ -0,0 +1,80 @@
+# spellbook/bench/keyword_bench.py
+# Compare the BM25 inverted index against the old per-query substring scan.
+
+import os
+import sys
+import time
+import json
+import random
+import itertools
+import argparse
+import networkx as nx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mnemos"))
+from keyword_index import KeywordIndex
+
+TYPES = ["concept", "project", "task", "technology", "idea", "person"]
+
+def synthetic_graph(n, vocab_size, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    # Zipf-like word frequencies, like real labels
+    weights = list(itertools.accumulate(1 / (i + 1) for i in range(vocab_size)))
+    g = nx.DiGraph()
+    for i in range(n):
+        words = rng.choices(vocab, cum_weights=weights, k=rng.randint(2, 5))
+        g.add_node(f"node {i} " + " ".join(words), type=rng.choice(TYPES),
+                   meta={"desc": " ".join(rng.choices(vocab, cum_weights=weights, k=6))})
+    return g, vocab, weights
+
+def linear_scan(graph, query, max_results=5):
+    """The substring scan main.search_graph used before the index."""
+    terms = query.lower().split()
+    nodes = [{"id": n, **graph.nodes[n]} for n in graph.nodes]
+    scored = []
+    for node in nodes:
+        blob = f"{node['id']} {node['type']} " + " ".join(
+            f"{k} {v}" for k, v in node.get("meta", {}).items()
+        )
+        score = sum(1 for t in terms if t in blob.lower())
+        scored.append((node, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [n for n, s in scored[:max_results] if s > 0]
+
+def timed(fn, queries):
+    times = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        times.append(time.perf_counter() - t0)
+    ms = np.array(times) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 4),
+            "p99_ms": round(float(np.percentile(ms, 99)), 4)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword search benchmark")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--vocab", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    g, vocab, weights = synthetic_graph(args.nodes, args.vocab)
+    rng = random.Random(1)
+    queries = [" ".join(rng.choices(vocab, cum_weights=weights, k=rng.randint(1, 3))) for _ in range(args.queries)]
+
+    index = KeywordIndex()
+    t0 = time.perf_counter()
+    index.rebuild(g)
+    build = time.perf_counter() - t0
+
+    report = {
+        "nodes": args.nodes,
+        "index": {"build_s": round(build, 2), **timed(lambda q: index.search(q, 5), queries)},
+        "scan": timed(lambda q: linear_scan(g, q, 5), queries[:args.scan_queries]),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
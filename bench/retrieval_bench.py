@@ -0,0 +1,137 @@
+# spellbook/bench/retrieval_bench.py
+# Recall@k and latency of each retrieval channel alone and fused, on a
+# synthetic graph with two kinds of question:
+#   lookup      a node's own label with a typo          -> that node
+#   relational  the labels of two things a project uses -> the project
+# A local hashed character-trigram embedding stands in for the API model.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import zlib
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from graph_store import CompactGraph
+from keyword_index import KeywordIndex
+from embedding_index import EmbeddingIndex
+from ann_index import ExactIndex
+from retrieval import HybridRetriever
+
+DIM = 256
+METHODS = {
+    "bm25": ("bm25",),
+    "vector": ("vector",),
+    "bm25+vector": ("bm25", "vector"),
+    "hybrid": ("bm25", "vector", "graph"),
+}
+
+def hashed_embedding(text, dim=DIM):
+    """Bag of hashed character trigrams per word, L2-normalized."""
+    vec = np.zeros(dim, dtype=np.float32)
+    for word in text.lower().split():
+        word = f"#{word}#"
+        for i in range(len(word) - 2):
+            vec[zlib.crc32(word[i:i + 3].encode()) % dim] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+def synthetic_graph(entities, projects, conversations, seed=0):
+    """Entities with two-word labels; projects using 2-4 entities; conversation
+    hubs mentioning many entities (noise for the graph channel)."""
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ter", "van", "zu", "rex", "ni", "por", "qua", "sel", "tim"]
+    word = lambda: "".join(rng.choices(syllables, k=4))
+    G = CompactGraph()
+    for i in range(entities):
+        G.add_node(f"{word()} {word()}", type=rng.choice(["technology", "concept"]),
+                   meta={"desc": f"{word()} {word()}"})
+    pool = list(G.nodes)
+    uses = {}
+    for p in range(projects):
+        label = f"project {word()} {p}"
+        G.add_node(label, type="project")
+        uses[label] = rng.sample(pool, rng.randint(2, 4))
+        for target in uses[label]:
+            G.add_edge(label, target, relation="uses")
+    for c in range(conversations):
+        label = f"conversation {c}"
+        G.add_node(label, type="conversation")
+        for target in rng.sample(pool, 50):
+            G.add_edge(label, target, relation="contains_entity")
+    return G, pool, uses
+
+def typo(text, rng):
+    words = text.split()
+    i = rng.randrange(len(words))
+    w = words[i]
+    j = rng.randrange(1, len(w) - 1)
+    words[i] = w[:j] + w[j + 1:]
+    return " ".join(words)
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval recall and latency")
+    parser.add_argument("--entities", type=int, default=20000)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--graph-weight", type=float, nargs="+", default=[1.0, 1.5, 2.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed + 1)
+    G, pool, uses = synthetic_graph(args.entities, args.projects, args.conversations, args.seed)
+    queries = []
+    for target in rng.sample(pool, args.queries):
+        queries.append(("lookup", typo(target, rng), target))
+    for project in rng.sample(list(uses), args.queries):
+        a, b = rng.sample(uses[project], 2)
+        queries.append(("relational", f"{a} {b}", project))
+
+    report = {"nodes": len(G), "edges": G.number_of_edges(), "k": args.k}
+    with tempfile.TemporaryDirectory() as tmp:
+        keywords = KeywordIndex()
+        embeddings = EmbeddingIndex(hashed_embedding, path=os.path.join(tmp, "emb"),
+                                    ann=ExactIndex(os.path.join(tmp, "emb.ann")))
+        t0 = time.perf_counter()
+        keywords.rebuild(G)
+        embeddings.sync(G)
+        embeddings.flush()
+        report["index_s"] = round(time.perf_counter() - t0, 2)
+
+        methods = [(name, channels, 1.0) for name, channels in METHODS.items() if "graph" not in channels]
+        methods += [(f"hybrid(graph={w:g})", METHODS["hybrid"], w) for w in args.graph_weight]
+        for name, channels, weight in methods:
+            retriever = HybridRetriever(keywords, embeddings, hashed_embedding, weights={"graph": weight},
+                                        size=len(queries))
+            found = {"lookup": [], "relational": []}
+            cold = []
+            for kind, query, target in queries:
+                t0 = time.perf_counter()
+                hits = retriever.search(G, query, args.k, channels)
+                cold.append(time.perf_counter() - t0)
+                found[kind].append(target in {n for n, _, _ in hits})
+            cached = []
+            for _, query, _ in queries:
+                t0 = time.perf_counter()
+                retriever.search(G, query, args.k, channels)
+                cached.append(time.perf_counter() - t0)
+            report[name] = {
+                **{f"recall_{kind}": round(sum(v) / len(v), 3) for kind, v in found.items()},
+                "cold": percentiles(cold), "cached": percentiles(cached),
+            }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
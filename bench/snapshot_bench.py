@@ -0,0 +1,93 @@
+# spellbook/bench/snapshot_bench.py
+# Cold-load time, RSS and neighbour lookups: JSON save file vs binary snapshot.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+import networkx as nx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+
+TYPES = ["concept", "project", "task", "technology", "idea"]
+
+def synthetic_graph(n, seed=0):
+    """Conversations linked to entities, with a few heavy hub conversations."""
+    rng = random.Random(seed)
+    g = nx.DiGraph()
+    conversations = max(1, n // 10)
+    for c in range(conversations):
+        g.add_node(f"Conversation {c}", type="conversation",
+                   meta={"source": "ChatGPT", "date": f"2024-{1 + c % 12:02d}-{1 + c % 28:02d}"})
+    for e in range(n - conversations):
+        label = f"Entity {e}"
+        g.add_node(label, type=rng.choice(TYPES), meta={"desc": f"synthetic entity {e}"})
+        for _ in range(rng.randint(1, 3)):
+            c = int(conversations * rng.paretovariate(1.2)) % conversations
+            g.add_edge(f"Conversation {c}", label, relation="contains_entity")
+    return g
+
+def rss_mb():
+    """Current resident set size, falling back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def measure(mode, path, nodes):
+    """Run in a fresh interpreter so the RSS delta reflects a single load."""
+    from storage import load_graph
+    from snapshot import SnapshotGraph
+    base = rss_mb()
+    t0 = time.perf_counter()
+    if mode == "json":
+        graph = load_graph(path, wal_path=path + ".none")
+        lookup = lambda n: list(graph.successors(n))
+    elif mode == "binary":
+        graph = load_graph(path, wal_path=path + ".none")
+        lookup = lambda n: list(graph.successors(n))
+    else:
+        graph = SnapshotGraph(path)
+        lookup = graph.successors
+    load_s = time.perf_counter() - t0
+    lookups = min(1000, max(1, int(nodes) // 10))  # synthetic_graph makes n // 10 conversations
+    t0 = time.perf_counter()
+    for c in range(lookups):
+        lookup(f"Conversation {c}")
+    lookup_us = (time.perf_counter() - t0) / lookups * 1e6
+    print(json.dumps({"mode": mode, "load_s": round(load_s, 3), "lookup_us": round(lookup_us, 1),
+                      "rss_delta_mb": round(rss_mb() - base, 1)}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot load benchmark")
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--measure", nargs=3, metavar=("MODE", "PATH", "NODES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(*args.measure)
+
+    from snapshot import write_snapshot
+    tmp = tempfile.mkdtemp()
+    json_path, bin_path = os.path.join(tmp, "g.json"), os.path.join(tmp, "g.mnem")
+    g = synthetic_graph(args.nodes)
+    with open(json_path, "w") as f:
+        json.dump(nx.node_link_data(g), f, indent=2)
+    write_snapshot(g, bin_path)
+    report = {"nodes": g.number_of_nodes(), "edges": g.number_of_edges(),
+              "json_mb": round(os.path.getsize(json_path) / 2**20, 1),
+              "binary_mb": round(os.path.getsize(bin_path) / 2**20, 1), "runs": []}
+    for mode, path in [("json", json_path), ("binary", bin_path), ("mmap", bin_path)]:
+        out = subprocess.run([sys.executable, __file__, "--measure", mode, path, str(args.nodes)],
+                             capture_output=True, text=True, check=True, cwd=HERE)
+        report["runs"].append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
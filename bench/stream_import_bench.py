@@ -0,0 +1,71 @@
+# spellbook/bench/stream_import_bench.py
+# Peak memory of reading a conversations.json export: json.load vs the
+# incremental parser, at several export sizes.
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from import_bench import synthetic_conversations
+
+def write_export(path, count, messages):
+    """Write an export conversation by conversation, without holding it all."""
+    with open(path, "w") as f:
+        f.write("[")
+        for start in range(0, count, 100):
+            batch = synthetic_conversations(min(100, count - start), messages, seed=start)
+            for i, convo in enumerate(batch):
+                convo["id"] = f"conv-{start + i}"
+                f.write(("," if start + i else "") + json.dumps(convo))
+        f.write("]")
+
+def measure(mode, path):
+    """Run in a fresh interpreter so ru_maxrss reflects this parse alone."""
+    from export_stream import iter_conversations, iter_file_chunks
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    messages = 0
+    if mode == "json.load":
+        with open(path) as f:
+            for convo in json.load(f):
+                messages += len(convo["mapping"])
+    else:
+        for convo in iter_conversations(iter_file_chunks(path)):
+            messages += len(convo["mapping"])
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "seconds": round(time.perf_counter() - t0, 2),
+                      "messages": messages, "peak_rss_delta_mb": round((peak - base) / 1024, 1)}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming export parser benchmark")
+    parser.add_argument("--conversations", type=int, nargs="+", default=[2000, 8000])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        return measure(*args.measure)
+
+    tmp = tempfile.mkdtemp()
+    report = []
+    for count in args.conversations:
+        path = os.path.join(tmp, f"export-{count}.json")
+        write_export(path, count, args.messages)
+        row = {"conversations": count, "export_mb": round(os.path.getsize(path) / 2**20, 1), "runs": []}
+        for mode in ("json.load", "stream"):
+            out = subprocess.run([sys.executable, __file__, "--measure", mode, path],
+                                 capture_output=True, text=True, check=True)
+            row["runs"].append(json.loads(out.stdout.strip().splitlines()[-1]))
+        report.append(row)
+        os.remove(path)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# spellbook/bench/suite.py
+# Reproducible benchmark suite over the main subsystems, on seeded synthetic
+# graphs and exports (synthetic.py) with the OpenAI APIs stubbed offline
+# (fake_llm.py):
+#
+#   graph    building a memory graph (CompactGraph inserts)
+#   storage  save_graph / load_graph, JSON and binary snapshot
+#   search   memory_engine.search_graph: index build, cold and cached queries
+#   layout   get_layout_view, radial and force
+#   hygiene  sort_for_commit over the whole graph
+#   filter   attribute index build and structured graph queries (graph_query)
+#   import   process_conversations over a conversations.json export
+#   query    POST /api/query and /api/query/stream end to end
+#
+# Each subsystem runs at each size in a fresh interpreter, so its peak RSS is
+# its own. Results are one JSON document (--out); --compare OLD NEW reports
+# metrics that moved by more than --threshold between two runs. Metric names
+# carry their direction: *_per_s higher is better; *_s, *_ms, *_mb lower.
+#
+#   python bench/suite.py --sizes 1000 10000 100000 --out results.json
+#   python bench/suite.py --only search layout --sizes 1000000
+#   python bench/suite.py --compare baseline.json results.json
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import shutil
+import resource
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from synthetic import memory_graph, queries, write_export
+from fake_llm import FakeLLM, OfflineOpenAI, OfflineAsyncOpenAI
+
+SUBSYSTEMS = ["graph", "storage", "search", "layout", "hygiene", "filter", "import", "query"]
+UNSIZED = ("import",)  # sized by --conversations instead
+
+# ------------------
+# Measuring
+# ------------------
+def percentiles(samples):
+    ms = sorted(s * 1000 for s in samples)
+    pick = lambda q: round(ms[min(len(ms) - 1, int(q * len(ms)))], 3)
+    return {"p50_ms": pick(0.5), "p90_ms": pick(0.9), "p99_ms": pick(0.99),
+            "mean_ms": round(sum(ms) / len(ms), 3), "per_s": round(len(ms) / (sum(ms) / 1000), 1)}
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def stage_totals(prefix=""):
+    """Seconds per stage recorded by mnemos' own instrumentation."""
+    from metrics import STAGE_SECONDS
+    return {key[0]: round(entry[1], 3) for key, entry in STAGE_SECONDS.values.items()
+            if key[0].startswith(prefix)}
+
+def offline_embeddings(args):
+    """Point mnemos' embedding service at the offline API stub."""
+    import memory_engine
+    from embeddings import OpenAIBackend
+    memory_engine.embedder.backend = OpenAIBackend(OfflineOpenAI(embed_latency=args.embed_latency), "offline")
+    return memory_engine
+
+setup = {}  # resident memory once inputs are built, before the measured work
+
+def graph_for(size, args):
+    G = memory_graph(size, args.seed)
+    setup["rss_setup_mb"] = rss_mb()
+    return G
+
+# ------------------
+# Subsystems
+# ------------------
+def bench_graph(size, args):
+    G, seconds = timed(memory_graph, size, args.seed)
+    return {"nodes": len(G), "edges": G.number_of_edges(), "build_s": round(seconds, 3),
+            "nodes_per_s": round(len(G) / seconds)}
+
+def bench_storage(size, args):
+    from storage import save_graph, load_graph
+    from snapshot import SnapshotGraph
+    G = graph_for(size, args)
+    out = {}
+    for fmt, path in (("json", "../db/bench.json"), ("binary", "../db/bench.mnem")):
+        _, save_s = timed(save_graph, G, path)
+        loaded, load_s = timed(load_graph, path, "../db/none.wal")
+        assert len(loaded) == len(G)
+        out[fmt] = {"save_s": round(save_s, 3), "load_s": round(load_s, 3),
+                    "load_nodes_per_s": round(len(G) / load_s), "file_mb": round(os.path.getsize(path) / 2**20, 2)}
+        del loaded
+    out["binary"]["mmap_open_s"] = round(timed(SnapshotGraph, "../db/bench.mnem")[1], 4)
+    return out
+
+def bench_search(size, args):
+    memory_engine = offline_embeddings(args)
+    G = graph_for(size, args)
+    t0 = time.perf_counter()
+    memory_engine.keyword_index.rebuild(G)
+    memory_engine.embedding_index.sync(G)
+    memory_engine.embedding_index.backfill()
+    index_s = time.perf_counter() - t0
+    qs = queries(G, args.queries, args.seed)
+    cold = [timed(memory_engine.search_graph, q, G, 5)[1] for q in qs]
+    cached = [timed(memory_engine.search_graph, q, G, 5)[1] for q in qs]
+    return {"index_s": round(index_s, 3), "index_nodes_per_s": round(len(G) / index_s),
+            "cold": percentiles(cold), "cached": percentiles(cached), "stages_s": stage_totals()}
+
+def bench_layout(size, args):
+    from graph_layout import get_layout_view
+    G = graph_for(size, args)
+    rng = random.Random(args.seed)
+    hubs = sorted((n for n in G.nodes if n.startswith("Conversation ")), key=G.degree, reverse=True)[:5]
+    seeds = hubs + rng.sample(list(G.nodes), min(len(G), max(5, args.queries // 10)))
+    out = {}
+    for layout in ("radial", "force"):
+        out[layout] = percentiles([timed(get_layout_view, G, s, 2, layout, 500)[1] for s in seeds])
+    return out
+
+def bench_hygiene(size, args):
+    from meta_sorter import sort_for_commit
+    G = graph_for(size, args)
+    ops = []
+    report, seconds = timed(sort_for_commit, G, ops)
+    return {"run_s": round(seconds, 3), "nodes_per_s": round(size / seconds), "ops": len(ops),
+            "merges": len(report.get("merges", []))}
+
+def bench_filter(size, args):
+    from attr_index import AttributeIndex
+    from graph_query import run_query
+    G = graph_for(size, args)
+    index = AttributeIndex()
+    _, index_s = timed(index.rebuild, G)
+    rng = random.Random(args.seed)
+    def month():
+        m = f"2024-{rng.randint(1, 12):02d}"
+        return {"since": m, "until": m}
+    shapes = {
+        # high-priority tasks from one month's conversations
+        "chain": lambda: {"match": {"type": "conversation", "range": {"date": month()}},
+                          "traverse": [{"relation": "contains_entity",
+                                        "match": {"type": "task", "meta": {"priority": "high"}}}]},
+        "range": lambda: {"match": {"type": "idea", "range": {"date": {"since": month()["since"]}}}},
+        "two_hop": lambda: {"match": {"type": "task", "meta": {"priority": rng.choice(["low", "high"])},
+                                      "range": {"date": month()}},
+                            "traverse": [{"relation": "part_of"}, {"relation": "uses", "match": {"type": "technology"}}]},
+    }
+    out = {"index_s": round(index_s, 3), "index_nodes_per_s": round(len(G) / index_s)}
+    run_query(G, index, shapes["chain"]())  # builds the CSR, as loading a saved graph does
+    for name, shape in shapes.items():
+        out[name] = percentiles([timed(run_query, G, index, shape())[1] for _ in range(args.queries)])
+    scan = lambda: [n for n, d in G.nodes(data=True) if d.get("type") == "task" and d["meta"].get("priority") == "high"]
+    out["scan_baseline_ms"] = round(timed(scan)[1] * 1000, 3)
+    return out
+
+def bench_import(_, args):
+    offline_embeddings(args)
+    import main
+    from export_stream import iter_conversations, iter_file_chunks
+    export_mb = write_export("../db/export.json", args.conversations, args.messages, args.seed) / 2**20
+    setup["rss_setup_mb"] = rss_mb()
+    main.LLM_RPS = 1e6
+    llm = FakeLLM(latency=args.llm_latency, jitter=0, seed=args.seed)
+    convos = iter_conversations(iter_file_chunks("../db/export.json"))
+    status, seconds = timed(asyncio.run, main.process_conversations(convos, llm=llm.complete))
+    return {"conversations": args.conversations, "export_mb": round(export_mb, 2), "run_s": round(seconds, 3),
+            "conversations_per_s": round(args.conversations / seconds, 2), "llm_calls": status.llm_calls,
+            "nodes": status.created_nodes, "links": status.created_links, "errors": status.errors,
+            "stages_s": stage_totals("import_")}
+
+def bench_query(size, args):
+    offline_embeddings(args)
+    import main
+    from fastapi.testclient import TestClient
+    main.openai_client = OfflineOpenAI(args.llm_latency)
+    main.async_openai_client = OfflineAsyncOpenAI(args.llm_latency)
+    main.G = graph_for(size, args)
+    main.index_graph(main.G)
+    main.embedding_index.backfill()
+    client = TestClient(main.app)  # no startup hooks: no background workers
+    qs = queries(main.G, args.queries, args.seed)
+    answer, first_token = [], []
+    for q in qs:
+        t0 = time.perf_counter()
+        r = client.post("/api/query", json={"query": q})
+        answer.append(time.perf_counter() - t0)
+        assert "answer" in r.json(), r.text
+    for q in qs[: max(1, len(qs) // 4)]:
+        done = client.post("/api/query/stream", json={"query": q + " ?"}).text.rsplit("data: ", 1)[-1]
+        first_token.append(json.loads(done)["first_token_s"])
+    return {"query": percentiles(answer), "stream_first_token": percentiles(first_token),
+            "stages_s": stage_totals()}
+
+BENCHES = {"graph": bench_graph, "storage": bench_storage, "search": bench_search, "layout": bench_layout,
+           "hygiene": bench_hygiene, "filter": bench_filter, "import": bench_import, "query": bench_query}
+
+def worker(name, size, args):
+    """One subsystem at one size, inside a scratch ../db; prints one JSON line."""
+    root = tempfile.mkdtemp(prefix="mnemos-bench-")
+    os.makedirs(os.path.join(root, "db"))
+    os.makedirs(os.path.join(root, "work"))
+    os.chdir(os.path.join(root, "work"))  # mnemos resolves ../db from the working directory
+    os.environ.update({"OPENAI_API_KEY": "offline", "MNEMOS_HYGIENE_INTERVAL": "0", "MNEMOS_EMBED_INTERVAL": "0"})
+    try:
+        result = BENCHES[name](size, args)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print(json.dumps({"subsystem": name, "size": size, "metrics": result,
+                      "rss_setup_mb": setup.get("rss_setup_mb"), "peak_rss_mb": peak_rss_mb()}))
+
+# ------------------
+# Comparing
+# ------------------
+def flatten(metrics, prefix=""):
+    for k, v in metrics.items():
+        if isinstance(v, dict):
+            yield from flatten(v, f"{prefix}{k}.")
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            yield prefix + k, v
+
+def direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if neither."""
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.endswith("per_s"):
+        return 1
+    if leaf.endswith(("_s", "_ms", "_mb")):
+        return -1
+    return 0
+
+def compare(old_path, new_path, threshold):
+    load = lambda p: {(r["subsystem"], r["size"]): r for r in json.load(open(p))["results"] if "metrics" in r}
+    old, new = load(old_path), load(new_path)
+    changes = []
+    for key in sorted(set(old) & set(new), key=str):
+        before = dict(flatten({**old[key]["metrics"], "peak_rss_mb": old[key]["peak_rss_mb"]}))
+        for metric, value in flatten({**new[key]["metrics"], "peak_rss_mb": new[key]["peak_rss_mb"]}):
+            sign = direction(metric)
+            if not sign or not before.get(metric):
+                continue
+            ratio = value / before[metric]
+            if abs(ratio - 1) > threshold:
+                better = (ratio > 1) == (sign > 0)
+                changes.append({"subsystem": key[0], "size": key[1], "metric": metric, "before": before[metric],
+                                "after": value, "ratio": round(ratio, 3),
+                                "change": "improvement" if better else "regression"})
+    return {"threshold": threshold, "regressions": [c for c in changes if c["change"] == "regression"],
+            "improvements": [c for c in changes if c["change"] == "improvement"],
+            "missing": sorted(map(str, set(old) ^ set(new)))}
+
+# ------------------
+# Main
+# ------------------
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="mnemos benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=SUBSYSTEMS, default=SUBSYSTEMS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=10, help="typical messages per conversation")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per fake chat call")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="seconds per fake embeddings call")
+    parser.add_argument("--out", help="write results here as well as to stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change reported by --compare")
+    parser.add_argument("--worker", nargs=2, metavar=("SUBSYSTEM", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        report = compare(*args.compare, args.threshold)
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if report["regressions"] else 0)
+    if args.worker:
+        return worker(args.worker[0], int(args.worker[1]), args)
+
+    passthrough = [f"--seed={args.seed}", f"--queries={args.queries}", f"--conversations={args.conversations}",
+                   f"--messages={args.messages}", f"--llm-latency={args.llm_latency}",
+                   f"--embed-latency={args.embed_latency}"]
+    report = {"meta": {"started": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "git": git_revision(),
+                       "python": platform.python_version(), "platform": platform.platform(),
+                       "cpus": os.cpu_count(), "args": {k: v for k, v in vars(args).items() if k != "worker"}},
+              "results": []}
+    for name in args.only:
+        for size in ([0] if name in UNSIZED else args.sizes):
+            t0 = time.perf_counter()
+            run = subprocess.run([sys.executable, __file__, "--worker", name, str(size), *passthrough],
+                                 capture_output=True, text=True)
+            if run.returncode:
+                result = {"subsystem": name, "size": size, "error": run.stderr.strip().splitlines()[-1:]}
+            else:
+                result = json.loads(run.stdout.strip().splitlines()[-1])
+            result["wall_s"] = round(time.perf_counter() - t0, 2)
+            report["results"].append(result)
+            print(json.dumps(result), file=sys.stderr)  # progress
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
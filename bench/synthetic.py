@@ -0,0 +1,126 @@
+# spellbook/bench/synthetic.py
+# Seeded generators for benchmarks: memory graphs shaped like an imported
+# ChatGPT history, the conversations.json exports they come from, and
+# queries against them. The same seed always gives the same output.
+#
+# Graphs have conversation hubs whose contains_entity out-degree follows a
+# power law (a few conversations mention thousands of entities, most a
+# handful), typed entities with meta dicts, and sparse entity-to-entity
+# relations (a project uses technologies, a task is part of a project).
+
+import os
+import sys
+import json
+import random
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mnemos"))
+from graph_store import CompactGraph
+
+TYPES = ["concept", "technology", "project", "task", "idea", "person"]
+TYPE_WEIGHTS = [30, 25, 15, 15, 10, 5]
+SYLLABLES = ["ka", "lo", "mi", "ter", "van", "zu", "rex", "ni", "por", "qua", "sel", "tim", "dra", "on", "bel", "syn"]
+WORDS = ["pipeline", "cache", "index", "service", "model", "schema", "deploy", "query", "budget", "review",
+         "migration", "sync", "graph", "worker", "plan", "notes", "api", "release", "search", "memory"]
+RELATIONS = {"project": ("uses", "technology"), "task": ("part_of", "project"), "idea": ("related_to", "concept")}
+HUB_ALPHA = 1.2   # Pareto shape of conversation popularity; lower is more skewed
+CONVERSATION_SHARE = 0.1
+
+def _word(rng):
+    return "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize()
+
+def _date(rng):
+    return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+def entity(rng, i):
+    """(label, type, meta) of the i-th synthetic entity."""
+    kind = rng.choices(TYPES, TYPE_WEIGHTS)[0]
+    label = f"{_word(rng)} {rng.choice(WORDS)}" if kind != "person" else f"{_word(rng)} {_word(rng)}"
+    meta = {"desc": " ".join(rng.choices(WORDS, k=rng.randint(3, 8))), "date": _date(rng), "source": "ChatGPT"}
+    if kind == "task":
+        meta["priority"] = rng.choice(["low", "medium", "high"])
+    return f"{label} {i}", kind, meta
+
+def hub(rng, conversations):
+    """A conversation index drawn so that popularity follows a power law."""
+    return int((rng.paretovariate(HUB_ALPHA) - 1) * conversations / 20) % conversations
+
+def memory_graph(nodes, seed=0):
+    """A CompactGraph of `nodes` nodes: conversations plus the entities they contain."""
+    rng = random.Random(seed)
+    G = CompactGraph()
+    conversations = max(1, int(nodes * CONVERSATION_SHARE))
+    for c in range(conversations):
+        G.add_node(f"Conversation {c}", type="conversation",
+                   meta={"source": "ChatGPT", "date": _date(rng), "messages": rng.randint(2, 80)})
+    by_type = {t: [] for t in TYPES}
+    for i in range(nodes - conversations):
+        label, kind, meta = entity(rng, i)
+        G.add_node(label, type=kind, meta=meta)
+        by_type[kind].append(label)
+        for _ in range(rng.randint(1, 3)):
+            G.add_edge(f"Conversation {hub(rng, conversations)}", label, relation="contains_entity")
+        relation = RELATIONS.get(kind)
+        if relation and by_type[relation[1]] and rng.random() < 0.6:
+            for target in rng.sample(by_type[relation[1]], min(len(by_type[relation[1]]), rng.randint(1, 3))):
+                G.add_edge(label, target, relation=relation[0])
+    return G
+
+def queries(graph, count, seed=0):
+    """Query strings against a graph: an entity's label, a word of it, or two labels."""
+    rng = random.Random(seed + 1)
+    labels = [n for n in graph.nodes if not n.startswith("Conversation ")]
+    out = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(rng.choice(labels))
+        elif kind < 0.7:
+            out.append(rng.choice(labels).split()[0])
+        else:
+            out.append(f"how do {rng.choice(labels)} and {rng.choice(labels)} relate")
+    return out
+
+# ------------------
+# ChatGPT exports
+# ------------------
+def conversations(count, messages=10, seed=0):
+    """Conversations in the conversations.json export layout, one at a time.
+
+    Messages alternate user and assistant turns and name a few recurring
+    capitalised entities, so extraction finds both new and repeated ones.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"{_word(rng)}{rng.choice(WORDS).capitalize()}" for _ in range(max(50, count * 2))]
+    created = 1.7e9
+    for c in range(count):
+        created += rng.uniform(60, 86400)
+        mapping = {"root": {"id": "root", "message": None, "parent": None, "children": []}}
+        parent = "root"
+        t = created
+        for m in range(rng.randint(max(1, messages // 2), messages * 2)):
+            mid = f"c{c}-m{m}"
+            role = "user" if m % 2 == 0 else "assistant"
+            t += rng.uniform(5, 300)
+            names = rng.choices(vocabulary, k=rng.randint(1, 4))
+            text = f"{'How should' if role == 'user' else 'You can'} {' and '.join(names)} " \
+                   f"{' '.join(rng.choices(WORDS, k=rng.randint(5, 40)))}."
+            mapping[mid] = {
+                "id": mid,
+                "message": {"id": mid, "author": {"role": role}, "create_time": t,
+                            "content": {"content_type": "text", "parts": [text]}},
+                "parent": parent, "children": [],
+            }
+            mapping[parent]["children"].append(mid)
+            parent = mid
+        yield {"id": f"conv-{seed}-{c}", "title": f"Conversation about {names[0]}", "create_time": created,
+               "update_time": t, "mapping": mapping, "current_node": parent}
+
+def write_export(path, count, messages=10, seed=0):
+    """Write an export without holding it in memory; returns its size in bytes."""
+    with open(path, "w") as f:
+        f.write("[")
+        for i, convo in enumerate(conversations(count, messages, seed)):
+            f.write(("," if i else "") + json.dumps(convo))
+        f.write("]")
+    return os.path.getsize(path)
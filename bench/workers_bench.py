@@ -0,0 +1,113 @@
+# spellbook/bench/workers_bench.py
+# Read throughput of the API with 1..N uvicorn workers over a shared graph
+# store (MNEMOS_SHARED=1), plus cross-worker read-your-writes: each write is
+# followed at once by a read on a fresh connection, which may land on any
+# worker. Reads scale with the worker count only as far as there are cores.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MNEMOS = os.path.join(HERE, "..", "mnemos")
+
+def start_server(workers, port, root):
+    work = os.path.join(root, "work")
+    os.makedirs(work, exist_ok=True)
+    os.makedirs(os.path.join(root, "db"), exist_ok=True)
+    env = {**os.environ, "PYTHONPATH": os.path.abspath(MNEMOS), "MNEMOS_SHARED": "1" if workers > 1 else "0",
+           "MNEMOS_EMBED_BACKEND": "hashing", "MNEMOS_HYGIENE_INTERVAL": "0", "MNEMOS_EMBED_INTERVAL": "0",
+           "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "offline")}
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+                             "--workers", str(workers), "--log-level", "warning"], cwd=work, env=env)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            httpx.get(base + "/graph/changes?since=0", timeout=1)
+            return proc, base
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+def seed(base, nodes, seed=0):
+    rng = random.Random(seed)
+    items = [{"label": f"node {i}", "type": rng.choice(["concept", "technology"])} for i in range(nodes)]
+    items += [{"source": f"node {i}", "target": f"node {rng.randrange(nodes)}", "relation": "related"}
+              for i in range(nodes)]
+    httpx.post(base + "/bulk", json=items, timeout=120).raise_for_status()
+
+def read_throughput(base, clients, seconds, nodes):
+    stop = time.monotonic() + seconds
+    counts = [0] * clients
+    def run(i):
+        rng = random.Random(i)
+        with httpx.Client(base_url=base, timeout=30) as c:
+            while time.monotonic() < stop:
+                if rng.random() < 0.5:
+                    c.get("/graph", params={"limit": 100, "cursor": rng.randrange(nodes)}).raise_for_status()
+                else:
+                    c.get(f"/neighbors/node {rng.randrange(nodes)}").raise_for_status()
+                counts[i] += 1
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return round(sum(counts) / seconds)
+
+def read_your_writes(base, writes):
+    misses = 0
+    started = time.perf_counter()
+    for i in range(writes):
+        label = f"written {i}"
+        with httpx.Client(base_url=base) as c:
+            c.post("/node", json={"label": label, "type": "probe"}).raise_for_status()
+        with httpx.Client(base_url=base) as c:  # new connection: possibly another worker
+            misses += c.get(f"/neighbors/{label}").status_code != 200
+    return {"writes": writes, "misses": misses,
+            "ms_per_write_and_read": round((time.perf_counter() - started) * 1000 / writes, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker read throughput and consistency")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    report = {"cpus": os.cpu_count(), "nodes": args.nodes, "clients": args.clients}
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as root:
+            # seeded by a single worker, then served by `workers`
+            proc, base = start_server(1, args.port, root)
+            try:
+                seed(base, args.nodes)
+                httpx.post(base + "/save", timeout=120).raise_for_status()
+            finally:
+                proc.terminate()
+                proc.wait()
+            proc, base = start_server(workers, args.port, root)
+            try:
+                if workers == 1:
+                    httpx.get(base + "/load", timeout=120).raise_for_status()  # shared workers load at startup
+                report[f"workers={workers}"] = {
+                    "reads_per_s": read_throughput(base, args.clients, args.seconds, args.nodes),
+                    "read_your_writes": read_your_writes(base, args.writes),
+                }
+            finally:
+                proc.terminate()
+                proc.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,209 @@ import axios from "axios";
 
 const API_BASE = import.meta.env.VITE_MNEMOS_API || "http://localhost:8000";
 
-export async function fetchGraph() {
-  const res = await axios.get(`${API_BASE}/graph`);
+const PAGE_SIZE = 2000;
+
+// Filters accepted by GET /graph: type, relation, since, until (meta.date),
+// fields (comma-separated projection, e.g. "type,meta.date") and edges.
+export async function fetchGraphPage({ cursor, limit = PAGE_SIZE, ...filters } = {}) {
+  const res = await axios.get(`${API_BASE}/graph`, {
+    params: { cursor, limit, ...filters },
+  });
+  return res.data;
+}
+
+// Fetch the graph page by page. onPage({ nodes, edges }) is called as each
+// page arrives so callers can render before the whole graph is loaded.
+export async function fetchGraph({ pageSize = PAGE_SIZE, onPage, ...filters } = {}) {
+  const graph = { nodes: [], edges: [] };
+  let cursor;
+  do {
+    const page = await fetchGraphPage({ cursor, limit: pageSize, ...filters });
+    graph.nodes.push(...page.nodes);
+    graph.edges.push(...page.edges);
+    if (onPage) onPage(page);
+    cursor = page.next_cursor;
+  } while (cursor != null);
+  return graph;
+}
+
+// Stream the graph as NDJSON, calling onNode / onEdge per line as it is read.
+export async function streamGraph({ onNode, onEdge, signal, ...filters } = {}) {
+  const params = new URLSearchParams({ format: "ndjson" });
+  Object.entries(filters).forEach(([k, v]) => v != null && params.set(k, v));
+  const res = await fetch(`${API_BASE}/graph?${params}`, { signal });
+  if (!res.ok) throw new Error(`GET /graph failed: ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  const handle = (line) => {
+    if (!line) return;
+    const { kind, ...item } = JSON.parse(line);
+    if (kind === "node" && onNode) onNode(item);
+    else if (kind === "edge" && onEdge) onEdge(item);
+  };
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.forEach(handle);
+  }
+  handle(buffer + decoder.decode());
+}
+
+// Server-side layout of the ego-subgraph within `depth` hops of seed (default:
+// the most connected node). Nodes carry group, depth and x/y coordinates.
+export async function fetchLayout({ seed, depth = 2, layout = "force", limit } = {}) {
+  const res = await axios.get(`${API_BASE}/graph/layout`, {
+    params: { seed, depth, layout, limit },
+  });
   return res.data;
 }
 
+// ------------------
+// Query
+// ------------------
+// Ask Orin with the answer streamed back over server-sent events: onSources
+// fires once retrieval is done, then onToken per answer fragment. Resolves
+// with the final "done" payload (timings).
+export async function streamQuery(query, { maxResults = 5, onSources, onToken, signal } = {}) {
+  const res = await fetch(`${API_BASE}/api/query/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query, max_results: maxResults }),
+    signal,
+  });
+  if (!res.ok) throw new Error(`POST /api/query/stream failed: ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result = null;
+  const handle = (block) => {
+    let event = "message";
+    let data = "";
+    block.split("\n").forEach((line) => {
+      if (line.startsWith("event: ")) event = line.slice(7);
+      else if (line.startsWith("data: ")) data += line.slice(6);
+    });
+    if (!data) return;
+    const payload = JSON.parse(data);
+    if (event === "sources" && onSources) onSources(payload);
+    else if (event === "token" && onToken) onToken(payload.text);
+    else if (event === "done") result = payload;
+    else if (event === "error") throw new Error(payload.error);
+  };
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const blocks = buffer.split("\n\n");
+    buffer = blocks.pop();
+    blocks.forEach(handle);
+  }
+  handle(buffer + decoder.decode());
+  return result;
+}
+
+// ------------------
+// Delta sync
+// ------------------
+export async function fetchChanges(since) {
+  const res = await axios.get(`${API_BASE}/graph/changes`, { params: { since } });
+  return res.data;
+}
+
+const edgeKey = (e) => `${e.from}->${e.to}`;
+
+// Apply a delta from /graph/changes or /graph/events to a local graph of
+// { revision, nodes: Map(id -> node), edges: Map("from->to" -> edge) }.
+export function applyChanges(graph, delta) {
+  delta.removed_nodes.forEach((id) => {
+    graph.nodes.delete(id);
+    for (const [key, e] of graph.edges) {
+      if (e.from === id || e.to === id) graph.edges.delete(key);
+    }
+  });
+  delta.removed_edges.forEach((e) => graph.edges.delete(edgeKey(e)));
+  delta.nodes.forEach((n) => graph.nodes.set(n.id, n));
+  delta.edges.forEach((e) => graph.edges.set(edgeKey(e), e));
+  graph.revision = delta.revision;
+  return graph;
+}
+
+// One shared copy of the graph for every subscriber: fetched once, then kept
+// current from the /graph/events push channel, so a refresh costs only the
+// size of the change. Returns an unsubscribe function.
+const store = { graph: null, listeners: new Set(), source: null };
+
+function notify() {
+  store.listeners.forEach((listener) => listener(store.graph));
+}
+
+async function resync() {
+  const graph = { revision: 0, nodes: new Map(), edges: new Map() };
+  let first = true;
+  await fetchGraph({
+    onPage: (page) => {
+      // Changes made while paging are replayed from the first page's revision
+      if (first) graph.revision = page.revision;
+      first = false;
+      page.nodes.forEach((n) => graph.nodes.set(n.id, n));
+      page.edges.forEach((e) => graph.edges.set(edgeKey(e), e));
+    },
+  });
+  store.graph = graph;
+  notify();
+  follow();
+}
+
+function follow() {
+  if (store.source) store.source.close();
+  const source = new EventSource(`${API_BASE}/graph/events?since=${store.graph.revision}`);
+  source.addEventListener("changes", (event) => {
+    applyChanges(store.graph, JSON.parse(event.data));
+    notify();
+  });
+  source.addEventListener("resync", () => {
+    source.close();
+    resync();
+  });
+  source.onerror = () => {
+    // EventSource reconnects with the stale ?since=, so catch up explicitly
+    source.close();
+    setTimeout(() => store.listeners.size && catchUp(), 2000);
+  };
+  store.source = source;
+}
+
+async function catchUp() {
+  try {
+    applyChanges(store.graph, await fetchChanges(store.graph.revision));
+    notify();
+    follow();
+  } catch (err) {
+    if (err.response?.status === 410) resync();
+    else setTimeout(() => store.listeners.size && catchUp(), 5000);
+  }
+}
+
+export function subscribeGraph(listener) {
+  store.listeners.add(listener);
+  if (store.graph) listener(store.graph);
+  else if (store.listeners.size === 1) resync().catch((err) => console.error("❌ Graph sync failed:", err));
+  return () => {
+    store.listeners.delete(listener);
+    if (store.listeners.size === 0 && store.source) {
+      store.source.close();
+      store.source = null;
+      store.graph = null;
+    }
+  };
+}
+
 export async function createNode({ label, type, meta }) {
   const payload = { label, type, meta };
   console.log("📤 Sending node to", `${API_BASE}/node`, payload);
@@ -25,6 +223,51 @@ export async function createNode({ label, type, meta }) {
   }
 }
 
+// Upsert many nodes/edges in one request. Items are
+// { kind: "node", label, type, meta } or { kind: "edge", source, target, relation }.
+// With atomic (the default) an invalid item rejects the whole batch.
+export async function bulkUpsert(items, { atomic = true } = {}) {
+  try {
+    const res = await axios.post(`${API_BASE}/bulk`, items, { params: { atomic } });
+    return res.data;
+  } catch (err) {
+    if (err.response?.status === 422) return err.response.data.detail;
+    throw err;
+  }
+}
+
+// ------------------
+// ChatGPT export import
+// ------------------
+// Send a conversations.json File as the raw request body; the server spools
+// it into a new import job and parses it one conversation at a time.
+// Messages extracted by any earlier job are skipped unless fresh is set.
+// Resolves to { job_id, bytes }.
+export async function uploadChatGPTExport(file, { fresh = false } = {}) {
+  const res = await fetch(`${API_BASE}/api/chatgpt-upload?fresh=${fresh}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: file,
+  });
+  if (!res.ok) throw new Error(`Upload failed: ${res.status} ${await res.text()}`);
+  return res.json();
+}
+
+export async function fetchJob(jobId) {
+  const res = await axios.get(`${API_BASE}/api/jobs/${jobId}`);
+  return res.data;
+}
+
+export async function cancelJob(jobId) {
+  const res = await axios.post(`${API_BASE}/api/jobs/${jobId}/cancel`);
+  return res.data;
+}
+
+export async function resumeJob(jobId) {
+  const res = await axios.post(`${API_BASE}/api/jobs/${jobId}/resume`);
+  return res.data;
+}
+
 export async function createLink({ source, target, relation }) {
   return axios.post(`${API_BASE}/link`, {
     source,
@@ -1,8 +1,11 @@
 import React, { useState } from "react";
 import axios from "axios";
+import { bulkUpsert, fetchJob, uploadChatGPTExport } from "../api/mnemos";
 
 const OPENAI_API_KEY = import.meta.env.VITE_OPENAI_API_KEY;
-const MNEMOS_API = import.meta.env.VITE_MNEMOS_API || "http://localhost:8000";
+// Larger exports are parsed and extracted server-side as a stream instead of
+// being read into the browser with FileReader + JSON.parse
+const SERVER_IMPORT_BYTES = 25 * 1024 * 1024;
 
 export default function ChatGPTImport() {
   const [file, setFile] = useState(null);
@@ -43,8 +46,9 @@ export default function ChatGPTImport() {
     };
 
     try {
-      const convResponse = await axios.post(`${MNEMOS_API}/node`, conversationNode);
-      const conversationId = convResponse.data.id;
+      // Everything extracted from the conversation is sent as one /bulk batch
+      const conversationId = conversationNode.label;
+      const items = [{ kind: "node", ...conversationNode }];
 
       let messageCounter = 0;
       for (const msg of messages) {
@@ -104,21 +108,18 @@ Example output:
             }
 
             for (const entity of entities) {
-              try {
-                const nodeResponse = await axios.post(`${MNEMOS_API}/node`, {
-                  label: entity.label,
-                  type: entity.type,
-                  meta: entity.meta || {},
-                });
-
-                await axios.post(`${MNEMOS_API}/link`, {
-                  source: conversationId,
-                  target: nodeResponse.data.id,
-                  relation: "contains_entity",
-                });
-              } catch (entityErr) {
-                console.error("Error creating entity:", entityErr);
-              }
+              items.push({
+                kind: "node",
+                label: entity.label,
+                type: entity.type,
+                meta: entity.meta || {},
+              });
+              items.push({
+                kind: "edge",
+                source: conversationId,
+                target: entity.label,
+                relation: "contains_entity",
+              });
             }
           } catch (gptErr) {
             console.error("Error in GPT entity extraction:", gptErr);
@@ -126,6 +127,11 @@ Example output:
         }
       }
 
+      const result = await bulkUpsert(items, { atomic: false });
+      result.results
+        .filter((r) => r.status === "error")
+        .forEach((r) => console.error("Error creating entity:", items[r.index], r.detail));
+
       return conversationId;
     } catch (err) {
       console.error("Error processing conversation:", err);
@@ -133,6 +139,39 @@ Example output:
     }
   };
 
+  const importOnServer = async () => {
+    setIsProcessing(true);
+    setImportStatus({ status: "starting", message: "Uploading export..." });
+    try {
+      const { job_id: jobId } = await uploadChatGPTExport(file);
+      for (;;) {
+        const job = await fetchJob(jobId);
+        const status = job.progress;
+        if (["failed", "cancelled", "interrupted"].includes(job.status)) {
+          throw new Error(`job ${jobId} ${job.status}${job.error ? `: ${job.error}` : ""}`);
+        }
+        setProgress({
+          current: status.bytes_read,
+          total: status.bytes_total,
+          label: `${Math.round((100 * status.bytes_read) / status.bytes_total)}% of the export parsed`,
+        });
+        setImportStatus({
+          status: job.status === "complete" ? "complete" : "processing",
+          message: job.status === "complete"
+            ? `Import complete. Processed ${status.processed} conversations (${status.skipped} messages already extracted).`
+            : `Processed ${status.processed} of ${status.total} conversations read so far...`,
+        });
+        if (job.status === "complete") break;
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+      }
+    } catch (err) {
+      setImportStatus({ status: "error", message: `Import failed: ${err.message}` });
+      console.error("Import error:", err);
+    } finally {
+      setIsProcessing(false);
+    }
+  };
+
   const handleImport = async (e) => {
     e.preventDefault();
 
@@ -141,6 +180,11 @@ Example output:
       return;
     }
 
+    if (file.size > SERVER_IMPORT_BYTES) {
+      await importOnServer();
+      return;
+    }
+
     setIsProcessing(true);
     setImportStatus({ status: "starting", message: "Reading file..." });
 
@@ -243,7 +287,7 @@ Example output:
         {isProcessing && progress.total > 0 && (
           <div className="progress-container">
             <div className="progress-label">
-              Processing conversation {progress.current} of {progress.total}
+              {progress.label || `Processing conversation ${progress.current} of ${progress.total}`}
             </div>
             <div className="progress-bar-container">
               <div
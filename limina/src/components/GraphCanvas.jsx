@@ -1,75 +1,117 @@
-import React, { useCallback, useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import ReactFlow, {
   Background,
   Controls,
   MiniMap,
   useNodesState,
   useEdgesState,
-  addEdge,
 } from "reactflow";
 import "reactflow/dist/style.css";
-import { fetchGraph } from "../api/mnemos";
+import { fetchLayout, subscribeGraph } from "../api/mnemos";
+
+const GROUP_COLORS = ["#6c8cff", "#4fd1a5", "#f6ad55", "#f56565", "#b794f4", "#63b3ed", "#ecc94b"];
+
+const groupColor = (groups, group) =>
+  GROUP_COLORS[(groups[group]?.index ?? GROUP_COLORS.length - 1) % GROUP_COLORS.length];
+
+const formatNode = (n, groups, seed, position) => ({
+  id: n.id,
+  data: {
+    label: [
+      `🧠 ${n.label || n.id || "Unnamed"}`,
+      n.type ? `📦 Type: ${n.type}` : null,
+      n.meta?.notes ? `📝 ${n.meta.notes}` : null,
+    ]
+      .filter(Boolean)
+      .join("\n"),
+  },
+  // Coordinates come from the server; nodes the user dragged keep their place
+  position: position || { x: n.x, y: n.y },
+  style: {
+    borderRadius: "8px",
+    padding: "8px",
+    background: "#1e1e25",
+    color: "#f0f0f0",
+    border: `${n.id === seed ? 3 : 1}px solid ${groupColor(groups, n.group)}`,
+    opacity: n.depth > 1 ? 0.8 : 1,
+    fontSize: "12px",
+    fontFamily: "monospace",
+    whiteSpace: "pre-line",
+  },
+});
+
+const formatEdge = (e) => ({
+  id: `${e.from}->${e.to}`,
+  source: e.from,
+  target: e.to,
+  label: e.relation,
+  type: "default",
+  animated: true,
+});
+
+const controlStyle = { background: "#1e1e25", color: "#f0f0f0", border: "1px solid #444" };
 
 export default function GraphCanvas() {
   const [nodes, setNodes, onNodesChange] = useNodesState([]);
   const [edges, setEdges, onEdgesChange] = useEdgesState([]);
   const [loading, setLoading] = useState(true);
+  const [revision, setRevision] = useState(null);
+  const [seed, setSeed] = useState(null);
+  const [depth, setDepth] = useState(2);
+  const [layout, setLayout] = useState("force");
+  const [view, setView] = useState(null);
+  const dragged = useRef(new Map());
 
-  const loadGraph = useCallback(async () => {
-    try {
-      const data = await fetchGraph();
-      console.log("📡 Loaded graph:", data);
-
-      const formattedNodes = data.nodes.map((n) => ({
-        id: n.id,
-        data: {
-          label: [
-            `🧠 ${n.label || n.id || "Unnamed"}`,
-            n.type ? `📦 Type: ${n.type}` : null,
-            n.meta?.notes ? `📝 ${n.meta.notes}` : null,
-          ]
-            .filter(Boolean)
-            .join("\n"),
-        },
-        position: {
-          x: Math.random() * 400,
-          y: Math.random() * 400,
-        },
-        style: {
-          borderRadius: "8px",
-          padding: "8px",
-          background: "#1e1e25",
-          color: "#f0f0f0",
-          fontSize: "12px",
-          fontFamily: "monospace",
-          whiteSpace: "pre-line",
-        },
-      }));
-
-      const formattedEdges = data.edges.map((e) => ({
-        id: `${e.from}->${e.to}`,
-        source: e.from,
-        target: e.to,
-        label: e.relation,
-        type: "default",
-        animated: true,
-      }));
-
-      setNodes(formattedNodes);
-      setEdges(formattedEdges);
-    } catch (err) {
-      console.error("❌ Failed to load graph:", err);
-    } finally {
-      setLoading(false);
-    }
-  }, [setNodes, setEdges]);
+  // Only the revision is needed here: a change means the cached layout is stale
+  useEffect(() => subscribeGraph((graph) => setRevision(graph.revision)), []);
 
   useEffect(() => {
-    loadGraph();
-  }, [loadGraph]);
+    if (revision === null) return undefined;
+    let cancelled = false;
+    // Coalesce bursts of changes into one layout request
+    const timer = setTimeout(async () => {
+      try {
+        const data = await fetchLayout({ seed, depth, layout });
+        if (cancelled) return;
+        setView(data);
+        setNodes(data.nodes.map((n) => formatNode(n, data.groups, data.seed, dragged.current.get(n.id))));
+        setEdges(data.edges.map(formatEdge));
+      } catch (err) {
+        if (err.response?.status === 404) setSeed(null);
+        else console.error("❌ Layout failed:", err);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [revision, seed, depth, layout, setNodes, setEdges]);
+
+  const recenter = (id) => {
+    dragged.current.clear();
+    setSeed(id);
+  };
 
   return (
-    <div style={{ width: "100%", height: "100vh" }}>
+    <div style={{ width: "100%", height: "100vh", position: "relative" }}>
+      <div style={{ position: "absolute", zIndex: 10, top: 8, left: 8, display: "flex", gap: 8 }}>
+        <select style={controlStyle} value={depth} onChange={(e) => setDepth(Number(e.target.value))}>
+          {[1, 2, 3, 4].map((d) => (
+            <option key={d} value={d}>{`Depth ${d}`}</option>
+          ))}
+        </select>
+        <select style={controlStyle} value={layout} onChange={(e) => setLayout(e.target.value)}>
+          <option value="force">Force</option>
+          <option value="radial">Radial</option>
+        </select>
+        {view?.seed && (
+          <span style={{ ...controlStyle, padding: "2px 8px" }}>
+            {`🎯 ${view.seed} · ${view.nodes.length} nodes${view.truncated ? " (truncated)" : ""}`}
+          </span>
+        )}
+      </div>
       {loading ? (
         <p style={{ color: "white", padding: "1rem" }}>⏳ Loading graph...</p>
       ) : nodes.length === 0 ? (
@@ -80,10 +122,12 @@ export default function GraphCanvas() {
           edges={edges}
           onNodesChange={onNodesChange}
           onEdgesChange={onEdgesChange}
+          onNodeDragStop={(_, node) => dragged.current.set(node.id, node.position)}
+          onNodeDoubleClick={(_, node) => recenter(node.id)}
           fitView
         >
           <Background />
-          <MiniMap />
+          <MiniMap nodeColor={(n) => n.style?.border?.split(" ").pop()} />
           <Controls />
         </ReactFlow>
       )}
@@ -1,6 +1,6 @@
 // spellbook/limina/src/components/LinkForm.jsx
 import React, { useEffect, useState } from "react";
-import { createLink, fetchGraph } from "../api/mnemos";
+import { createLink, subscribeGraph } from "../api/mnemos";
 
 export default function LinkForm() {
   const [source, setSource] = useState("");
@@ -8,18 +8,10 @@ export default function LinkForm() {
   const [relation, setRelation] = useState("");
   const [nodeLabels, setNodeLabels] = useState([]);
 
-  useEffect(() => {
-    const load = async () => {
-      try {
-        const data = await fetchGraph();
-        const labels = data.nodes.map((n) => n.id);
-        setNodeLabels(labels);
-      } catch (err) {
-        console.error("Failed to load nodes", err);
-      }
-    };
-    load();
-  }, []);
+  useEffect(
+    () => subscribeGraph((graph) => setNodeLabels(Array.from(graph.nodes.keys()))),
+    []
+  );
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -1,6 +1,6 @@
 // spellbook/limina/src/components/NodeForm.jsx
 import React, { useEffect, useState } from "react";
-import { createNode, fetchGraph } from "../api/mnemos";
+import { createNode, subscribeGraph } from "../api/mnemos";
 // No need for additional CSS import as we're using the existing index.css styles
 
 export default function NodeForm() {
@@ -11,18 +11,14 @@ export default function NodeForm() {
   const [isAdvancedMode, setIsAdvancedMode] = useState(false);
   const [rawMetaJSON, setRawMetaJSON] = useState("{}");
 
-  useEffect(() => {
-    const load = async () => {
-      try {
-        const data = await fetchGraph();
-        const types = Array.from(new Set(data.nodes.map((n) => n.type)));
-        setTypeOptions(types);
-      } catch (err) {
-        console.error("Failed to load types", err);
-      }
-    };
-    load();
-  }, []);
+  useEffect(
+    () =>
+      subscribeGraph((graph) => {
+        const types = new Set(Array.from(graph.nodes.values(), (n) => n.type));
+        setTypeOptions(Array.from(types));
+      }),
+    []
+  );
 
   // Convert meta fields to JSON object
   const getMetaObject = () => {
@@ -1,13 +1,12 @@
 // spellbook/limina/src/components/OrinChat.jsx
 import React, { useState, useEffect, useRef } from "react";
-import axios from "axios";
-
-const MNEMOS_API = import.meta.env.VITE_MNEMOS_API || "http://localhost:8000";
+import { streamQuery } from "../api/mnemos";
 
 export default function OrinChat() {
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const [showSources, setShowSources] = useState(false);
   const [sources, setSources] = useState([]);
   
@@ -31,29 +30,33 @@ export default function OrinChat() {
     }]);
     
     // Clear input and set loading state
+    const query = input;
     setInput("");
     setIsLoading(true);
     setSources([]);
     
+    // Grow the last assistant message as tokens arrive
+    let started = false;
+    const appendToken = (text) => {
+      if (!started) {
+        started = true;
+        setIsLoading(false);
+        setMessages(prev => [...prev, { role: "assistant", content: text }]);
+        return;
+      }
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+      });
+    };
+    
     try {
-      const response = await axios.post(`${MNEMOS_API}/api/query`, {
-        query: input,
-        max_results: 5
+      setIsStreaming(true);
+      await streamQuery(query, {
+        maxResults: 5,
+        onSources: (data) => setSources(data.sources || []),
+        onToken: appendToken,
       });
-      
-      // Add assistant message to the chat
-      setMessages(prev => [...prev, {
-        role: "assistant",
-        content: response.data.answer
-      }]);
-      
-      // Store sources for potential display
-      if (response.data.sources && response.data.sources.length > 0) {
-        setSources(response.data.sources);
-      } else {
-        setSources([]);
-      }
-      
     } catch (error) {
       console.error("Error querying Orin:", error);
       
@@ -64,6 +67,7 @@ export default function OrinChat() {
       }]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
   
@@ -140,15 +144,15 @@ export default function OrinChat() {
           value={input}
           onChange={(e) => setInput(e.target.value)}
           placeholder="Ask Orin a question..."
-          disabled={isLoading}
+          disabled={isStreaming}
           className="chat-input"
         />
         <button 
           type="submit" 
           className="send-button"
-          disabled={isLoading || !input.trim()}
+          disabled={isStreaming || !input.trim()}
         >
-          {isLoading ? "..." : "Send"}
+          {isStreaming ? "..." : "Send"}
         </button>
       </form>
     </div>
@@ -0,0 +1,280 @@
+import os
+import json
+import numpy as np
+
+def normalize(vec):
+    vec = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+def top_k(scores, k):
+    """Indices of the k largest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+class ExactIndex:
+    """Brute-force cosine index over a memory-mapped float32 matrix.
+
+    Vectors are normalized on insert, so cosine similarity is a dot product.
+    Deleted rows are tombstoned and reused by later inserts.
+    """
+
+    def __init__(self, path, initial_capacity=1024):
+        self.path = path
+        self.initial_capacity = initial_capacity
+        self.dim = None
+        self.capacity = 0
+        self.size = 0          # rows in use, including tombstones
+        self.ids = []          # row -> node id (None once deleted)
+        self.rows = {}         # node id -> row
+        self.free = []         # reusable tombstoned rows
+        self.vectors = None    # np.memmap of shape (capacity, dim)
+        self.load()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, node_id):
+        return node_id in self.rows
+
+    # ------------------
+    # Storage
+    # ------------------
+    def _vec_path(self):
+        return self.path + ".f32"
+
+    def _meta(self):
+        return {"dim": self.dim, "capacity": self.capacity, "ids": self.ids}
+
+    def _open(self, mode):
+        self.vectors = np.memmap(self._vec_path(), dtype=np.float32, mode=mode,
+                                 shape=(self.capacity, self.dim))
+
+    def _grow(self, needed):
+        if self.vectors is None:
+            self.capacity = max(self.initial_capacity, needed)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._open("w+")
+            return
+        if needed <= self.capacity:
+            return
+        self.vectors.flush()
+        self.vectors = None
+        self.capacity = max(needed, self.capacity * 2)
+        with open(self._vec_path(), "r+b") as f:
+            f.truncate(self.capacity * self.dim * 4)
+        self._open("r+")
+
+    def load(self):
+        meta_path = self.path + ".json"
+        if not (os.path.exists(meta_path) and os.path.exists(self._vec_path())):
+            return
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        self._load_meta(meta)
+        if self.dim:
+            self._open("r+")
+
+    def _load_meta(self, meta):
+        self.dim = meta["dim"]
+        self.capacity = meta["capacity"]
+        self.ids = meta["ids"]
+        self.size = len(self.ids)
+        self.rows = {n: i for i, n in enumerate(self.ids) if n is not None}
+        self.free = [i for i, n in enumerate(self.ids) if n is None]
+
+    def save(self):
+        if self.vectors is not None:
+            self.vectors.flush()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".json", "w") as f:
+            json.dump(self._meta(), f)
+
+    # ------------------
+    # Mutation
+    # ------------------
+    def add(self, node_id, vec):
+        vec = normalize(vec)
+        if self.dim is None:
+            self.dim = vec.shape[0]
+        if node_id in self.rows:
+            row = self.rows[node_id]
+            self._unassign(row)
+        elif self.free:
+            row = self.free.pop()
+        else:
+            row = self.size
+            self._grow(row + 1)
+            self.size += 1
+            self.ids.append(None)
+        self.vectors[row] = vec
+        self.ids[row] = node_id
+        self.rows[node_id] = row
+        self._assign(row, vec)
+        return row
+
+    def remove(self, node_id):
+        row = self.rows.pop(node_id, None)
+        if row is None:
+            return False
+        self._unassign(row)
+        self.ids[row] = None
+        self.vectors[row] = 0
+        self.free.append(row)
+        return True
+
+    def _assign(self, row, vec):
+        pass
+
+    def _unassign(self, row):
+        pass
+
+    # ------------------
+    # Query
+    # ------------------
+    def _score(self, rows, query):
+        return self.vectors[rows] @ query
+
+    def search(self, query, k=5, **_):
+        """Return up to k (node_id, cosine) pairs, best first."""
+        if not self.rows:
+            return []
+        query = normalize(query)
+        scores = np.asarray(self.vectors[:self.size] @ query)
+        if self.free:
+            scores[self.free] = -np.inf
+        return [(self.ids[i], float(scores[i])) for i in top_k(scores, min(k, len(self.rows)))]
+
+class IVFFlatIndex(ExactIndex):
+    """Inverted-file index: vectors are bucketed under k-means centroids and a
+    query only scans the `nprobe` closest buckets.
+
+    `nprobe` is the recall/latency knob: higher probes more lists. Below
+    `min_train` vectors the index falls back to exact search; it retrains
+    once it has grown `retrain_factor` times since the last training.
+    """
+
+    def __init__(self, path, nprobe=8, min_train=2048, retrain_factor=4, seed=0, **kwargs):
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+        self.centroids = None
+        self.assign = None        # row -> list id, -1 if unassigned
+        self.lists = []           # list id -> set of rows
+        self._list_rows = {}      # list id -> cached np.ndarray of rows
+        self.trained_size = 0
+        super().__init__(path, **kwargs)
+
+    def _meta(self):
+        meta = super()._meta()
+        meta["trained_size"] = self.trained_size
+        return meta
+
+    def _load_meta(self, meta):
+        super()._load_meta(meta)
+        self.trained_size = meta.get("trained_size", 0)
+        centroid_path, assign_path = self.path + ".centroids.npy", self.path + ".assign.npy"
+        if self.trained_size and os.path.exists(centroid_path) and os.path.exists(assign_path):
+            self.centroids = np.load(centroid_path)
+            self.assign = np.load(assign_path)
+            self._rebuild_lists()
+
+    def save(self):
+        super().save()
+        if self.centroids is not None:
+            np.save(self.path + ".centroids.npy", self.centroids)
+            np.save(self.path + ".assign.npy", self.assign[:self.size])
+
+    def _rebuild_lists(self):
+        self.lists = [set() for _ in range(len(self.centroids))]
+        self._list_rows = {}
+        for row, c in enumerate(self.assign[:self.size]):
+            if c >= 0:
+                self.lists[c].add(row)
+
+    # ------------------
+    # Training
+    # ------------------
+    def train(self, nlist=None, iterations=10):
+        """Run spherical k-means over the live vectors and reassign every row."""
+        live = np.array(sorted(self.rows.values()), dtype=np.int64)
+        n = len(live)
+        if n == 0:
+            return
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        rng = np.random.default_rng(self.seed)
+        sample = live if n <= nlist * 64 else rng.choice(live, nlist * 64, replace=False)
+        data = np.asarray(self.vectors[np.sort(sample)])
+        centroids = data[rng.choice(len(data), min(nlist, len(data)), replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.where(norms == 0, 1, norms))
+        self.centroids = centroids.astype(np.float32)
+        self.assign = np.full(max(self.capacity, self.size), -1, dtype=np.int32)
+        for start in range(0, n, 8192):
+            chunk = live[start:start + 8192]
+            self.assign[chunk] = np.argmax(self.vectors[chunk] @ self.centroids.T, axis=1)
+        self._rebuild_lists()
+        self.trained_size = n
+
+    def _maybe_train(self):
+        n = len(self.rows)
+        if n < self.min_train:
+            return
+        if self.centroids is None or n >= self.trained_size * self.retrain_factor:
+            self.train()
+
+    def _assign(self, row, vec):
+        if self.centroids is None:
+            self._maybe_train()
+            return
+        if len(self.assign) <= row:
+            grown = np.full(max(self.capacity, row + 1), -1, dtype=np.int32)
+            grown[:len(self.assign)] = self.assign
+            self.assign = grown
+        c = int(np.argmax(self.centroids @ vec))
+        self.assign[row] = c
+        self.lists[c].add(row)
+        self._list_rows.pop(c, None)
+        self._maybe_train()
+
+    def _unassign(self, row):
+        if self.centroids is None or row >= len(self.assign):
+            return
+        c = self.assign[row]
+        if c >= 0:
+            self.lists[c].discard(row)
+            self._list_rows.pop(c, None)
+            self.assign[row] = -1
+
+    def _rows_of(self, c):
+        rows = self._list_rows.get(c)
+        if rows is None:
+            rows = np.fromiter(self.lists[c], dtype=np.int64, count=len(self.lists[c]))
+            rows.sort()
+            self._list_rows[c] = rows
+        return rows
+
+    # ------------------
+    # Query
+    # ------------------
+    def search(self, query, k=5, nprobe=None):
+        if self.centroids is None:
+            return super().search(query, k)
+        if not self.rows:
+            return []
+        query = normalize(query)
+        probes = top_k(self.centroids @ query, nprobe or self.nprobe)
+        candidates = np.concatenate([self._rows_of(c) for c in probes])
+        if len(candidates) == 0:
+            return []
+        scores = self.vectors[candidates] @ query
+        return [(self.ids[candidates[i]], float(scores[i])) for i in top_k(scores, k)]
@@ -0,0 +1,177 @@
+# spellbook/mnemos/attr_index.py
+# Secondary indexes over node attributes: the node type and selected meta
+# keys (MNEMOS_INDEX_KEYS, by default date, source and priority), so filters
+# find their nodes without scanning the graph. Edge relations are indexed by
+# the graph itself (CompactGraph.relation_edges).
+#
+# Each attribute keeps its value per node slot and, as of the last build, the
+# slots sorted by value: an equality is a binary search over the distinct
+# values and a range (dates) a contiguous slice. Slots changed since the build
+# sit in a delta that lookups check directly; once it outgrows a fraction of
+# the index the next lookup redoes the sort, as the graph does with its
+# pending edges.
+# Values compare as strings, which orders ISO dates correctly.
+
+import os
+import bisect
+import threading
+import numpy as np
+
+INDEX_KEYS = [k.strip() for k in os.getenv("MNEMOS_INDEX_KEYS", "date,source,priority").split(",") if k.strip()]
+TOP = "\U0010ffff"   # sorts after any character a value holds
+SETTLE = 1024        # delta size checked value by value; beyond it (and 1/32 of the index) the sort is redone
+
+def index_value(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+def field_value(data, field):
+    """The indexed form of `field` ("type" or "meta.<key>") on a node's attrs."""
+    if field == "type":
+        return index_value(data.get("type"))
+    return index_value((data.get("meta") or {}).get(field[5:]))
+
+class SortedIndex:
+    """Node slots ordered by one attribute's value, plus the slots changed since."""
+
+    def __init__(self):
+        self.values = []      # slot -> value (None when absent)
+        self.vocab = []       # distinct values at the last build, sorted
+        self.starts = np.zeros(1, dtype=np.int64)  # vocab[i] -> order[starts[i]:starts[i + 1]]
+        self.order = np.zeros(0, dtype=np.int64)
+        self.column = np.zeros(0, dtype=np.int64)  # slot -> position of its value in vocab (-1: none)
+        self.delta = set()    # slots set since the last build
+        self.changed = np.zeros(0, dtype=bool)  # the delta as a mask over built slots
+
+    def set(self, slot, value):
+        if slot >= len(self.values):
+            self.values.extend([None] * (slot + 1 - len(self.values)))
+        if self.values[slot] == value:
+            return
+        self.values[slot] = value
+        if slot < len(self.changed):
+            self.changed[slot] = True
+        self.delta.add(slot)
+
+    def build(self):
+        vocab = sorted({v for v in self.values if v is not None})
+        codes = {v: i for i, v in enumerate(vocab)}
+        column = np.fromiter((-1 if v is None else codes[v] for v in self.values),
+                             dtype=np.int64, count=len(self.values))
+        present = np.flatnonzero(column >= 0)
+        self.order = present[np.argsort(column[present], kind="stable")]
+        self.starts = np.zeros(len(vocab) + 1, dtype=np.int64)
+        self.starts[1:] = np.cumsum(np.bincount(column[present], minlength=len(vocab)))
+        self.vocab = vocab
+        self.column = column
+        self.delta = set()
+        self.changed = np.zeros(len(self.values), dtype=bool)
+
+    def _settle(self):
+        if len(self.delta) > max(SETTLE, len(self.order) // 32):
+            self.build()
+
+    def _codes(self, low, high):
+        self._settle()
+        i = 0 if low is None else bisect.bisect_left(self.vocab, low)
+        j = len(self.vocab) if high is None else bisect.bisect_left(self.vocab, high)
+        return i, max(i, j)
+
+    def _span(self, low, high):
+        i, j = self._codes(low, high)
+        return int(self.starts[i]), int(self.starts[j])
+
+    def count(self, low=None, high=None):
+        """Slots with low <= value < high, or an upper bound while the delta is large."""
+        start, stop = self._span(low, high)
+        if len(self.delta) > SETTLE:
+            return stop - start + len(self.delta)
+        return stop - start + len(self._fresh(low, high))
+
+    def lookup(self, low=None, high=None):
+        """Slots with low <= value < high (either bound may be None), unordered."""
+        start, stop = self._span(low, high)
+        slots = self.order[start:stop]
+        if not self.delta:
+            return slots
+        slots = slots[~self.changed[slots]]
+        return np.concatenate([slots, np.array(self._fresh(low, high), dtype=np.int64)])
+
+    def matches(self, slots, low=None, high=None):
+        """Mask over an array of slots: those whose value has low <= value < high."""
+        i, j = self._codes(low, high)
+        built = slots < len(self.column)
+        codes = np.full(len(slots), -1, dtype=np.int64)
+        codes[built] = self.column[slots[built]]
+        keep = (codes >= i) & (codes < j)
+        if self.delta:
+            stale = ~built
+            stale[built] = self.changed[slots[built]]
+            values = self.values
+            for k in np.flatnonzero(stale).tolist():
+                v = values[int(slots[k])] if slots[k] < len(values) else None
+                keep[k] = v is not None and (low is None or v >= low) and (high is None or v < high)
+        return keep
+
+    def _fresh(self, low, high):
+        values = self.values
+        return [s for s in self.delta if values[s] is not None
+                and (low is None or values[s] >= low) and (high is None or values[s] < high)]
+
+class AttributeIndex:
+    """SortedIndex per indexed field ("type", "meta.date", ...) of one graph.
+
+    Updates come in under the graph's write lock; lookups run under its read
+    side, so they take `lock` between them for the re-sorts they may do.
+    """
+
+    def __init__(self, keys=INDEX_KEYS):
+        self.fields = ("type",) + tuple(f"meta.{k}" for k in keys)
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.indexes = {field: SortedIndex() for field in self.fields}
+
+    def rebuild(self, graph):
+        self.clear()
+        columns = [(field, index.values) for field, index in self.indexes.items()]
+        for _, values in columns:
+            values.extend([None] * len(graph._ids))
+        for slot, node_id in graph.node_slots():
+            data = graph.nodes[node_id]
+            for field, values in columns:
+                values[slot] = field_value(data, field)
+        for index in self.indexes.values():
+            index.build()
+
+    def add(self, graph, node_id, data):
+        slot = graph._index.get(node_id)
+        if slot is None:
+            return
+        for field, index in self.indexes.items():
+            index.set(slot, field_value(data, field))
+
+    # Removed nodes need no upkeep: slots are never reused, and callers keep
+    # only graph.live() slots.
+
+    def covers(self, field):
+        return field in self.indexes
+
+    def count(self, field, low=None, high=None):
+        with self.lock:
+            return self.indexes[field].count(low, high)
+
+    def lookup(self, field, low=None, high=None):
+        with self.lock:
+            return self.indexes[field].lookup(low, high)
+
+    def within(self, field, slots, spans):
+        """The slots whose `field` value falls in one of `spans`, [low, high) pairs."""
+        index = self.indexes[field]
+        keep = np.zeros(len(slots), dtype=bool)
+        with self.lock:
+            for low, high in spans:
+                keep |= index.matches(slots, low, high)
+        return slots[keep]
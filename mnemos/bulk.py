@@ -0,0 +1,77 @@
+# spellbook/mnemos/bulk.py
+# Parsing and validation for POST /bulk node and edge upserts.
+#
+# Items use the same shapes as the /graph NDJSON stream, so a dump can be
+# replayed as-is:
+#   {"kind": "node", "label" | "id": ..., "type": ..., "meta": {...}}
+#   {"kind": "edge", "source" | "from": ..., "target" | "to": ..., "relation": ...}
+
+import json
+
+def parse_items(body, content_type=""):
+    """Items from a JSON array, a {"nodes": [...], "edges": [...]} object or NDJSON."""
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = []
+        for line in body.splitlines():
+            if line.strip():
+                items.append(json.loads(line))
+        return items
+    data = json.loads(body)
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return ([{"kind": "node", **n} for n in data.get("nodes", [])] +
+                [{"kind": "edge", **e} for e in data.get("edges", [])])
+    raise ValueError("Expected a JSON array, an object with nodes/edges, or NDJSON")
+
+def normalize(item):
+    """Canonical ("node", id, type, meta) / ("edge", source, target, relation), or raise ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("Item must be an object")
+    kind = item.get("kind") or ("edge" if "source" in item or "from" in item else "node")
+    if kind == "node":
+        label = item.get("label", item.get("id"))
+        if not isinstance(label, str) or not label:
+            raise ValueError("Node needs a non-empty label")
+        node_type = item.get("type")
+        if node_type is not None and not isinstance(node_type, str):
+            raise ValueError("Node type must be a string")
+        meta = item.get("meta")
+        if meta is not None and not isinstance(meta, dict):
+            raise ValueError("Node meta must be an object")
+        return ("node", label, node_type, meta)
+    if kind == "edge":
+        source = item.get("source", item.get("from"))
+        target = item.get("target", item.get("to"))
+        relation = item.get("relation")
+        if not isinstance(source, str) or not isinstance(target, str):
+            raise ValueError("Edge needs source and target")
+        if not isinstance(relation, str):
+            raise ValueError("Edge needs a relation")
+        return ("edge", source, target, relation)
+    raise ValueError(f"Unknown kind {kind!r}")
+
+def validate(items, has_node):
+    """Normalize every item; returns (ops, errors) where errors maps index -> message.
+
+    Edges may reference nodes that exist already or are upserted anywhere in
+    the same batch. New nodes need a type.
+    """
+    ops, errors = [], {}
+    for i, item in enumerate(items):
+        try:
+            ops.append(normalize(item))
+        except ValueError as e:
+            ops.append(None)
+            errors[i] = str(e)
+    typed = {op[1] for op in ops if op and op[0] == "node" and op[2] is not None}
+    for i, op in enumerate(ops):
+        if op and op[0] == "node" and op[2] is None and op[1] not in typed and not has_node(op[1]):
+            errors[i] = "New node needs a type"
+    batch_nodes = {op[1] for i, op in enumerate(ops) if op and op[0] == "node" and i not in errors}
+    for i, op in enumerate(ops):
+        if op and op[0] == "edge":
+            missing = [n for n in op[1:3] if n not in batch_nodes and not has_node(n)]
+            if missing:
+                errors[i] = f"Missing node(s): {', '.join(missing)}"
+    return ops, errors
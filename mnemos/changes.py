@@ -0,0 +1,80 @@
+# spellbook/mnemos/changes.py
+# Revisioned change feed behind GET /graph/changes and GET /graph/events.
+#
+# Every mutation bumps the graph revision and records which node or edge it
+# touched. A delta since revision r is the latest state of each key touched
+# after r, so its size follows the number of changes, not the graph.
+
+import os
+import bisect
+import threading
+
+CHANGE_HISTORY = int(os.getenv("MNEMOS_CHANGE_HISTORY", "100000"))
+
+class ChangeFeed:
+    """Bounded history of (revision, kind, key, data) entries.
+
+    kind is "node" (key: id) or "edge" (key: (source, target)); data is the
+    new attribute dict, or None when removed. Removing a node implicitly
+    removes its edges.
+    """
+
+    def __init__(self, revision=0, history=CHANGE_HISTORY):
+        self.history = history
+        self.cond = threading.Condition()
+        self.reset(revision)
+
+    def reset(self, revision):
+        """Forget history, e.g. after the graph is reloaded; older clients must resync."""
+        with self.cond:
+            self.revision = revision
+            self.floor = revision  # deltas are only known for since >= floor
+            self.entries = []
+            self.revs = []
+            self.cond.notify_all()
+
+    def record(self, revision, kind, key, data):
+        self.record_many(revision, [(kind, key, data)])
+
+    def record_many(self, revision, items):
+        """Record (kind, key, data) changes that all belong to one revision."""
+        with self.cond:
+            self.entries.extend(items)
+            self.revs.extend([revision] * len(items))
+            excess = len(self.revs) - self.history
+            if excess > self.history // 4:  # trim in chunks to keep appends O(1)
+                self.floor = self.revs[excess - 1]
+                del self.entries[:excess], self.revs[:excess]
+            self.revision = revision
+            self.cond.notify_all()
+
+    def since(self, rev):
+        """Changes after `rev`, or None if they are no longer known (resync needed)."""
+        with self.cond:
+            if rev < self.floor or rev > self.revision:
+                return None
+            start = bisect.bisect_right(self.revs, rev)
+            latest = {}
+            for i in range(start, len(self.entries)):
+                kind, key, data = self.entries[i]
+                latest[kind, key] = data
+            revision = self.revision
+        delta = {"revision": revision, "since": rev,
+                 "nodes": [], "removed_nodes": [], "edges": [], "removed_edges": []}
+        for (kind, key), data in latest.items():
+            if kind == "node":
+                if data is None:
+                    delta["removed_nodes"].append(key)
+                else:
+                    delta["nodes"].append({"id": key, **data})
+            elif data is None:
+                delta["removed_edges"].append({"from": key[0], "to": key[1]})
+            else:
+                delta["edges"].append({"from": key[0], "to": key[1], **data})
+        return delta
+
+    def wait(self, rev, timeout=None):
+        """Block until the revision moves past `rev` (or timeout); returns the revision."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.revision != rev, timeout)
+            return self.revision
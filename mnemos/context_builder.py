@@ -0,0 +1,162 @@
+# spellbook/mnemos/context_builder.py
+# Token-budgeted graph context for /api/query prompts.
+#
+# Each hit node contributes a header (label, type, meta) and its connections.
+# Connections are ranked by how well the neighbour and relation match the
+# query, then added greedily until the token budget is spent, so a hub with
+# hundreds of links costs no more than the budget allows.
+#
+# Per-node neighbourhood summaries (header lines plus the term set of every
+# connection) are cached and dropped by invalidate() when the node or its
+# edges change; neighbour types are read at render time so they never go stale.
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from keyword_index import tokenize
+
+CONTEXT_TOKENS = int(os.getenv("MNEMOS_CONTEXT_TOKENS", "1500"))
+SUMMARY_CACHE = int(os.getenv("MNEMOS_SUMMARY_CACHE", "10000"))
+META_VALUE_CHARS = 300
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text):
+    """Local estimate of BPE tokens: about one per four word characters, plus
+    one per punctuation mark. Close enough to budget by, no tokenizer needed."""
+    return sum((len(p) + 3) // 4 for p in _PIECE.findall(text))
+
+class NodeSummary:
+    __slots__ = ("header", "header_tokens", "entries")
+
+    def __init__(self, header, entries):
+        self.header = header
+        self.header_tokens = estimate_tokens(header)
+        self.entries = entries  # [(neighbour, outgoing, relation, terms)]
+
+class ContextBuilder:
+    """Builds prompt context from search hits within a token budget."""
+
+    def __init__(self, budget=CONTEXT_TOKENS, size=SUMMARY_CACHE, lock=None):
+        self.budget = budget
+        self.size = size
+        # `lock` guards reads of the graph (the read side in main); the
+        # summary cache has its own, since readers build concurrently
+        self.lock = lock or nullcontext()
+        self.cache_lock = threading.Lock()
+        self.summaries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, node_ids):
+        with self.cache_lock:
+            for n in node_ids:
+                self.summaries.pop(n, None)
+
+    def clear(self):
+        with self.cache_lock:
+            self.summaries.clear()
+
+    def summary(self, graph, node_id):
+        with self.cache_lock:
+            cached = self.summaries.get(node_id)
+            if cached is not None:
+                self.summaries.move_to_end(node_id)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        data = graph.nodes[node_id]
+        lines = [f"Node: {data.get('label', node_id)} ({data.get('type', 'unknown')})"]
+        for k, v in (data.get("meta") or {}).items():
+            v = str(v)
+            lines.append(f"- {k}: {v[:META_VALUE_CHARS]}{'…' if len(v) > META_VALUE_CHARS else ''}")
+        entries = []
+        for _, v, attrs in graph.out_edges(node_id, data=True):
+            relation = attrs.get("relation", "link")
+            entries.append((v, True, relation, frozenset(tokenize(f"{v} {relation}"))))
+        for u, _, attrs in graph.in_edges(node_id, data=True):
+            relation = attrs.get("relation", "link")
+            entries.append((u, False, relation, frozenset(tokenize(f"{u} {relation}"))))
+        summary = NodeSummary("\n".join(lines), entries)
+        with self.cache_lock:
+            self.summaries[node_id] = summary
+            while len(self.summaries) > self.size:
+                self.summaries.popitem(last=False)
+        return summary
+
+    def build(self, graph, nodes, query="", idf=None, budget=None):
+        """(context, stats) for the hit nodes, best-first, within `budget` tokens.
+
+        Connections score by the summed idf of query terms they share, with a
+        bonus for neighbours that are hits themselves and a decay by the rank
+        of the hit they hang off.
+        """
+        with self.lock:
+            return self._build(graph, nodes, query, idf, budget or self.budget)
+
+    def _build(self, graph, nodes, query, idf, budget):
+        if not nodes:
+            return "No relevant information found in your memory.", {
+                "tokens": 0, "budget": budget, "nodes": 0, "connections": 0, "omitted": 0}
+        weight = idf or (lambda term: 1.0)
+        query_terms = {t: weight(t) for t in set(tokenize(query))}
+        hit_ids = {n["id"] for n in nodes}
+
+        used = 0
+        included = []
+        candidates = []
+        for rank, node in enumerate(nodes):
+            if node["id"] not in graph:
+                continue
+            summary = self.summary(graph, node["id"])
+            if used + summary.header_tokens > budget:
+                continue
+            used += summary.header_tokens
+            included.append((node["id"], summary))
+            decay = 1.0 / (1 + 0.5 * rank)
+            for i, (other, outgoing, relation, terms) in enumerate(summary.entries):
+                score = sum(w for t, w in query_terms.items() if t in terms)
+                if other in hit_ids:
+                    score += 1.0
+                candidates.append((-score * decay, rank, i, node["id"], other, outgoing, relation))
+
+        candidates.sort()
+        shown = {}
+        omitted = 0
+        for i, (_, _, _, node_id, other, outgoing, relation) in enumerate(candidates):
+            if budget - used < 8:
+                omitted += len(candidates) - i  # no room for even a short line
+                break
+            if other not in graph:
+                continue
+            other_type = graph.nodes[other].get("type", "unknown")
+            if outgoing:
+                line = f"- Related to {other} ({other_type}) via {relation}"
+            else:
+                line = f"- {other} ({other_type}) is related via {relation}"
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                omitted += 1
+                continue
+            used += cost
+            shown.setdefault(node_id, []).append(line)
+
+        parts = []
+        for node_id, summary in included:
+            entry = summary.header
+            lines = shown.get(node_id)
+            if lines:
+                entry += "\nConnections:\n" + "\n".join(lines)
+            hidden = sum(1 for e in summary.entries if e[0] in graph) - len(lines or ())
+            if hidden:
+                entry += f"\n- ({hidden} more connections not shown)"
+            parts.append(entry)
+        context = "\n\n".join(parts)
+        return context, {"tokens": estimate_tokens(context), "budget": budget, "nodes": len(included),
+                         "connections": sum(len(v) for v in shown.values()), "omitted": omitted}
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self.summaries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
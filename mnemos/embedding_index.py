@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from storage import SAVE_PATH
+from ann_index import IVFFlatIndex
+
+INDEX_PATH = os.path.join(os.path.dirname(SAVE_PATH), "orin_embeddings")
+# Seconds before nodes whose embedding failed are tried again
+MISSING_RETRY = float(os.getenv("MNEMOS_EMBED_MISSING_RETRY", "300"))
+
+def node_text(node_id, data):
+    """Canonical text embedded for a node: label, type and meta."""
+    text = f"{data.get('label', node_id)} ({data.get('type', 'unknown')})"
+    meta = data.get("meta") or {}
+    if meta:
+        text += " | " + "; ".join(f"{k}: {v}" for k, v in sorted(meta.items()))
+    return text
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class EmbeddingIndex:
+    """Persistent node embeddings keyed by a hash of each node's canonical text.
+
+    Vectors live in a pluggable vector index (see ann_index) that answers a
+    query without touching every node. Nodes are queued on update and
+    embedded in batches by flush() (a bounded one on each search, the rest by
+    backfill()). Searches leave what they embedded unsaved; backfill() and
+    persist() write it out. `embedder` is an EmbeddingService, or any function of one
+    text returning a vector or None.
+
+    Nodes whose embedding failed are kept out of the vector index as
+    "missing" and queued again after MISSING_RETRY seconds.
+
+    A `readonly` index never embeds or writes; it re-reads the files whenever
+    the process that owns them saves (other workers in shared mode).
+    """
+
+    def __init__(self, embedder, path=INDEX_PATH, ann=None, readonly=False):
+        self.embedder = embedder
+        self.embed_many = getattr(embedder, "embed_many", None) or (lambda texts: [embedder(t) for t in texts])
+        self.path = path
+        self.ann = ann if ann is not None else IVFFlatIndex(path + ".ann")
+        self.hashes = {}     # node id -> hash of the embedded text
+        self.pending = {}    # node id -> (hash, text) awaiting embedding
+        self.inflight = {}   # node id -> hash being embedded right now
+        self.missing = {}    # node id -> (hash, text) whose embedding failed
+        self.retry_at = 0.0
+        self.lock = threading.RLock()
+        self.readonly = readonly
+        self.loaded = None   # mtime of the keys file last read
+        self.unsaved = False # vectors added since the last save
+        self._graph = None
+        self.load()
+
+    # ------------------
+    # Persistence
+    # ------------------
+    def load(self):
+        keys_path = self.path + ".json"
+        if not os.path.exists(keys_path):
+            return
+        self.loaded = os.stat(keys_path).st_mtime_ns
+        with open(keys_path, "r") as f:
+            hashes = json.load(f)["hashes"]
+        # Only trust hashes whose vectors actually made it to disk
+        self.hashes = {n: h for n, h in hashes.items() if n in self.ann}
+        if not self.readonly:
+            for node_id in [n for n in self.ann.rows if n not in self.hashes]:
+                self.ann.remove(node_id)
+
+    def refresh(self):
+        """Read-only copies: pick up the owner's last save, if there is a newer one."""
+        try:
+            mtime = os.stat(self.path + ".json").st_mtime_ns
+        except OSError:
+            return
+        if mtime == self.loaded:
+            return
+        with self.lock:
+            try:
+                self.ann.load()
+                self.load()
+            except (OSError, ValueError, KeyError):
+                pass  # caught mid-save; the next search tries again
+
+    def save(self):
+        self.ann.save()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".json", "w") as f:
+            json.dump({"hashes": self.hashes}, f)
+        self.unsaved = False
+
+    def persist(self):
+        """Save if anything was embedded since the last save. Returns whether it wrote."""
+        if self.readonly or not self.unsaved:
+            return False
+        with self.lock:
+            self.save()
+        return True
+
+    # ------------------
+    # Maintenance
+    # ------------------
+    def update(self, node_id, data):
+        """Queue a node for (re-)embedding if its canonical text changed."""
+        if self.readonly:
+            return False
+        text = node_text(node_id, data)
+        h = text_hash(text)
+        with self.lock:
+            self.missing.pop(node_id, None)
+            if self.hashes.get(node_id) == h:
+                self.pending.pop(node_id, None)
+                return False
+            self.pending[node_id] = (h, text)
+            return True
+
+    def remove(self, node_id):
+        if self.readonly:
+            return
+        with self.lock:
+            self.pending.pop(node_id, None)
+            self.inflight.pop(node_id, None)
+            self.missing.pop(node_id, None)
+            if self.hashes.pop(node_id, None) is not None:
+                self.ann.remove(node_id)
+
+    def sync(self, graph):
+        """Reconcile the index with a graph: queue changed nodes, drop stale ones."""
+        if self.readonly:
+            self._graph = graph
+            return
+        with self.lock:
+            for node_id in graph.nodes:
+                self.update(node_id, graph.nodes[node_id])
+            for node_id in [n for n in self.hashes if n not in graph]:
+                self.remove(node_id)
+            for queue in (self.pending, self.missing):
+                for node_id in [n for n in queue if n not in graph]:
+                    del queue[node_id]
+            self._graph = graph
+
+    def requeue_missing(self, force=False):
+        """Queue failed nodes again once their retry time has come (or now,
+        with force). Returns the queue length."""
+        with self.lock:
+            if self.missing and (force or time.monotonic() >= self.retry_at):
+                self.pending.update(self.missing)
+                self.missing.clear()
+            return len(self.pending)
+
+    def flush(self, limit=None, save=True):
+        """Embed up to `limit` queued nodes (default: all) in one batched call
+        and, with `save`, persist the index if anything changed (otherwise it
+        is left to persist()). Returns how many were embedded."""
+        if self.readonly:
+            self.refresh()
+            return 0
+        self.requeue_missing()
+        with self.lock:
+            if not self.pending:
+                return 0
+            ids = list(self.pending)[:limit]
+            batch = {n: self.pending.pop(n) for n in ids}
+            self.inflight.update((n, h) for n, (h, _) in batch.items())
+        vectors = self.embed_many([text for _, text in batch.values()])
+        embedded = 0
+        with self.lock:
+            for (node_id, (h, text)), vec in zip(batch.items(), vectors):
+                # removed or changed again while the batch was out
+                if self.inflight.get(node_id) != h:
+                    continue
+                del self.inflight[node_id]
+                if vec is None:
+                    self.missing[node_id] = (h, text)
+                    self.retry_at = time.monotonic() + MISSING_RETRY
+                    continue
+                self.ann.add(node_id, vec)
+                self.hashes[node_id] = h
+                embedded += 1
+            if embedded:
+                self.unsaved = True
+                if save:
+                    self.save()
+        return embedded
+
+    def backfill(self, chunk=4096, should_stop=None):
+        """Flush the whole queue in chunks, saving after each, so a large
+        graph is embedded with progress kept across restarts."""
+        total = 0
+        self.requeue_missing()
+        while self.pending and not (should_stop and should_stop()):
+            done = self.flush(limit=chunk)
+            if not done:
+                break  # the backend is failing; the chunk is now missing
+            total += done
+        return total
+
+    def stats(self):
+        with self.lock:
+            return {"embedded": len(self.hashes), "pending": len(self.pending),
+                    "inflight": len(self.inflight), "missing": len(self.missing)}
+
+    # ------------------
+    # Query
+    # ------------------
+    def search(self, query_vec, k=5, flush_limit=256, **kwargs):
+        """Return up to k (node_id, cosine) pairs, best first. Nodes still
+        queued beyond `flush_limit` are not searchable until backfilled."""
+        if query_vec is None:
+            return []
+        self.flush(limit=flush_limit, save=False)
+        with self.lock:
+            return self.ann.search(query_vec, k, **kwargs)
@@ -0,0 +1,180 @@
+# spellbook/mnemos/embeddings.py
+# Embedding service: many texts per backend call, identical inputs embedded
+# once, batches in flight concurrently, and failures reported as missing
+# (None) rather than as zero vectors that would score against everything.
+#
+# Backends turn a list of texts into a float32 matrix:
+#   openai   the embeddings API (default)
+#   hashing  signed feature hashing of words and character trigrams; local,
+#            deterministic and offline, for tests and air-gapped installs
+
+import os
+import re
+import time
+import random
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+EMBED_BACKEND = os.getenv("MNEMOS_EMBED_BACKEND", "openai")
+EMBED_MODEL = os.getenv("MNEMOS_EMBED_MODEL", "text-embedding-ada-002")
+EMBED_BATCH = int(os.getenv("MNEMOS_EMBED_BATCH", "256"))
+EMBED_CONCURRENCY = int(os.getenv("MNEMOS_EMBED_CONCURRENCY", "4"))
+EMBED_RETRIES = int(os.getenv("MNEMOS_EMBED_RETRIES", "3"))
+EMBED_CACHE = int(os.getenv("MNEMOS_EMBED_CACHE", "4096"))
+HASHING_DIM = int(os.getenv("MNEMOS_HASHING_DIM", "512"))
+MAX_TEXT_CHARS = 8000
+_WORD = re.compile(r"\w+")
+
+# ------------------
+# Backends
+# ------------------
+class OpenAIBackend:
+    def __init__(self, client, model=EMBED_MODEL):
+        # EmbeddingService does the retrying
+        self.client = client.with_options(max_retries=0)
+        self.model = model
+        self.name = f"openai:{model}"
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(input=texts, model=self.model)
+        rows = sorted(response.data, key=lambda d: d.index)
+        return np.array([d.embedding for d in rows], dtype=np.float32)
+
+class HashingBackend:
+    """Bag of words plus character trigrams, hashed into `dim` signed buckets
+    and L2-normalized. Trigrams make near-spellings land close together."""
+
+    def __init__(self, dim=HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def _features(self, text):
+        for word in _WORD.findall(text.lower()):
+            yield word
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3]
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            h = np.fromiter((zlib.crc32(f.encode()) for f in self._features(text)), dtype=np.uint32)
+            if not len(h):
+                continue
+            signs = np.where(h & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(out[row], h % self.dim, signs)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+def make_backend(name=EMBED_BACKEND, client=None):
+    if name == "hashing":
+        return HashingBackend()
+    if name == "openai":
+        return OpenAIBackend(client)
+    raise ValueError(f"Unknown embedding backend {name!r}; expected openai or hashing")
+
+# ------------------
+# Service
+# ------------------
+class EmbeddingService:
+    """Batched, deduplicated, concurrent embedding over a backend.
+
+    embed_many(texts) returns one vector per text, or None where the backend
+    still failed after retries. Recent results are kept in a small LRU so
+    repeated queries do not reach the backend.
+    """
+
+    def __init__(self, backend, batch_size=EMBED_BATCH, concurrency=EMBED_CONCURRENCY,
+                 retries=EMBED_RETRIES, backoff=0.5, cache_size=EMBED_CACHE):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed")
+        self.stats_ = {"texts": 0, "deduplicated": 0, "cached": 0, "requests": 0,
+                       "retries": 0, "failed": 0, "last_error": None}
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def _count(self, key, n=1):
+        with self.lock:
+            self.stats_[key] += n
+
+    def _call(self, texts, retries):
+        for attempt in range(retries + 1):
+            try:
+                self._count("requests")
+                vectors = self.backend.embed(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"Backend returned {len(vectors)} vectors for {len(texts)} texts")
+                return vectors
+            except Exception as e:
+                # a rejected input fails the same way every time
+                if attempt == retries or getattr(e, "status_code", None) == 400:
+                    with self.lock:
+                        self.stats_["last_error"] = str(e)
+                    raise
+                self._count("retries")
+                time.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    def _batch(self, texts, retries=None):
+        """Vectors for one batch, None for texts that could not be embedded.
+        A batch the backend rejects as invalid is split so that one bad input
+        only costs itself; any other failure marks the whole batch missing."""
+        try:
+            return list(self._call(texts, self.retries if retries is None else retries))
+        except Exception as e:
+            if len(texts) == 1 or getattr(e, "status_code", None) != 400:
+                return [None] * len(texts)
+            mid = len(texts) // 2
+            return self._batch(texts[:mid], 0) + self._batch(texts[mid:], 0)
+
+    def embed_many(self, texts):
+        texts = [str(t)[:MAX_TEXT_CHARS] for t in texts]
+        unique = list(dict.fromkeys(texts))
+        found = {}
+        with self.lock:
+            self.stats_["texts"] += len(texts)
+            self.stats_["deduplicated"] += len(texts) - len(unique)
+            for t in unique:
+                vec = self.cache.get(t)
+                if vec is not None:
+                    self.cache.move_to_end(t)
+                    found[t] = vec
+            self.stats_["cached"] += len(found)
+        todo = [t for t in unique if t not in found]
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        if len(batches) == 1:
+            results = [self._batch(batches[0])]
+        else:
+            results = list(self.pool.map(self._batch, batches))
+        failed = 0
+        with self.lock:
+            for batch, vectors in zip(batches, results):
+                for t, vec in zip(batch, vectors):
+                    if vec is None:
+                        failed += 1
+                        continue
+                    found[t] = vec
+                    self.cache[t] = vec
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            self.stats_["failed"] += failed
+        return [found.get(t) for t in texts]
+
+    def embed(self, text):
+        """One vector, or None if it could not be computed."""
+        return self.embed_many([text])[0]
+
+    def stats(self):
+        with self.lock:
+            return {"backend": self.name, **self.stats_}
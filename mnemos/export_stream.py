@@ -0,0 +1,130 @@
+# spellbook/mnemos/export_stream.py
+# Incremental parsing of ChatGPT conversations.json exports.
+#
+# The export is one JSON array (or {"conversations": [...]}) that can run to
+# hundreds of MB. iter_conversations decodes it one conversation at a time
+# from a stream of byte chunks, so memory is bounded by the largest single
+# conversation rather than the whole file.
+
+import json
+import codecs
+from datetime import datetime, timezone
+
+CHUNK_SIZE = 1 << 20
+_WS = " \t\r\n"
+
+def iter_file_chunks(path, size=CHUNK_SIZE, on_read=None):
+    """Byte chunks of a file; on_read(n) is called with each chunk's length."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            if on_read:
+                on_read(len(chunk))
+            yield chunk
+
+class _Buffer:
+    """Decoded text window over a chunk stream, trimmed as items are consumed."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, min_len):
+        """Read until at least min_len characters are buffered past pos (or EOF)."""
+        while not self.eof and len(self.text) - self.pos < min_len:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                self.text += self.decoder.decode(b"", final=True)
+            else:
+                if self.pos > len(self.text) // 2:
+                    self.text, self.pos = self.text[self.pos:], 0
+                self.text += self.decoder.decode(chunk)
+        return len(self.text) - self.pos >= min_len
+
+    def skip_ws(self):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill(1):
+                return
+
+    def peek(self):
+        self.skip_ws()
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def decode(self, decoder):
+        """Decode one JSON value at pos, reading more input while it is incomplete.
+
+        The buffer is at least doubled between attempts, so a value of size n
+        costs O(n) decode work overall.
+        """
+        self.skip_ws()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill(2 * (len(self.text) - self.pos) + CHUNK_SIZE)
+                continue
+            if end == len(self.text) and not self.eof and self.text[self.pos] not in "{[\"":
+                # a bare number may continue in the next chunk
+                self.fill(len(self.text) - self.pos + 1)
+                continue
+            self.pos = end
+            return value
+
+def iter_conversations(chunks):
+    """Yield each conversation of an export, given its bytes as chunks."""
+    buf = _Buffer(chunks)
+    decoder = json.JSONDecoder()
+    if buf.peek() == "{":
+        # {"conversations": [...], ...}: skip other members until the array
+        buf.expect("{")
+        while True:
+            key = buf.decode(decoder)
+            buf.expect(":")
+            if key == "conversations":
+                break
+            buf.decode(decoder)
+            if buf.peek() == "}":
+                return
+            buf.expect(",")
+    buf.expect("[")
+    if buf.peek() == "]":
+        return
+    while True:
+        yield buf.decode(decoder)
+        if buf.peek() == "]":
+            return
+        buf.expect(",")
+
+def conversation_id(convo, index):
+    """Stable id for checkpointing: the export's own id, else title plus time, else position."""
+    cid = convo.get("id") or convo.get("conversation_id")
+    if not cid and convo.get("create_time") is not None:
+        cid = f"{convo.get('title', '')}@{convo['create_time']}"
+    return str(cid).replace("\n", " ") if cid else f"#{index}"
+
+def message_parts(entry):
+    """Text parts of a mapping entry; the root entry of a real export has no message."""
+    return ((entry.get("message") or {}).get("content") or {}).get("parts")
+
+def message_time(entry):
+    """ISO create time of a mapping entry. Exports keep it on the message as
+    epoch seconds; older tooling put an ISO string on the entry itself."""
+    t = entry.get("create_time") or (entry.get("message") or {}).get("create_time") or ""
+    if isinstance(t, (int, float)):
+        t = datetime.fromtimestamp(t, timezone.utc).isoformat()
+    return t
@@ -0,0 +1,98 @@
+import time
+import random
+import asyncio
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+async def call_with_retry(fn, *args, retries=4, backoff=1.0, on_retry=None):
+    """Run a blocking call in a worker thread, retrying with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception:
+            if attempt == retries:
+                raise
+            if on_retry:
+                on_retry()
+            await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+def batch_messages(messages, max_chars=2000, separator="\n\n---\n\n"):
+    """Group consecutive messages into prompts of at most `max_chars`.
+
+    A message longer than the limit is sent on its own.
+    """
+    for _, text in batch_keyed(((None, m) for m in messages), max_chars, separator):
+        yield text
+
+def batch_keyed(messages, max_chars=2000, separator="\n\n---\n\n"):
+    """batch_messages over (key, text) pairs, yielding (keys, prompt) per batch."""
+    keys, batch, size = [], [], 0
+    for key, msg in messages:
+        if batch and size + len(separator) + len(msg) > max_chars:
+            yield keys, separator.join(batch)
+            keys, batch, size = [], [], 0
+        keys.append(key)
+        batch.append(msg)
+        size += len(msg) + (len(separator) if size else 0)
+    if batch:
+        yield keys, separator.join(batch)
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+async def run_pipeline(jobs, worker, concurrency=8, queue_size=None, on_depth=None):
+    """Feed `jobs` (an iterable or async iterable) through a bounded queue to
+    `concurrency` async workers.
+
+    `worker(job)` is awaited for every job; exceptions are left to the worker.
+    `on_depth(n)` is called whenever the queue depth changes.
+    """
+    queue = asyncio.Queue(maxsize=queue_size or concurrency * 4)
+    done = object()
+
+    async def consume():
+        while True:
+            job = await queue.get()
+            if on_depth:
+                on_depth(queue.qsize())
+            if job is done:
+                return
+            await worker(job)
+
+    workers = [asyncio.create_task(consume()) for _ in range(concurrency)]
+    try:
+        # put() blocks while the queue is full, so a lazy `jobs` generator is
+        # only advanced as fast as the workers drain it
+        async for job in jobs if hasattr(jobs, "__aiter__") else _aiter(jobs):
+            await queue.put(job)
+            if on_depth:
+                on_depth(queue.qsize())
+    except BaseException:
+        # cancelled, or `jobs` failed: stop the workers rather than drain the queue
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+    for _ in workers:
+        await queue.put(done)
+    await asyncio.gather(*workers)
@@ -1,6 +1,6 @@
-import networkx as nx
+from graph_store import CompactGraph
 
-G = nx.DiGraph()
+G = CompactGraph()
 
 def add_node(label, node_type, meta=None):
     if G.has_node(label):
@@ -0,0 +1,171 @@
+# spellbook/mnemos/graph_export.py
+# Paged, filtered and streamed dumps of the graph for GET /graph.
+#
+# Pages are cut by node: a page holds up to `limit` matching nodes plus their
+# outgoing edges. The cursor is the storage position of the next node to
+# visit, which is stable for both CompactGraph slots and snapshot rows.
+
+import json
+import bisect
+from storage import revision
+
+class GraphFilter:
+    """Node type / date filters, edge relation filter and field projection."""
+
+    def __init__(self, types=None, relations=None, since=None, until=None, fields=None, edges=True):
+        self.types = _split(types)
+        self.relations = _split(relations)
+        self.since = since
+        self.until = until
+        self.fields = _split(fields)
+        self.edges = edges
+        self.slots = None   # sorted candidate slots from the attribute index, when known
+
+    @property
+    def filters_nodes(self):
+        return bool(self.types) or self.since is not None or self.until is not None
+
+    def node_matches(self, data):
+        if self.types and data.get("type") not in self.types:
+            return False
+        if self.since is not None or self.until is not None:
+            date = (data.get("meta") or {}).get("date")
+            if not date:
+                return False
+            if self.since is not None and date < self.since:
+                return False
+            if self.until is not None and date[:len(self.until)] > self.until:
+                return False
+        return True
+
+    def nodes_only(self):
+        filt = GraphFilter()
+        filt.__dict__.update(vars(self), edges=False)
+        return filt
+
+    def edge_matches(self, relation):
+        return not self.relations or relation in self.relations
+
+    def project(self, node_id, data):
+        if not self.fields:
+            return {"id": node_id, **data}
+        out = {"id": node_id}
+        for field in self.fields:
+            key, _, sub = field.partition(".")
+            if key not in data:
+                continue
+            if sub:
+                value = data[key]
+                if isinstance(value, dict) and sub in value:
+                    out.setdefault(key, {})[sub] = value[sub]
+            else:
+                out[key] = data[key]
+        return out
+
+def _split(value):
+    if not value:
+        return None
+    return {v.strip() for v in value.split(",") if v.strip()}
+
+# ------------------
+# Storage adapters
+# ------------------
+def iter_nodes(graph, start=0, slots=None):
+    """(position, node_id, attrs) from a CompactGraph or a SnapshotGraph,
+    only visiting `slots` (sorted, CompactGraph) when given."""
+    if slots is not None:
+        ids = graph._ids
+        for slot in slots[bisect.bisect_left(slots, start):]:
+            if ids[slot] is not None:
+                yield slot, ids[slot], graph.nodes[ids[slot]]
+    elif hasattr(graph, "node_slots"):
+        for slot, node_id in graph.node_slots(start):
+            yield slot, node_id, graph.nodes[node_id]
+    else:
+        for i in range(start, graph.num_nodes):
+            yield i, graph.name(i), graph.attrs(i)
+
+def out_edges(graph, node_id):
+    """(target, relation) pairs for a node's outgoing edges."""
+    if hasattr(graph, "node_slots"):
+        return [(v, d.get("relation")) for _, v, d in graph.out_edges(node_id, data=True)]
+    return graph.successors(node_id)
+
+def node_attrs(graph, node_id):
+    if hasattr(graph, "node_slots"):
+        return graph.nodes[node_id]
+    return graph.node(node_id)
+
+def iter_rows(graph, filt, start=0):
+    """(position, node_row, [edge_row, ...]) for every node passing the filter."""
+    memo = {}
+
+    def target_matches(node_id):
+        if node_id not in memo:
+            memo[node_id] = filt.node_matches(node_attrs(graph, node_id))
+        return memo[node_id]
+
+    for pos, node_id, data in iter_nodes(graph, start, filt.slots):
+        if not filt.node_matches(data):
+            continue
+        edges = []
+        if filt.edges:
+            for target, relation in out_edges(graph, node_id):
+                if not filt.edge_matches(relation):
+                    continue
+                if filt.filters_nodes and not target_matches(target):
+                    continue
+                edge = {"from": node_id, "to": target}
+                if relation is not None:
+                    edge["relation"] = relation
+                edges.append(edge)
+        yield pos, filt.project(node_id, data), edges
+
+# ------------------
+# Responses
+# ------------------
+def graph_page(graph, filt, cursor=0, limit=1000):
+    """One page as {"revision", "nodes", "edges", "next_cursor"}; next_cursor is None at the end."""
+    rev = revision(graph)
+    nodes, edges = [], []
+    for pos, node, node_edges in iter_rows(graph, filt, cursor):
+        if len(nodes) == limit:
+            return {"revision": rev, "nodes": nodes, "edges": edges, "next_cursor": str(pos)}
+        nodes.append(node)
+        edges.extend(node_edges)
+    return {"revision": rev, "nodes": nodes, "edges": edges, "next_cursor": None}
+
+def stream_json(graph, filt):
+    """The full {"revision", "nodes": [...], "edges": [...]} document, one chunk per node."""
+    yield '{"revision":%d,"nodes":[' % revision(graph)
+    sep = ""
+    for _, node, _ in iter_rows(graph, filt.nodes_only()):
+        yield sep + json.dumps(node)
+        sep = ","
+    yield '],"edges":['
+    sep = ""
+    if filt.edges:
+        for _, _, node_edges in iter_rows(graph, filt):
+            for edge in node_edges:
+                yield sep + json.dumps(edge)
+                sep = ","
+    yield "]}"
+
+def stream_ndjson(graph, filt, cursor=0, limit=None):
+    """One JSON object per line: each node followed by its outgoing edges.
+
+    The first line is {"kind": "revision"}; with a limit the stream ends with
+    a {"kind": "page"} line carrying the cursor to resume from.
+    """
+    yield json.dumps({"kind": "revision", "revision": revision(graph)}) + "\n"
+    count = 0
+    for pos, node, node_edges in iter_rows(graph, filt, cursor):
+        if limit is not None and count == limit:
+            yield json.dumps({"kind": "page", "next_cursor": str(pos)}) + "\n"
+            return
+        yield json.dumps({"kind": "node", **node}) + "\n"
+        for edge in node_edges:
+            yield json.dumps({"kind": "edge", **edge}) + "\n"
+        count += 1
+    if limit is not None:
+        yield json.dumps({"kind": "page", "next_cursor": None}) + "\n"
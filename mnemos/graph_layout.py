@@ -0,0 +1,217 @@
+# spellbook/mnemos/graph_layout.py
+# Layout views for the graph canvas: a depth-bounded ego-subgraph around a
+# seed node, grouped by type, with server-side coordinates.
+#
+# Nothing here writes to the graph; group and depth live only in the
+# returned view. Views are cached per (revision, seed, depth, layout, limit),
+# so repeated requests against an unchanged graph cost a dict lookup and any
+# mutation (which bumps the revision) retires them.
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+import numpy as np
+
+LAYOUT_CACHE = int(os.getenv("MNEMOS_LAYOUT_CACHE", "64"))
+LAYOUT_NODES = int(os.getenv("MNEMOS_LAYOUT_NODES", "500"))
+LAYOUTS = ("force", "radial")
+RING_SPACING = 220.0
+FORCE_ITERATIONS = 80
+
+def ego_subgraph(graph, seed, max_depth=3, limit=LAYOUT_NODES):
+    """Nodes within max_depth hops of seed (nearest first, at most `limit`) and
+    the edges among them, read straight from the compact columns."""
+    slots, depths = graph.bfs_slots(seed, max_depth)
+    truncated = len(slots) > limit
+    slots, depths = slots[:limit], depths[:limit]
+    edges = graph.induced_edges(slots)
+    local = {s: i for i, s in enumerate(slots.tolist())}
+    ids = graph._ids
+    return {
+        "ids": [ids[s] for s in slots.tolist()],
+        "types": graph.slot_types(slots),
+        "depths": depths,
+        "src": np.array([local[s] for s in graph._src[edges].tolist()], dtype=np.int64),
+        "dst": np.array([local[s] for s in graph._dst[edges].tolist()], dtype=np.int64),
+        "edges": edges,
+        "truncated": truncated,
+    }
+
+# ------------------
+# Coordinates
+# ------------------
+def radial_layout(depths, groups):
+    """Hierarchical rings: the seed at the origin, depth d on ring d, each ring
+    ordered by group so same-type nodes sit together."""
+    n = len(depths)
+    pos = np.zeros((n, 2))
+    order = np.lexsort((groups, depths))
+    ring_of = depths[order]
+    for d in np.unique(ring_of).tolist():
+        if d == 0:
+            continue
+        members = order[ring_of == d]
+        angles = 2 * np.pi * np.arange(len(members)) / len(members)
+        radius = RING_SPACING * d * max(1.0, len(members) / (12.0 * d))
+        pos[members, 0] = radius * np.cos(angles)
+        pos[members, 1] = radius * np.sin(angles)
+    return pos
+
+def force_layout(pos, src, dst, iterations=FORCE_ITERATIONS):
+    """Fruchterman-Reingold from the given start positions, vectorized over all
+    node pairs per step (O(n^2) per step, so keep n to a few thousand)."""
+    n = len(pos)
+    if n < 2:
+        return pos
+    x, y = pos[:, 0].astype(np.float32), pos[:, 1].astype(np.float32)
+    k2 = np.float32((RING_SPACING / 2) ** 2)
+    temperature = RING_SPACING
+    cool = temperature / (iterations + 1)
+    for _ in range(iterations):
+        dx = x[:, None] - x[None, :]
+        dy = y[:, None] - y[None, :]
+        force = k2 / np.maximum(dx * dx + dy * dy, np.float32(1e-2))
+        disp_x, disp_y = (dx * force).sum(axis=1), (dy * force).sum(axis=1)
+        if len(src):
+            ex, ey = x[src] - x[dst], y[src] - y[dst]
+            pull = np.sqrt(ex * ex + ey * ey) / np.sqrt(k2)
+            np.subtract.at(disp_x, src, ex * pull)
+            np.subtract.at(disp_y, src, ey * pull)
+            np.add.at(disp_x, dst, ex * pull)
+            np.add.at(disp_y, dst, ey * pull)
+        length = np.maximum(np.sqrt(disp_x * disp_x + disp_y * disp_y), np.float32(1e-9))
+        step = np.minimum(length, temperature) / length
+        x += disp_x * step
+        y += disp_y * step
+        x[0] = y[0] = 0.0  # keep the seed pinned at the centre
+        temperature -= cool
+    return np.stack([x, y], axis=1).astype(np.float64)
+
+# ------------------
+# Service
+# ------------------
+class LayoutService:
+    """Cached layout views over a CompactGraph.
+
+    `lock` guards reads of the graph (the read side in main); the
+    coordinate computation runs outside it.
+    """
+
+    def __init__(self, lock=None, size=LAYOUT_CACHE):
+        self.lock = lock or nullcontext()
+        self.size = size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        with self.cache_lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def _put(self, key, value):
+        with self.cache_lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+        return value
+
+    def groups(self, graph):
+        """{type: {"index", "count"}} for the whole graph, recomputed once per revision."""
+        rev = graph.graph.get("revision", 0)
+        cached = self._get(("groups", rev))
+        if cached is None:
+            with self.lock:
+                counts = graph.type_counts()
+            ordered = sorted(counts, key=lambda t: (-counts[t], str(t)))
+            cached = self._put(("groups", rev), {
+                t: {"index": i, "count": counts[t]} for i, t in enumerate(ordered)})
+        return cached
+
+    def hub(self, graph):
+        """Default seed: the most connected node."""
+        rev = graph.graph.get("revision", 0)
+        cached = self._get(("hub", rev))
+        if cached is None:
+            with self.lock:
+                if not len(graph):
+                    return None
+                hub = graph._ids[int(np.argmax(graph.degrees()))]
+                if hub is None:  # no edges and slot 0 removed
+                    hub = next(graph.node_slots())[1]
+                cached = self._put(("hub", rev), hub)
+        return cached
+
+    def ego(self, graph, seed, max_depth, limit):
+        rev = graph.graph.get("revision", 0)
+        key = ("ego", rev, seed, max_depth, limit)
+        cached = self._get(key)
+        if cached is None:
+            with self.lock:
+                sub = ego_subgraph(graph, seed, max_depth, limit)
+                sub["nodes"] = [graph.nodes[n].copy() for n in sub["ids"]]
+                sub["relations"] = graph.edge_relations(sub["edges"])
+            cached = self._put(key, sub)
+        return cached
+
+    def view(self, graph, seed=None, max_depth=3, layout="force", limit=LAYOUT_NODES):
+        """Ego-subgraph around seed (default: the hub) with group, depth and x/y
+        per node. Raises KeyError for an unknown seed."""
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout {layout!r}; expected one of {', '.join(LAYOUTS)}")
+        rev = graph.graph.get("revision", 0)
+        seed = seed if seed is not None else self.hub(graph)
+        if seed is None:
+            return {"revision": rev, "seed": None, "layout": layout, "nodes": [], "edges": [],
+                    "groups": {}, "truncated": False}
+        if not graph.has_node(seed):
+            raise KeyError(seed)
+        key = ("view", rev, seed, max_depth, layout, limit)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        groups = self.groups(graph)
+        sub = self.ego(graph, seed, max_depth, limit)
+        group_index = np.array([groups.get(t, {"index": len(groups)})["index"] for t in sub["types"]])
+        pos = radial_layout(sub["depths"], group_index)
+        if layout == "force":
+            pos = force_layout(pos, sub["src"], sub["dst"])
+        pos = np.round(pos, 1).tolist()
+        depths = sub["depths"].tolist()
+        nodes = []
+        for i, node_id in enumerate(sub["ids"]):
+            data = dict(sub["nodes"][i])
+            data.update(id=node_id, group=data.get("type") or "unknown", depth=depths[i],
+                        x=pos[i][0], y=pos[i][1])
+            nodes.append(data)
+        ids = sub["ids"]
+        edges = [{"from": ids[u], "to": ids[v], "relation": rel}
+                 for u, v, rel in zip(sub["src"].tolist(), sub["dst"].tolist(), sub["relations"])]
+        return self._put(key, {
+            "revision": rev, "seed": seed, "layout": layout, "depth": max_depth,
+            "nodes": nodes, "edges": edges, "truncated": sub["truncated"],
+            "groups": {("unknown" if t is None else t): g for t, g in groups.items()},
+        })
+
+    def clear(self):
+        """Forget every view, e.g. when the graph is replaced by /load."""
+        with self.cache_lock:
+            self.cache.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self.cache), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+def get_layout_view(graph, seed=None, max_depth=3, layout="radial", limit=LAYOUT_NODES):
+    """One-off layout view without a shared cache."""
+    return LayoutService().view(graph, seed, max_depth, layout, limit)
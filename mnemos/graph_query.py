@@ -0,0 +1,203 @@
+# spellbook/mnemos/graph_query.py
+# Structured graph queries (POST /api/graph-query): a chain of node matches
+# joined by bounded k-hop traversals, such as conversations dated March 2024
+# -contains_entity-> tasks with priority high.
+#
+# A match is a conjunction of clauses: ids, type, meta equalities (a value or
+# a list of values) and meta ranges ({"since", "until"}, read like the /graph
+# date filter: until "2024-03" takes all of March). The planner estimates each
+# step from the attribute and relation indexes, starts from the most selective
+# one and walks the hops outward from it both ways; a last sweep from the
+# first step keeps only nodes that lie on a complete path.
+
+import time
+import numpy as np
+from attr_index import TOP, index_value, field_value
+from graph_export import GraphFilter
+from graph_store import unique_slots
+
+MAX_HOPS = 4
+MAX_DEPTH = 3
+MAX_LIMIT = 10000
+REVERSE = {"out": "in", "in": "out", "both": "both"}
+# the edge ends a step's nodes sit at, as the far side of a hop and as its start
+FAR_END = {"out": ("dst",), "in": ("src",), "both": ("src", "dst")}
+NEAR_END = {"out": ("src",), "in": ("dst",), "both": ("src", "dst")}
+
+def _listed(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+# ------------------
+# Clauses
+# ------------------
+class Clause:
+    """A field ("type", "meta.<key>") whose value falls in one of `spans`, [low, high) pairs."""
+
+    def __init__(self, field, spans, index):
+        self.field = field
+        self.spans = spans
+        self.indexed = index.covers(field)
+        self.estimate = sum(index.count(field, lo, hi) for lo, hi in spans) if self.indexed else None
+        self.by = field
+
+    def slots(self, graph, index):
+        if not self.indexed:
+            return self.keep(graph, index, graph.live_slots())
+        return np.concatenate([index.lookup(self.field, lo, hi) for lo, hi in self.spans])
+
+    def keep(self, graph, index, slots):
+        if self.indexed:
+            return index.within(self.field, slots, self.spans)
+        nodes, ids = graph.nodes, graph._ids
+        return np.array([s for s in slots.tolist() if self._test(field_value(nodes[ids[s]], self.field))],
+                        dtype=np.int64)
+
+    def _test(self, value):
+        return value is not None and any((lo is None or value >= lo) and (hi is None or value < hi)
+                                         for lo, hi in self.spans)
+
+class IdsClause:
+    def __init__(self, ids, graph):
+        self.members = {graph._index[n] for n in ids if n in graph._index}
+        self.indexed = True
+        self.estimate = len(self.members)
+        self.by = "ids"
+
+    def slots(self, graph, index):
+        return np.fromiter(self.members, dtype=np.int64, count=len(self.members))
+
+    def keep(self, graph, index, slots):
+        return slots[np.isin(slots, self.slots(graph, index))]
+
+class RelationEnds:
+    """Endpoints of the edges of a one-hop traversal: only a starting point,
+    since the traversal itself enforces the edge."""
+
+    def __init__(self, relations, sides, graph):
+        self.relations = relations
+        self.sides = sides   # ("src",), ("dst",) or both
+        self.estimate = graph.relation_count(relations) * len(sides)
+        self.by = "relation:" + ",".join(relations)
+
+    def slots(self, graph, index):
+        src, dst = graph.edge_ends(graph.relation_edges(self.relations))
+        return unique_slots(np.concatenate([src if side == "src" else dst for side in self.sides]))
+
+def compile_match(match, graph, index):
+    """Clauses of a match {"ids", "type", "meta", "range"}."""
+    clauses = []
+    if match.get("ids") is not None:
+        clauses.append(IdsClause(_listed(match["ids"]), graph))
+    if match.get("type") is not None:
+        clauses.append(Clause("type", [(t, t + "\0") for t in map(index_value, _listed(match["type"]))], index))
+    for key, value in (match.get("meta") or {}).items():
+        values = [index_value(v) for v in _listed(value)]
+        clauses.append(Clause(f"meta.{key}", [(v, v + "\0") for v in values], index))
+    for key, bounds in (match.get("range") or {}).items():
+        unknown = set(bounds) - {"since", "until"}
+        if unknown:
+            raise ValueError(f"Unknown range bound(s) for {key}: {', '.join(sorted(unknown))}")
+        since, until = index_value(bounds.get("since")), index_value(bounds.get("until"))
+        clauses.append(Clause(f"meta.{key}", [(since, None if until is None else until + TOP)], index))
+    return clauses
+
+def restrict(graph, index, clauses, slots):
+    """The slots that satisfy every clause: indexed ones first, as vectorized
+    checks, then the rest node by node on what is left."""
+    for clause in sorted(clauses, key=lambda c: float("inf") if c.estimate is None else c.estimate):
+        if not len(slots):
+            break
+        slots = clause.keep(graph, index, slots)
+    return slots
+
+def match_slots(graph, index, clauses, start=None):
+    """Live slots satisfying `clauses`, starting from the given source (a clause
+    or RelationEnds) or else from the most selective clause, or a scan."""
+    if start is None:
+        known = [c for c in clauses if c.estimate is not None]
+        start = min(known, key=lambda c: c.estimate) if known else None
+    slots = graph.live_slots() if start is None else graph.live(start.slots(graph, index))
+    return restrict(graph, index, [c for c in clauses if c is not start], unique_slots(slots))
+
+def filter_slots(graph, index, filt):
+    """Sorted slots of the nodes a /graph type or date filter can match."""
+    match = {"type": sorted(filt.types) if filt.types else None}
+    if filt.since is not None or filt.until is not None:
+        match["range"] = {"date": {"since": filt.since, "until": filt.until}}
+    return match_slots(graph, index, compile_match(match, graph, index))
+
+# ------------------
+# Planning & execution
+# ------------------
+def _hops(traverse):
+    if len(traverse) > MAX_HOPS:
+        raise ValueError(f"At most {MAX_HOPS} hops")
+    hops = []
+    for hop in traverse:
+        direction = hop.get("direction", "out")
+        depth = hop.get("depth", 1)
+        if direction not in REVERSE:
+            raise ValueError(f"Unknown direction: {direction}")
+        if not 1 <= depth <= MAX_DEPTH:
+            raise ValueError(f"depth must be between 1 and {MAX_DEPTH}")
+        relation = hop.get("relation")
+        hops.append((None if relation is None else _listed(relation), direction, depth))
+    return hops
+
+def plan(graph, index, steps, hops):
+    """(anchor step, starting source per step): the step with the smallest
+    estimate, counting the edges of adjacent one-hop traversals as sources."""
+    sources = []
+    for i, clauses in enumerate(steps):
+        options = [c for c in clauses if c.estimate is not None]
+        if i > 0 and hops[i - 1][0] and hops[i - 1][2] == 1:
+            relations, direction, _ = hops[i - 1]
+            options.append(RelationEnds(relations, FAR_END[direction], graph))
+        if i < len(hops) and hops[i][0] and hops[i][2] == 1:
+            relations, direction, _ = hops[i]
+            options.append(RelationEnds(relations, NEAR_END[direction], graph))
+        sources.append(min(options, key=lambda c: c.estimate) if options else None)
+    sizes = [len(graph) if s is None else s.estimate for s in sources]
+    return sizes.index(min(sizes)), sources
+
+def run_query(graph, index, query):
+    """Nodes of the last step of a query {"match", "traverse", "limit", "fields"}
+    that are reached along a full chain, with the plan that found them."""
+    t0 = time.perf_counter()
+    limit = query.get("limit", 100)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    traverse = query.get("traverse") or []
+    hops = _hops(traverse)
+    steps = [compile_match(query.get("match") or {}, graph, index)]
+    steps += [compile_match(hop.get("match") or {}, graph, index) for hop in traverse]
+    anchor, sources = plan(graph, index, steps, hops)
+
+    found = [None] * len(steps)
+    found[anchor] = match_slots(graph, index, steps[anchor], sources[anchor])
+    for i in range(anchor - 1, -1, -1):
+        relations, direction, depth = hops[i]
+        reached = graph.expand_slots(found[i + 1], depth, REVERSE[direction], relations)
+        found[i] = restrict(graph, index, steps[i], reached)
+    for i in range(1, len(steps)):
+        relations, direction, depth = hops[i - 1]
+        reached = graph.expand_slots(found[i - 1], depth, direction, relations)
+        if i <= anchor:
+            found[i] = found[i][np.isin(found[i], reached)]
+        else:
+            found[i] = restrict(graph, index, steps[i], reached)
+
+    result = np.sort(found[-1])
+    project = GraphFilter(fields=query.get("fields")).project
+    ids = graph._ids
+    nodes = [project(ids[s], graph.nodes[ids[s]]) for s in result[:limit].tolist()]
+    return {
+        "nodes": nodes,
+        "total": len(result),
+        "plan": {
+            "anchor": anchor,
+            "steps": [{"start": "scan" if s is None else s.by, "estimate": len(graph) if s is None else s.estimate,
+                       "matched": len(f)} for s, f in zip(sources, found)],
+            "ms": round((time.perf_counter() - t0) * 1000, 2),
+        },
+    }
@@ -0,0 +1,807 @@
+# spellbook/mnemos/graph_store.py
+# Array-backed directed graph with the subset of the NetworkX DiGraph API
+# that mnemos uses.
+#
+# Node ids map to integer slots. Node types and edge relations are interned
+# into int32 columns; the rest of a node's attributes live in a __slots__
+# record. Edges are columnar (source, target, relation) NumPy arrays with a
+# CSR index in each direction. New edges sit in a small pending index until
+# the next CSR rebuild, so inserts stay amortized O(log n).
+#
+# Readers may share the graph across threads. A read that finds the CSR
+# behind re-indexes every edge slot under an internal lock and swaps the new
+# EdgeIndex in whole; only writers compact tombstoned edges (which renumbers
+# them), and traversal scratch space is per thread.
+#
+# Traversal cost: successors()/predecessors() slice one CSR row per hop, and
+# the vectorized bfs_slots() pays a fixed NumPy cost per level. Neither beats
+# a dict-of-dicts per hop on a few-dozen-node walk; bfs_slots overtakes a
+# Python BFS over nx.DiGraph once a traversal reaches roughly 200 nodes (see
+# bench/graph_store_bench.py), and the win here is memory per edge.
+
+import threading
+from collections.abc import MutableMapping
+import numpy as np
+import networkx as nx
+
+def _grow(arr, needed, fill=0):
+    if needed <= len(arr):
+        return arr
+    grown = np.full(max(needed, 2 * len(arr), 1024), fill, dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+def _key(u, v):
+    return (u << 32) | v
+
+def unique_slots(a):
+    """Sorted distinct values of an int array; a sort is far quicker than the
+    hash table np.unique builds for these."""
+    a = np.sort(a)
+    if len(a) < 2:
+        return a
+    keep = np.empty(len(a), dtype=bool)
+    keep[0] = True
+    np.not_equal(a[1:], a[:-1], out=keep[1:])
+    return a[keep]
+
+class EdgeIndex:
+    """CSR over edge slots [0, edges) in both directions, plus the same edges
+    grouped by relation code + 1. Tombstoned edges may be included; readers
+    check _alive."""
+
+    __slots__ = ("edges", "out_indptr", "out_edges", "in_indptr", "in_edges", "rel_indptr", "rel_edges")
+
+    def __init__(self, src, dst, rel, n, n_codes):
+        m = len(src)
+        self.edges = m
+        self.out_edges = np.lexsort((dst, src)).astype(np.int64)
+        self.out_indptr = np.zeros(n + 1, dtype=np.int64)
+        self.out_indptr[1:] = np.cumsum(np.bincount(src, minlength=n))
+        self.in_edges = np.lexsort((src, dst)).astype(np.int64)
+        self.in_indptr = np.zeros(n + 1, dtype=np.int64)
+        self.in_indptr[1:] = np.cumsum(np.bincount(dst, minlength=n))
+        codes = rel + 1
+        self.rel_edges = np.argsort(codes, kind="stable").astype(np.int64)
+        self.rel_indptr = np.zeros(n_codes + 2, dtype=np.int64)
+        self.rel_indptr[1:] = np.cumsum(np.bincount(codes, minlength=n_codes + 1))
+
+class StringTable:
+    """Interned strings: each distinct value is stored once and named by an int."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def value(self, code):
+        return None if code < 0 else self.values[code]
+
+class NodeRecord:
+    __slots__ = ("meta", "extra")
+
+    def __init__(self, meta=None, extra=None):
+        self.meta = meta
+        self.extra = extra
+
+_MISSING = object()
+
+class NodeAttrs(MutableMapping):
+    """Dict-like view of one node's attributes ("type" and "meta" are columnar)."""
+
+    __slots__ = ("graph", "slot")
+
+    def __init__(self, graph, slot):
+        self.graph = graph
+        self.slot = slot
+
+    def _record(self):
+        return self.graph._records[self.slot]
+
+    def __getitem__(self, key):
+        if key == "type":
+            value = self.graph._strings.value(int(self.graph._types[self.slot]))
+        elif key == "meta":
+            value = self._record().meta
+            value = _MISSING if value is None else value
+        else:
+            extra = self._record().extra
+            value = extra.get(key, _MISSING) if extra else _MISSING
+        if value is _MISSING or value is None and key == "type":
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == "type":
+            self.graph._types[self.slot] = self.graph._strings.code(value)
+        elif key == "meta":
+            self._record().meta = value
+        else:
+            record = self._record()
+            if record.extra is None:
+                record.extra = {}
+            record.extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key == "type":
+            self.graph._types[self.slot] = -1
+        elif key == "meta":
+            self._record().meta = None
+        else:
+            del self._record().extra[key]
+
+    def __iter__(self):
+        if self.graph._types[self.slot] >= 0:
+            yield "type"
+        record = self._record()
+        if record.meta is not None:
+            yield "meta"
+        if record.extra:
+            yield from list(record.extra)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """Plain dict of the attributes, read straight from the columns."""
+        graph, record = self.graph, self._record()
+        data = {}
+        code = int(graph._types[self.slot])
+        if code >= 0:
+            data["type"] = graph._strings.value(code)
+        if record.meta is not None:
+            data["meta"] = record.meta
+        if record.extra:
+            data.update(record.extra)
+        return data
+
+    def __repr__(self):
+        return repr(self.copy())
+
+class EdgeAttrs(MutableMapping):
+    """Dict-like view of one edge's attributes ("relation" is columnar)."""
+
+    __slots__ = ("graph", "edge")
+
+    def __init__(self, graph, edge):
+        self.graph = graph
+        self.edge = edge
+
+    def __getitem__(self, key):
+        if key == "relation":
+            value = self.graph._strings.value(int(self.graph._rel[self.edge]))
+            if value is None:
+                raise KeyError(key)
+            return value
+        return self.graph._edge_extra.get(self.edge, {})[key]
+
+    def __setitem__(self, key, value):
+        if key == "relation":
+            code = self.graph._strings.code(value)
+            if self.edge < self.graph._csr.edges and code != self.graph._rel[self.edge]:
+                self.graph._rel_moved.add(self.edge)
+            self.graph._rel[self.edge] = code
+        else:
+            self.graph._edge_extra.setdefault(self.edge, {})[key] = value
+
+    def __delitem__(self, key):
+        if key == "relation":
+            if self.graph._rel[self.edge] < 0:
+                raise KeyError(key)
+            self.graph._rel[self.edge] = -1
+        else:
+            del self.graph._edge_extra[self.edge][key]
+
+    def __iter__(self):
+        if self.graph._rel[self.edge] >= 0:
+            yield "relation"
+        yield from list(self.graph._edge_extra.get(self.edge, ()))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class NodeView:
+    __slots__ = ("graph",)
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __iter__(self):
+        return (n for n in self.graph._ids if n is not None)
+
+    def __len__(self):
+        return len(self.graph._index)
+
+    def __contains__(self, node_id):
+        return node_id in self.graph._index
+
+    def __getitem__(self, node_id):
+        return NodeAttrs(self.graph, self.graph._index[node_id])
+
+    def __call__(self, data=False):
+        if not data:
+            return self
+        return ((n, self[n]) for n in self)
+
+    def items(self):
+        return self(data=True)
+
+class EdgeView:
+    __slots__ = ("graph",)
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __iter__(self):
+        ids = self.graph._ids
+        return ((ids[u], ids[v]) for u, v, _ in self.graph._iter_edges())
+
+    def __len__(self):
+        return self.graph._live_edges
+
+    def __contains__(self, edge):
+        return self.graph.has_edge(*edge)
+
+    def __getitem__(self, edge):
+        u, v = edge
+        e = self.graph._find_edge(self.graph._index[u], self.graph._index[v])
+        if e is None:
+            raise KeyError(edge)
+        return EdgeAttrs(self.graph, e)
+
+    def __call__(self, data=False):
+        if not data:
+            return self
+        ids = self.graph._ids
+        return ((ids[u], ids[v], EdgeAttrs(self.graph, e)) for u, v, e in self.graph._iter_edges())
+
+class AdjacencyView:
+    """`graph.succ[n]` / `graph.pred[n]`: {neighbour: edge attributes}."""
+
+    __slots__ = ("graph", "outgoing")
+
+    def __init__(self, graph, outgoing):
+        self.graph = graph
+        self.outgoing = outgoing
+
+    def __getitem__(self, node_id):
+        g = self.graph
+        slot = g._index[node_id]
+        pairs = g._out(slot) if self.outgoing else g._in(slot)
+        return {g._ids[other]: EdgeAttrs(g, e) for other, e in pairs}
+
+    def __contains__(self, node_id):
+        return node_id in self.graph._index
+
+class CompactGraph:
+    """Directed graph stored in integer-indexed NumPy columns."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.graph = {}                # graph-level attributes, as on nx graphs
+        self._ids = []                 # slot -> node id (None once removed)
+        self._index = {}               # node id -> slot
+        self._records = []             # slot -> NodeRecord
+        self._types = np.full(0, -1, dtype=np.int32)
+        self._live = np.zeros(0, dtype=bool)  # slot -> still holds a node
+        self._strings = StringTable()  # shared by types and relations
+        self._src = np.zeros(0, dtype=np.int32)
+        self._dst = np.zeros(0, dtype=np.int32)
+        self._rel = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._edge_extra = {}          # edge -> rarely used extra attributes
+        self._n_edges = 0              # edge slots in use, tombstones included
+        self._live_edges = 0
+        # CSR over edges [0, _csr.edges); later edges are pending. Edges added
+        # since the last compaction stay in the pending maps even once a read
+        # has re-indexed them
+        self._csr = EdgeIndex(self._src, self._dst, self._rel, 0, 0)
+        self._csr_lock = threading.Lock()
+        self._rel_moved = set()        # indexed edges relabelled since
+        self._pending = {}             # (u << 32 | v) -> edge, for pending edges
+        self._pending_out = {}         # u -> [edge, ...]
+        self._pending_in = {}          # v -> [edge, ...]
+        self._scratch = threading.local()
+
+    # ------------------
+    # NetworkX-style API
+    # ------------------
+    @property
+    def nodes(self):
+        return NodeView(self)
+
+    @property
+    def edges(self):
+        return EdgeView(self)
+
+    @property
+    def succ(self):
+        return AdjacencyView(self, True)
+
+    @property
+    def pred(self):
+        return AdjacencyView(self, False)
+
+    adj = succ
+
+    def __contains__(self, node_id):
+        return node_id in self._index
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self._index)
+
+    def number_of_nodes(self):
+        return len(self._index)
+
+    def number_of_edges(self):
+        return self._live_edges
+
+    def node_slots(self, start=0):
+        """(slot, node_id) for live nodes from slot `start`; slots never move."""
+        ids = self._ids
+        for slot in range(start, len(ids)):
+            if ids[slot] is not None:
+                yield slot, ids[slot]
+
+    def has_node(self, node_id):
+        return node_id in self._index
+
+    def has_edge(self, u, v):
+        if u not in self._index or v not in self._index:
+            return False
+        return self._find_edge(self._index[u], self._index[v]) is not None
+
+    def add_node(self, node_id, **attrs):
+        slot = self._index.get(node_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._ids.append(node_id)
+            self._index[node_id] = slot
+            self._records.append(NodeRecord())
+            self._types = _grow(self._types, slot + 1, fill=-1)
+            self._types[slot] = -1
+            self._live = _grow(self._live, slot + 1, fill=False)
+            self._live[slot] = True
+        view = NodeAttrs(self, slot)
+        for k, v in attrs.items():
+            view[k] = v
+        return slot
+
+    def add_nodes_from(self, nodes, **attrs):
+        for n in nodes:
+            if isinstance(n, tuple):
+                self.add_node(n[0], **{**attrs, **n[1]})
+            else:
+                self.add_node(n, **attrs)
+
+    def add_edge(self, u, v, **attrs):
+        su = self._index.get(u)
+        if su is None:
+            su = self.add_node(u)
+        sv = self._index.get(v)
+        if sv is None:
+            sv = self.add_node(v)
+        e = self._find_edge(su, sv)
+        if e is None:
+            e = self._n_edges
+            self._ensure_edge_capacity(e + 1)
+            self._src[e], self._dst[e], self._rel[e], self._alive[e] = su, sv, -1, True
+            self._n_edges += 1
+            self._live_edges += 1
+            self._pending[_key(su, sv)] = e
+            self._pending_out.setdefault(su, []).append(e)
+            self._pending_in.setdefault(sv, []).append(e)
+        view = EdgeAttrs(self, e)
+        for k, val in attrs.items():
+            view[k] = val
+        churn = len(self._pending) + len(self._rel_moved) + self._n_edges - self._live_edges
+        if churn > max(4096, self._csr.edges // 4):
+            self._build_csr()
+
+    def add_edges_from(self, edges, **attrs):
+        for edge in edges:
+            u, v = edge[0], edge[1]
+            self.add_edge(u, v, **{**attrs, **(edge[2] if len(edge) > 2 else {})})
+
+    def remove_edge(self, u, v):
+        e = self._find_edge(self._index[u], self._index[v])
+        if e is None:
+            raise nx.NetworkXError(f"The edge {u}-{v} is not in the graph")
+        self._kill_edge(e)
+
+    def remove_node(self, node_id):
+        slot = self._index.pop(node_id, None)
+        if slot is None:
+            raise nx.NetworkXError(f"The node {node_id} is not in the graph.")
+        for _, e in self._out(slot) + self._in(slot):
+            if self._alive[e]:
+                self._kill_edge(e)
+        self._ids[slot] = None
+        self._records[slot] = None
+        self._types[slot] = -1
+        self._live[slot] = False
+
+    def remove_nodes_from(self, nodes):
+        for n in list(nodes):
+            if n in self._index:
+                self.remove_node(n)
+
+    def successors(self, node_id):
+        csr, ids = self._csr, self._ids
+        slots = self._adjacent(self._index[node_id], csr, csr.out_indptr, csr.out_edges, self._dst, self._pending_out)
+        return iter([ids[v] for v in slots])
+
+    neighbors = successors
+
+    def predecessors(self, node_id):
+        csr, ids = self._csr, self._ids
+        slots = self._adjacent(self._index[node_id], csr, csr.in_indptr, csr.in_edges, self._src, self._pending_in)
+        return iter([ids[u] for u in slots])
+
+    def out_edges(self, node_id=None, data=False):
+        if node_id is None:
+            return self.edges(data=data)
+        slot = self._index[node_id]
+        if data:
+            return [(node_id, self._ids[v], EdgeAttrs(self, e)) for v, e in self._out(slot)]
+        return [(node_id, self._ids[v]) for v, _ in self._out(slot)]
+
+    def in_edges(self, node_id=None, data=False):
+        if node_id is None:
+            return self.edges(data=data)
+        slot = self._index[node_id]
+        if data:
+            return [(self._ids[u], node_id, EdgeAttrs(self, e)) for u, e in self._in(slot)]
+        return [(self._ids[u], node_id) for u, _ in self._in(slot)]
+
+    def out_degree(self, node_id):
+        csr = self._csr
+        return len(self._adjacent(self._index[node_id], csr, csr.out_indptr, csr.out_edges, self._dst, self._pending_out))
+
+    def in_degree(self, node_id):
+        csr = self._csr
+        return len(self._adjacent(self._index[node_id], csr, csr.in_indptr, csr.in_edges, self._src, self._pending_in))
+
+    def degree(self, node_id):
+        return self.out_degree(node_id) + self.in_degree(node_id)
+
+    # ------------------
+    # Bulk traversal
+    # ------------------
+    def bfs_depths(self, seed, max_depth=3, undirected=True):
+        """{node_id: depth} for nodes within max_depth hops of seed."""
+        slots, depths = self.bfs_slots(seed, max_depth, undirected)
+        ids = self._ids
+        return dict(zip([ids[i] for i in slots.tolist()], depths.tolist()))
+
+    def bfs_slots(self, seed, max_depth=3, undirected=True):
+        """(slots, depths) arrays of nodes within max_depth hops of seed, level by level.
+
+        Expands a whole frontier per step with vectorized CSR gathers; pays
+        off once the walk reaches a couple of hundred nodes.
+        """
+        csr = self._ensure_csr()
+        start = self._index[seed]
+        # Scratch depths reused across this thread's calls; only touched entries are reset
+        depth = getattr(self._scratch, "depth", None)
+        if depth is None or len(depth) < len(self._ids):
+            depth = self._scratch.depth = np.full(len(self._ids), -1, dtype=np.int32)
+        depth[start] = 0
+        frontier = np.array([start], dtype=np.int64)
+        levels = [frontier]
+        for d in range(1, max_depth + 1):
+            found = [self._gather(frontier, csr.out_indptr, csr.out_edges, self._dst)]
+            if undirected:
+                found.append(self._gather(frontier, csr.in_indptr, csr.in_edges, self._src))
+            nxt = unique_slots(np.concatenate(found))
+            nxt = nxt[depth[nxt] < 0]
+            if not len(nxt):
+                break
+            depth[nxt] = d
+            levels.append(nxt)
+            frontier = nxt
+        for level in levels:
+            depth[level] = -1
+        slots = np.concatenate(levels)
+        depths = np.repeat(np.arange(len(levels), dtype=np.int32), [len(level) for level in levels])
+        return slots, depths
+
+    def expand_slots(self, slots, depth=1, direction="out", relations=None):
+        """Slots reachable from `slots` in 1..depth hops ("out", "in" or "both"
+        ways) along edges whose relation is in `relations` (any, when None)."""
+        csr = self._ensure_csr()
+        codes = None if relations is None else self._relation_codes(relations)
+        reached = np.zeros(len(self._ids), dtype=bool)
+        frontier = unique_slots(np.asarray(slots, dtype=np.int64))
+        for _ in range(depth):
+            found = [np.zeros(0, dtype=np.int64)]
+            if direction in ("out", "both"):
+                found.append(self._hop(frontier, csr.out_indptr, csr.out_edges, self._dst, codes))
+            if direction in ("in", "both"):
+                found.append(self._hop(frontier, csr.in_indptr, csr.in_edges, self._src, codes))
+            nxt = unique_slots(np.concatenate(found))
+            nxt = nxt[~reached[nxt]]
+            if not len(nxt):
+                break
+            reached[nxt] = True
+            frontier = nxt
+        return np.flatnonzero(reached)
+
+    def relation_edges(self, relations):
+        """Ids of live edges whose relation is one of `relations`, from the
+        relation index plus the edges added or relabelled since its rebuild."""
+        codes = self._relation_codes(relations)
+        csr = self._csr
+        parts = [csr.rel_edges[csr.rel_indptr[c + 1]:csr.rel_indptr[c + 2]]
+                 for c in codes.tolist() if c + 2 < len(csr.rel_indptr)]
+        pending = np.arange(csr.edges, self._n_edges, dtype=np.int64)
+        parts.append(pending[np.isin(self._rel[csr.edges:self._n_edges], codes)])
+        if self._rel_moved:
+            parts.append(np.fromiter(self._rel_moved, dtype=np.int64, count=len(self._rel_moved)))
+        edges = unique_slots(np.concatenate(parts))
+        return edges[self._alive[edges] & np.isin(self._rel[edges], codes)]
+
+    def relation_count(self, relations):
+        """Upper bound on len(relation_edges(relations)), without gathering them."""
+        codes = self._relation_codes(relations)
+        csr = self._csr
+        indptr = csr.rel_indptr
+        total = sum(int(indptr[c + 2] - indptr[c + 1]) for c in codes.tolist() if c + 2 < len(indptr))
+        pending = np.count_nonzero(np.isin(self._rel[csr.edges:self._n_edges], codes))
+        return total + int(pending) + len(self._rel_moved)
+
+    def edge_ends(self, edges):
+        """(source slots, target slots) of edge ids."""
+        return self._src[edges].astype(np.int64), self._dst[edges].astype(np.int64)
+
+    def live(self, slots):
+        """The slots of an int array that still hold a node."""
+        slots = np.asarray(slots, dtype=np.int64)
+        return slots[self._live[slots]]
+
+    def live_slots(self):
+        return np.flatnonzero(self._live[:len(self._ids)])
+
+    def induced_edges(self, slots):
+        """Edge ids of live edges with both ends in `slots`."""
+        csr = self._ensure_csr()
+        inside = np.zeros(len(self._ids), dtype=bool)
+        inside[slots] = True
+        edges = self._row_edges(np.asarray(slots, dtype=np.int64), csr.out_indptr, csr.out_edges)
+        return edges[inside[self._dst[edges]]]
+
+    def edge_relations(self, edges):
+        return [self._strings.value(c) for c in self._rel[edges].tolist()]
+
+    def slot_types(self, slots):
+        return [self._strings.value(c) for c in self._types[slots].tolist()]
+
+    def degrees(self):
+        """Total degree per slot (removed slots read 0)."""
+        n, m = len(self._ids), self._n_edges
+        alive = self._alive[:m]
+        return (np.bincount(self._src[:m][alive], minlength=n)
+                + np.bincount(self._dst[:m][alive], minlength=n))
+
+    def type_counts(self):
+        """{type: live node count} from the type column; untyped nodes count as None."""
+        codes = self._types[:len(self._ids)]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self._strings.values))
+        result = {self._strings.values[c]: int(k) for c, k in enumerate(counts.tolist()) if k}
+        untyped = len(self) - int(counts.sum())
+        if untyped:
+            result[None] = untyped
+        return result
+
+    def _row_edges(self, frontier, indptr, order):
+        if len(frontier) == 1:
+            # A lone seed (the common first hop) is one CSR slice
+            start, stop = indptr[frontier[0]:frontier[0] + 2].tolist()
+            edges = order[start:stop]
+        else:
+            starts, stops = indptr[frontier], indptr[frontier + 1]
+            lengths = stops - starts
+            total = int(lengths.sum())
+            if not total:
+                return np.zeros(0, dtype=np.int64)
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            edges = order[offsets + np.arange(total)]
+        if self._live_edges < self._n_edges:
+            edges = edges[self._alive[edges]]
+        return edges
+
+    def _gather(self, frontier, indptr, order, ends):
+        return ends[self._row_edges(frontier, indptr, order)].astype(np.int64)
+
+    def _hop(self, frontier, indptr, order, ends, codes):
+        edges = self._row_edges(frontier, indptr, order)
+        if codes is not None:
+            edges = edges[np.isin(self._rel[edges], codes)]
+        return ends[edges].astype(np.int64)
+
+    def _relation_codes(self, relations):
+        codes = self._strings.codes
+        return np.array([codes[r] for r in relations if r in codes], dtype=np.int32)
+
+    # ------------------
+    # Adapters
+    # ------------------
+    def to_networkx(self):
+        graph = nx.DiGraph(**self.graph)
+        graph.add_nodes_from((n, dict(NodeAttrs(self, s))) for s, n in enumerate(self._ids) if n is not None)
+        graph.add_edges_from((self._ids[u], self._ids[v], dict(EdgeAttrs(self, e)))
+                             for u, v, e in self._iter_edges())
+        return graph
+
+    @classmethod
+    def from_networkx(cls, graph):
+        g = cls()
+        g.graph.update(graph.graph)
+        g.add_nodes_from((n, dict(d)) for n, d in graph.nodes(data=True))
+        for u, v, d in graph.edges(data=True):
+            g.add_edge(u, v, **d)
+        return g
+
+    @classmethod
+    def from_arrays(cls, ids, types, metas, sources, targets, relations):
+        """Bulk-build from columns: node ids, type strings, attribute dicts
+        (including "meta"), and parallel edge source/target slots and relations."""
+        g = cls()
+        g._ids = list(ids)
+        g._index = {n: i for i, n in enumerate(g._ids)}
+        g._types = np.array([g._strings.code(t) for t in types], dtype=np.int32)
+        g._live = np.ones(len(g._ids), dtype=bool)
+        g._records = []
+        for data in metas:
+            meta = data.pop("meta", None)
+            g._records.append(NodeRecord(meta, data or None))
+        m = len(sources)
+        g._src = np.asarray(sources, dtype=np.int32)
+        g._dst = np.asarray(targets, dtype=np.int32)
+        g._rel = np.array([g._strings.code(r) for r in relations], dtype=np.int32)
+        g._alive = np.ones(m, dtype=bool)
+        g._n_edges = g._live_edges = m
+        g._build_csr()
+        return g
+
+    # ------------------
+    # Internals
+    # ------------------
+    def _ensure_edge_capacity(self, needed):
+        self._src = _grow(self._src, needed)
+        self._dst = _grow(self._dst, needed)
+        self._rel = _grow(self._rel, needed, fill=-1)
+        self._alive = _grow(self._alive, needed, fill=False)
+
+    def _kill_edge(self, e):
+        self._alive[e] = False
+        self._live_edges -= 1
+        self._edge_extra.pop(e, None)
+        u, v = int(self._src[e]), int(self._dst[e])
+        if self._pending.get(_key(u, v)) == e:
+            del self._pending[_key(u, v)]
+            self._pending_out[u].remove(e)
+            self._pending_in[v].remove(e)
+
+    def _find_edge(self, u, v):
+        e = self._pending.get(_key(u, v))
+        if e is not None:
+            return e
+        csr = self._csr
+        if u + 1 >= len(csr.out_indptr):
+            return None
+        start, stop = csr.out_indptr[u], csr.out_indptr[u + 1]
+        if start == stop:
+            return None
+        row = csr.out_edges[start:stop]
+        i = int(np.searchsorted(self._dst[row], v))
+        if i < len(row) and self._dst[row[i]] == v and self._alive[row[i]]:
+            return int(row[i])
+        return None
+
+    def _row(self, slot, indptr, order, ends):
+        if slot + 1 >= len(indptr):
+            return []
+        start, stop = indptr[slot:slot + 2].tolist()
+        if start == stop:
+            return []
+        row = order[start:stop]
+        row = row[self._alive[row]]
+        return list(zip(ends[row].tolist(), row.tolist()))
+
+    def _adjacent(self, slot, csr, indptr, order, ends, pending):
+        """Live neighbour slots along one CSR row, then any edges added since
+        csr was built. The per-hop path for successors and predecessors: no
+        edge ids, and the pending lists are skipped once a read re-indexed."""
+        if slot + 1 < len(indptr):
+            start, stop = indptr[slot:slot + 2].tolist()
+        else:
+            start = stop = 0
+        if start == stop:
+            slots = []
+        else:
+            row = order[start:stop]
+            if self._live_edges < self._n_edges:
+                row = row[self._alive[row]]
+            slots = ends[row].tolist()
+        if csr.edges < self._n_edges:
+            slots.extend(int(ends[e]) for e in pending.get(slot, ()) if e >= csr.edges)
+        return slots
+
+    def _out(self, slot):
+        csr = self._csr
+        pairs = self._row(slot, csr.out_indptr, csr.out_edges, self._dst)
+        pairs.extend((int(self._dst[e]), e) for e in self._pending_out.get(slot, ()) if e >= csr.edges)
+        return pairs
+
+    def _in(self, slot):
+        csr = self._csr
+        pairs = self._row(slot, csr.in_indptr, csr.in_edges, self._src)
+        pairs.extend((int(self._src[e]), e) for e in self._pending_in.get(slot, ()) if e >= csr.edges)
+        return pairs
+
+    def _iter_edges(self):
+        for slot, node_id in enumerate(self._ids):
+            if node_id is not None:
+                for v, e in self._out(slot):
+                    yield slot, v, e
+
+    def _ensure_csr(self):
+        """The current EdgeIndex, first re-indexing all edge slots if edges or
+        nodes were added since. Safe from concurrent readers: nothing is
+        renumbered, and the new index is published in one assignment."""
+        csr = self._csr
+        if csr.edges == self._n_edges and len(csr.out_indptr) == len(self._ids) + 1:
+            return csr
+        with self._csr_lock:
+            csr = self._csr
+            if csr.edges != self._n_edges or len(csr.out_indptr) != len(self._ids) + 1:
+                m = self._n_edges
+                csr = self._csr = EdgeIndex(self._src[:m], self._dst[:m], self._rel[:m],
+                                            len(self._ids), len(self._strings.values))
+        return csr
+
+    def _build_csr(self):
+        """Drop tombstoned edges and rebuild both CSR indexes over all edges.
+        Writers only: compaction renumbers edges."""
+        m = self._n_edges
+        if self._live_edges < m:
+            keep = np.flatnonzero(self._alive[:m])
+            remap = {int(old): new for new, old in enumerate(keep.tolist())} if self._edge_extra else {}
+            self._src = self._src[keep].copy()
+            self._dst = self._dst[keep].copy()
+            self._rel = self._rel[keep].copy()
+            self._alive = np.ones(len(keep), dtype=bool)
+            self._edge_extra = {remap[e]: d for e, d in self._edge_extra.items()}
+            m = self._n_edges = len(keep)
+        self._csr = EdgeIndex(self._src[:m], self._dst[:m], self._rel[:m], len(self._ids), len(self._strings.values))
+        self._rel_moved = set()
+        self._pending, self._pending_out, self._pending_in = {}, {}, {}
+        # Note: compaction renumbers edges, so EdgeAttrs views taken earlier go stale
+
+def to_networkx(graph):
+    """Return a NetworkX view of any mnemos graph, converting if needed."""
+    return graph.to_networkx() if isinstance(graph, CompactGraph) else graph
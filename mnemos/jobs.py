@@ -0,0 +1,173 @@
+# spellbook/mnemos/jobs.py
+# Persistent import jobs and the shared ledger of extracted messages.
+#
+# Each job lives in JOBS_DIR/<id>/ with its spooled input (export.json) and a
+# job.json snapshot of its state, so it can be inspected, cancelled and
+# resumed after a restart. The ledger records every message whose entities
+# made it into the graph; any job, including a re-submitted export, skips them.
+
+import os
+import json
+import time
+import uuid
+import hashlib
+from contextlib import contextmanager
+
+JOBS_DIR = "../db/jobs"
+LEDGER_PATH = os.path.join(JOBS_DIR, "extracted.ledger")
+ACTIVE = ("queued", "running")
+SAVE_INTERVAL = 1.0
+
+def message_key(conversation_id, message_id, content):
+    """Ledger key of one message: where it came from plus what it said."""
+    raw = f"{conversation_id}\0{message_id}\0{content}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:24]
+
+class Ledger:
+    """Append-only file of keys, loaded into a set on open."""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        torn = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    if not torn:
+                        self.done.add(line[:-1])
+        self.file = open(path, "a")
+        if torn:
+            self.file.write("\n")  # a crash cut the last key short; start on a fresh line
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def __len__(self):
+        return len(self.done)
+
+    def mark_many(self, keys):
+        new = [k for k in keys if k not in self.done]
+        if new:
+            self.done.update(new)
+            self.file.write("".join(k + "\n" for k in new))
+            self.file.flush()
+
+class ImportJob:
+    """State of one import: lifecycle, progress counters and per-stage timings."""
+
+    def __init__(self, store, job_id, kind, progress, **state):
+        self.store = store
+        self.id = job_id
+        self.kind = kind
+        self.progress = progress
+        self.options = state.get("options", {})
+        self.status = state.get("status", "queued")
+        self.error = state.get("error")
+        self.created = state.get("created", time.time())
+        self.started = state.get("started")
+        self.finished = state.get("finished")
+        self.stages = state.get("stages", {})
+        self.runs = state.get("runs", 0)
+        self._saved = 0.0
+
+    @property
+    def dir(self):
+        return os.path.join(self.store.root, self.id)
+
+    @property
+    def source(self):
+        return os.path.join(self.dir, "export.json")
+
+    @contextmanager
+    def stage(self, name, count=1):
+        """Accumulate time spent in a pipeline stage, summed over concurrent workers."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"seconds": 0.0, "count": 0})
+            entry["seconds"] += time.perf_counter() - t0
+            entry["count"] += count
+
+    def transition(self, status, error=None):
+        self.status = status
+        if status == "running":
+            self.started = time.time()
+            self.finished = None
+            self.error = None
+            self.runs += 1
+        elif status not in ACTIVE:
+            self.finished = time.time()
+        if error is not None:
+            self.error = error
+        self.save()
+
+    def to_dict(self):
+        end = self.finished or (time.time() if self.started else None)
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": round(end - self.started, 3) if self.started and end else None,
+            "runs": self.runs,
+            "options": self.options,
+            "progress": self.progress.model_dump(),
+            "stages": {k: {"seconds": round(v["seconds"], 3), "count": v["count"]}
+                       for k, v in self.stages.items()},
+        }
+
+    def save(self, force=True):
+        """Write job.json atomically; with force=False at most once per SAVE_INTERVAL."""
+        now = time.monotonic()
+        if not force and now - self._saved < SAVE_INTERVAL:
+            return
+        self._saved = now
+        path = os.path.join(self.dir, "job.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(path + ".tmp", path)
+
+class JobStore:
+    """All jobs under JOBS_DIR. Jobs that were active when the process died
+    come back as "interrupted" and can be resumed."""
+
+    def __init__(self, progress_cls, root=JOBS_DIR, ledger_path=LEDGER_PATH):
+        self.root = root
+        self.progress_cls = progress_cls
+        self.jobs = {}
+        os.makedirs(root, exist_ok=True)
+        self.ledger = Ledger(ledger_path)
+        for job_id in sorted(os.listdir(root)):
+            path = os.path.join(root, job_id, "job.json")
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                data = json.load(f)
+            data.pop("id", None)
+            job = ImportJob(self, job_id, data.pop("kind", "chatgpt"),
+                            progress_cls(**data.pop("progress", {})), **data)
+            if job.status in ACTIVE:
+                job.status = "interrupted"
+                job.save()
+            self.jobs[job_id] = job
+
+    def create(self, kind="chatgpt", **options):
+        job = ImportJob(self, uuid.uuid4().hex[:12], kind, self.progress_cls(), options=options)
+        os.makedirs(job.dir)
+        job.save()
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def latest(self):
+        return max(self.jobs.values(), key=lambda j: j.created, default=None)
+
+    def list(self):
+        return sorted(self.jobs.values(), key=lambda j: j.created, reverse=True)
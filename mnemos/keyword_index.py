@@ -0,0 +1,152 @@
+import re
+import math
+import heapq
+from collections import Counter
+import numpy as np
+
+TOKEN = re.compile(r"\w+")
+
+def tokenize(text):
+    return TOKEN.findall(str(text).lower())
+
+def node_terms(node_id, data):
+    """Tokens of a node's label, type and meta keys/values."""
+    parts = [data.get("label", node_id), data.get("type", "")]
+    for k, v in (data.get("meta") or {}).items():
+        parts.append(k)
+        parts.append(v)
+    return [t for p in parts for t in tokenize(p)]
+
+class KeywordIndex:
+    """Inverted index over node text with BM25 ranking.
+
+    Posting lists map each term to {node_id: term frequency}. Queries use
+    max-score pruning: once the k-th best score beats the best any
+    remaining term could add, those terms only rescore existing candidates.
+    Very common terms that cannot be pruned are scored with NumPy over a
+    cached array copy of their posting list.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, dense_df=1024):
+        self.k1 = k1
+        self.b = b
+        self.dense_df = dense_df
+        self.postings = {}   # term -> {node_id: tf}
+        self.doc_len = {}    # node_id -> number of tokens
+        self.doc_terms = {}  # node_id -> distinct terms, for removal
+        self.total_len = 0
+        self.docno = {}      # node_id -> slot in the arrays below
+        self.docids = []     # slot -> node_id (None when free)
+        self.free = []
+        self.lens = np.zeros(0, dtype=np.float32)
+        self._dense = {}     # term -> (slots, tfs) for common terms
+        self._graph = None
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def add(self, node_id, data):
+        self.remove(node_id)
+        tokens = node_terms(node_id, data)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[node_id] = tf
+            self._dense.pop(term, None)
+        self.doc_len[node_id] = len(tokens)
+        self.doc_terms[node_id] = tuple(counts)
+        self.total_len += len(tokens)
+        if self.free:
+            slot = self.free.pop()
+            self.docids[slot] = node_id
+        else:
+            slot = len(self.docids)
+            self.docids.append(node_id)
+            if slot >= len(self.lens):
+                grown = np.zeros(max(1024, 2 * len(self.lens)), dtype=np.float32)
+                grown[:len(self.lens)] = self.lens
+                self.lens = grown
+        self.docno[node_id] = slot
+        self.lens[slot] = len(tokens)
+
+    def remove(self, node_id):
+        terms = self.doc_terms.pop(node_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            plist = self.postings[term]
+            del plist[node_id]
+            if not plist:
+                del self.postings[term]
+            self._dense.pop(term, None)
+        self.total_len -= self.doc_len.pop(node_id)
+        slot = self.docno.pop(node_id)
+        self.docids[slot] = None
+        self.free.append(slot)
+
+    def rebuild(self, graph):
+        self.postings, self.doc_len, self.doc_terms, self.total_len = {}, {}, {}, 0
+        self.docno, self.docids, self.free, self._dense = {}, [], [], {}
+        self.lens = np.zeros(0, dtype=np.float32)
+        for node_id in graph.nodes:
+            self.add(node_id, graph.nodes[node_id])
+        self._graph = graph
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_len) - df + 0.5) / (df + 0.5))
+
+    def _dense_postings(self, term):
+        cached = self._dense.get(term)
+        if cached is None:
+            plist = self.postings[term]
+            slots = np.fromiter((self.docno[d] for d in plist), dtype=np.int64, count=len(plist))
+            tfs = np.fromiter(plist.values(), dtype=np.float32, count=len(plist))
+            cached = self._dense[term] = (slots, tfs)
+        return cached
+
+    def search(self, query, k=5):
+        """Return up to k (node_id, score) pairs with a positive BM25 score."""
+        n = len(self.doc_len)
+        terms = [t for t in set(tokenize(query)) if t in self.postings]
+        if not n or not terms:
+            return []
+        k1, b = self.k1, self.b
+        avg_len = self.total_len / n or 1
+        weighted = sorted(((self.idf(t), t) for t in terms), reverse=True)
+        # Upper bound of what the remaining terms can still add
+        bounds = [w * (k1 + 1) for w, _ in weighted]
+        remaining = sum(bounds)
+        scores = {}
+        pruned = False
+        for i, ((w, term), bound) in enumerate(zip(weighted, bounds)):
+            plist = self.postings[term]
+            if not pruned and len(plist) >= self.dense_df:
+                return self._search_dense(scores, weighted[i:], avg_len, k)
+            remaining -= bound
+            if pruned:
+                items = ((d, plist[d]) for d in scores if d in plist)
+            else:
+                items = plist.items()
+            for node_id, tf in items:
+                norm = tf + k1 * (1 - b + b * self.doc_len[node_id] / avg_len)
+                scores[node_id] = scores.get(node_id, 0.0) + w * tf * (k1 + 1) / norm
+            if not pruned and len(scores) >= k:
+                threshold = heapq.nlargest(k, scores.values())[-1]
+                pruned = threshold > remaining
+        return heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+
+    def _search_dense(self, scores, weighted, avg_len, k):
+        """Finish a query over common terms with one vectorized accumulator."""
+        k1, b = self.k1, self.b
+        acc = np.zeros(len(self.docids), dtype=np.float32)
+        if scores:
+            slots = np.fromiter((self.docno[d] for d in scores), dtype=np.int64, count=len(scores))
+            acc[slots] = np.fromiter(scores.values(), dtype=np.float32, count=len(scores))
+        for w, term in weighted:
+            slots, tfs = self._dense_postings(term)
+            norm = tfs + k1 * (1 - b + b * self.lens[slots] / avg_len)
+            acc[slots] += w * tfs * (k1 + 1) / norm
+        k = min(k, len(acc))
+        top = np.argpartition(-acc, k - 1)[:k]
+        top = top[np.argsort(-acc[top])]
+        return [(self.docids[i], float(acc[i])) for i in top if acc[i] > 0]
@@ -0,0 +1,118 @@
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = "../db/llm_cache.sqlite"
+
+class LLMCache:
+    """On-disk cache of chat completions keyed by model, system prompt and content.
+
+    Entries expire after `ttl` seconds; once the stored responses exceed
+    `max_bytes` the least recently used ones are evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=256 * 1024 * 1024, ttl=30 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                size INTEGER,
+                created REAL,
+                last_used REAL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS completions_lru ON completions (last_used)")
+        self.db.commit()
+        self.bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    @staticmethod
+    def key(model, system, content):
+        h = hashlib.sha256()
+        for part in (model, system, content):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, model, system, content):
+        key = self.key(model, system, content)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT response, size, created FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[2] > self.ttl:
+                self.db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self.bytes -= row[1]
+                row = None
+            if row is None:
+                self.misses += 1
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model, system, content, response):
+        key = self.key(model, system, content)
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            old = self.db.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self.bytes += size - (old[0] if old else 0)
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes:
+            rows = self.db.execute(
+                "SELECT key, size FROM completions ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.bytes = 0
+                return
+            self.db.executemany("DELETE FROM completions WHERE key = ?", [(k,) for k, _ in rows])
+            self.bytes -= sum(s for _, s in rows)
+            self.evictions += len(rows)
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM completions")
+            self.db.commit()
+            self.bytes = 0
+
+    def complete(self, fn, model, system, content):
+        """Return a cached response, or call `fn(system, content)` and cache it."""
+        response = self.get(model, system, content)
+        if response is None:
+            response = fn(system, content)
+            self.put(model, system, content, response)
+        return response
+
+    def stats(self):
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -1,21 +1,60 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Any
-import networkx as nx
+from typing import List, Dict, Any, Optional, Union
 import os
 import json
+import time
 import asyncio
+import threading
+from contextlib import nullcontext, contextmanager
 from dotenv import load_dotenv
-from openai import OpenAI
-from meta_sorter import sort_for_commit
+from openai import OpenAI, AsyncOpenAI
+from meta_sorter import resolve_entities, new_report, EntityResolver, HygieneEngine
+from extraction import TokenBucket, call_with_retry, batch_keyed, run_pipeline
+from llm_cache import LLMCache
+from export_stream import iter_conversations, iter_file_chunks, conversation_id, message_parts, message_time
+from jobs import JobStore, message_key
 
-from storage import save_graph, load_graph
+from storage import load_graph, checkpoint, open_snapshot, revision, apply_mutation, MutationLog, WAL_PATH
+from shared_store import SHARED, FOLLOW_INTERVAL, RWLock, FileLock, LogFollower, read_locked
+from metrics import (registry, time_stage, timed_chunks, count_tokens, Instrument, Sampler, profile_path,
+                     STAGE_SECONDS, PROFILING, CONTENT_TYPE)
+from changes import ChangeFeed
+from bulk import parse_items, validate
+from graph_store import CompactGraph
+from graph_export import GraphFilter, graph_page, stream_json, stream_ndjson
+from graph_layout import LayoutService, LAYOUT_NODES
+from attr_index import AttributeIndex
+from graph_query import run_query, filter_slots
+from context_builder import ContextBuilder
+from memory_engine import embedder, embedding_index, keyword_index, retriever, search_graph as semantic_search
 
 # Load environment
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 openai_client = OpenAI(api_key=api_key)
+# Non-blocking client for answers streamed back to the browser
+async_openai_client = AsyncOpenAI(api_key=api_key)
+
+# Extraction pipeline tuning
+EXTRACT_CONCURRENCY = int(os.getenv("MNEMOS_EXTRACT_CONCURRENCY", "8"))
+EXTRACT_BATCH_CHARS = int(os.getenv("MNEMOS_EXTRACT_BATCH_CHARS", "2000"))
+LLM_RPS = float(os.getenv("MNEMOS_LLM_RPS", "8"))
+CHAT_MODEL = "gpt-4"
+RESUME_JOBS = os.getenv("MNEMOS_RESUME_JOBS", "0") == "1"
+# Merge duplicates of each imported batch's entities as they land (opt-in:
+# merges cannot be undone; verify-then-save reports and applies them otherwise)
+RESOLVE_ON_IMPORT = os.getenv("MNEMOS_RESOLVE_ON_IMPORT", "0") == "1"
+# Background hygiene report: seconds between dry runs (0 disables); nodes per
+# lock hold when verify-then-save applies hygiene
+HYGIENE_INTERVAL = float(os.getenv("MNEMOS_HYGIENE_INTERVAL", "30"))
+HYGIENE_BATCH = int(os.getenv("MNEMOS_HYGIENE_BATCH", "2000"))
+# Background embedding backfill: seconds between checks (0 disables)
+EMBED_INTERVAL = float(os.getenv("MNEMOS_EMBED_INTERVAL", "10"))
+
+llm_cache = LLMCache()
 
 # Init app
 app = FastAPI()
@@ -27,8 +66,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory graph
-G = nx.DiGraph()
+# In-memory graph; every mutation bumps its revision, is appended to the
+# write-ahead log and lands in the change feed for delta sync. Readers share
+# graph_lock.read; writers hold mutation_lock, its write side, which with
+# MNEMOS_SHARED=1 also holds the log's file lock and first applies whatever
+# other workers appended (see shared_store)
+G = CompactGraph()
+wal_lock = FileLock(WAL_PATH + ".lock")
+with wal_lock if SHARED else nullcontext():
+    wal = MutationLog()  # drops a torn tail, so never while another worker appends
+follower = LogFollower(WAL_PATH)
+changes = ChangeFeed()
+
+def writer_enter():
+    if SHARED:
+        wal_lock.acquire()
+        wal.reopen()
+        follow_log()
+
+def writer_exit():
+    if SHARED:
+        wal_lock.release()
+
+graph_lock = RWLock(on_write=writer_enter, on_release=writer_exit)
+mutation_lock = graph_lock.write
+# One worker runs hygiene, embedding backfill and job resumption; the others
+# take over if it goes away
+leader_lock = FileLock(os.path.join(os.path.dirname(WAL_PATH), "mnemos.leader"))
+is_leader = not SHARED or leader_lock.try_acquire()
+embedding_index.readonly = not is_leader
+# Blocking index for near-duplicate entity resolution, kept in step with G
+entity_resolver = EntityResolver()
+# Type and meta-key indexes behind filters and /api/graph-query, kept in step with G
+attr_index = AttributeIndex()
+# Nodes touched since the last hygiene run, and the worker that cleans them
+hygiene = HygieneEngine(entity_resolver)
+hygiene_wakeup = threading.Event()
+hygiene_state = {"last": None, "error": None}
+# Embeds queued nodes in batches so searches never wait on a whole graph
+embedding_wakeup = threading.Event()
+embedding_state = {"last": None, "error": None}
+# Cached ego-subgraph layouts for the canvas, keyed by revision
+layouts = LayoutService(lock=graph_lock.read)
+# Query context within a token budget, from cached per-node neighbourhood summaries
+context_builder = ContextBuilder(lock=graph_lock.read)
+# Fused retrieval reads G's edge columns under the same lock
+retriever.lock = graph_lock.read
+
+# After /load of a binary snapshot, /graph and /neighbors are served straight
+# from the memory-mapped file while G is built in the background, and until
+# the first mutation makes the snapshot stale.
+snapshot_view = None
+graph_ready = threading.Event()
+graph_ready.set()
 
 # ------------------
 # Models
@@ -55,52 +145,583 @@ class ImportStatus(BaseModel):
     created_nodes: int = 0
     created_links: int = 0
     errors: int = 0
+    batches: int = 0
+    llm_calls: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    queue_depth: int = 0
+    throughput: float = 0.0
+    skipped: int = 0
+    bytes_read: int = 0
+    bytes_total: int = 0
+    merged_nodes: int = 0
     complete: bool = False
 
 class QueryRequest(BaseModel):
     query: str
     max_results: int = 5
 
-import_status = ImportStatus()
+class NodeMatch(BaseModel):
+    ids: Optional[List[str]] = None
+    type: Optional[Union[str, List[str]]] = None
+    meta: Dict[str, Any] = {}                            # key -> value, or a list of values
+    range: Dict[str, Dict[str, Optional[str]]] = {}      # key -> {"since", "until"}
+
+class Hop(BaseModel):
+    relation: Optional[Union[str, List[str]]] = None
+    direction: str = "out"                               # out, in or both
+    depth: int = 1
+    match: NodeMatch = NodeMatch()
+
+class GraphQuery(BaseModel):
+    match: NodeMatch = NodeMatch()
+    traverse: List[Hop] = []
+    limit: int = 100
+    fields: Optional[str] = None
+
+# Import jobs, persisted under ../db/jobs, and their running tasks
+jobs = JobStore(ImportStatus)
+job_tasks = {}
 
 # ------------------
 # Core Routes
 # ------------------
+def log_mutation(op, **fields):
+    """Record a mutation already applied to G: revision, WAL entry and change feed."""
+    log_mutations([{"op": op, **fields}])
+
+def log_mutations(entries):
+    """Record mutations already applied to G (under mutation_lock) as one
+    revision and one WAL line, and bring the search and entity indexes up to date."""
+    with mutation_lock:
+        rev = revision(G) + 1
+        G.graph["revision"] = rev
+        if len(entries) == 1:
+            wal.append(rev=rev, **entries[0])
+        else:
+            wal.append("batch", rev=rev, ops=entries)
+        record_mutations(rev, entries)
+
+def record_mutations(rev, entries):
+    """Change feed, caches and indexes for mutations applied to G as `rev`,
+    here or (in shared mode) by another worker."""
+    global snapshot_view
+    snapshot_view = None
+    touched = []
+    for entry in entries:
+        op = entry["op"]
+        # a later entry of the same batch may have removed what this one added
+        if op in ("add_node", "remove_node"):
+            node_id = entry["id"]
+            live = op == "add_node" and G.has_node(node_id)
+            touched.append(("node", node_id, G.nodes[node_id].copy() if live else None))
+        else:
+            key = (entry["source"], entry["target"])
+            live = op == "add_edge" and G.has_edge(*key)
+            touched.append(("edge", key, dict(G.edges[key]) if live else None))
+    changes.record_many(rev, touched)
+    endpoints = [n for entry in entries
+                 for n in ((entry["id"],) if "id" in entry else (entry["source"], entry["target"]))]
+    context_builder.invalidate(endpoints)
+    hygiene.mark(n for n in endpoints if G.has_node(n))
+    added = []
+    for kind, node_id, data in touched:
+        if kind != "node":
+            continue
+        if data is None:
+            embedding_index.remove(node_id)
+            keyword_index.remove(node_id)
+            entity_resolver.remove(node_id)
+        else:
+            if embedding_index.update(node_id, data):
+                embedding_wakeup.set()
+            keyword_index.add(node_id, data)
+            attr_index.add(G, node_id, data)
+            added.append((node_id, data))
+    entity_resolver.add_many(added)
+
 @app.post("/node")
 def create_node(data: NodeCreate):
-    if data.label in G.nodes:
-        raise HTTPException(status_code=400, detail="Node already exists")
-    G.add_node(data.label, type=data.type, meta=data.meta)
+    graph_ready.wait()
+    with mutation_lock:
+        if data.label in G.nodes:
+            raise HTTPException(status_code=400, detail="Node already exists")
+        G.add_node(data.label, type=data.type, meta=data.meta)
+        log_mutation("add_node", id=data.label, attrs={"type": data.type, "meta": data.meta})
     return {"message": "Node created", "id": data.label}
 
 @app.post("/link")
 def create_link(data: LinkCreate):
-    if not G.has_node(data.source) or not G.has_node(data.target):
-        raise HTTPException(status_code=404, detail="Missing node(s)" )
-    G.add_edge(data.source, data.target, relation=data.relation)
+    graph_ready.wait()
+    with mutation_lock:
+        if not G.has_node(data.source) or not G.has_node(data.target):
+            raise HTTPException(status_code=404, detail="Missing node(s)" )
+        G.add_edge(data.source, data.target, relation=data.relation)
+        log_mutation("add_edge", source=data.source, target=data.target, attrs={"relation": data.relation})
     return {"message": "Link created", "from": data.source, "to": data.target}
 
+@app.post("/bulk")
+async def bulk_upsert(request: Request, atomic: bool = True):
+    """Upsert many nodes and edges in one batch: a JSON array of items, an
+    object with "nodes"/"edges" arrays, or NDJSON (one item per line).
+
+    The batch is applied as one revision and one WAL entry, with a result
+    per item. If atomic and any item is invalid nothing is applied (422).
+    """
+    body = await request.body()
+    try:
+        items = parse_items(body, request.headers.get("content-type", ""))
+    except ValueError as e:  # includes JSONDecodeError
+        raise HTTPException(status_code=400, detail=f"Invalid bulk body: {e}")
+    await asyncio.to_thread(graph_ready.wait)
+    result = await asyncio.to_thread(apply_bulk, items, atomic)
+    if not result["applied"] and result["errors"]:
+        raise HTTPException(status_code=422, detail=result)
+    return JSONResponse(result)  # plain dicts; skips jsonable_encoder on large batches
+
+def apply_bulk(items, atomic=True):
+    """Validate and apply node/edge upserts; nodes first, then edges."""
+    with mutation_lock:
+        ops, errors = validate(items, G.has_node)
+        results = [None] * len(ops)
+        for i, message in errors.items():
+            results[i] = {"index": i, "status": "error", "detail": message}
+        if atomic and errors:
+            for i, r in enumerate(results):
+                if r is None:
+                    results[i] = {"index": i, "status": "skipped"}
+            return {"applied": False, "revision": revision(G), "errors": len(errors), "results": results}
+        entries = []
+        for phase in ("node", "edge"):
+            for i, op in enumerate(ops):
+                if i in errors or op[0] != phase:
+                    continue
+                if phase == "node":
+                    _, label, node_type, meta = op
+                    existed = G.has_node(label)
+                    attrs = {}
+                    if node_type is not None:
+                        attrs["type"] = node_type
+                    if meta is not None or not existed:
+                        # meta is merged into an existing node's meta, not replaced
+                        current = G.nodes[label].get("meta") if existed else None
+                        attrs["meta"] = {**(current or {}), **(meta or {})}
+                    G.add_node(label, **attrs)
+                    entries.append({"op": "add_node", "id": label, "attrs": attrs})
+                    results[i] = {"index": i, "status": "updated" if existed else "created", "id": label}
+                else:
+                    _, source, target, relation = op
+                    existed = G.has_edge(source, target)
+                    G.add_edge(source, target, relation=relation)
+                    entries.append({"op": "add_edge", "source": source, "target": target,
+                                    "attrs": {"relation": relation}})
+                    results[i] = {"index": i, "status": "updated" if existed else "created",
+                                  "from": source, "to": target}
+        if entries:
+            log_mutations(entries)
+        return {"applied": bool(entries), "revision": revision(G), "errors": len(errors), "results": results}
+
 @app.get("/graph")
-def get_graph():
-    nodes = [{"id": n, **G.nodes[n]} for n in G.nodes]
-    edges = [{"from": u, "to": v, **G.edges[u, v]} for u, v in G.edges]
-    return {"nodes": nodes, "edges": edges}
+def get_graph(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    type: Optional[str] = None,
+    relation: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None,
+    edges: bool = True,
+    format: str = "json",
+):
+    """Nodes and edges, optionally paged (cursor/limit), filtered and projected.
+
+    Without a limit the whole graph is streamed rather than built in memory;
+    format=ndjson streams one node or edge per line.
+    """
+    graph = snapshot_view
+    if graph is None:
+        graph_ready.wait()
+        graph = G
+    try:
+        start = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    filt = GraphFilter(type, relation, since, until, fields, edges)
+    if graph is G and filt.filters_nodes:
+        with graph_lock.read:
+            filt.slots = filter_slots(G, attr_index, filt).tolist()
+    # streams take the read lock per batch of chunks, so writers are not held off until the end
+    if format == "ndjson":
+        chunks = read_locked(stream_ndjson(graph, filt, start, limit), graph_lock.read)
+        return StreamingResponse(timed_chunks(chunks, "serialize"), media_type="application/x-ndjson")
+    if limit is not None:
+        with time_stage("serialize"), graph_lock.read:
+            return JSONResponse(graph_page(graph, filt, start, limit))
+    chunks = read_locked(stream_json(graph, filt), graph_lock.read)
+    return StreamingResponse(timed_chunks(chunks, "serialize"), media_type="application/json")
+
+@app.get("/graph/changes")
+def get_graph_changes(since: int):
+    """Nodes and edges added, modified or removed after revision `since`.
+
+    410 means the history no longer reaches back that far (or the graph was
+    reloaded) and the client should re-fetch /graph.
+    """
+    delta = changes.since(since)
+    if delta is None:
+        raise HTTPException(status_code=410, detail={"message": "Resync required", "revision": changes.revision})
+    return delta
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/graph/events")
+async def graph_events(request: Request, since: int):
+    """Server-sent events: a "changes" event per batch of deltas, "resync" when stale."""
+    async def events():
+        rev = since
+        while not await request.is_disconnected():
+            current = await asyncio.to_thread(changes.wait, rev, 15)
+            if current == rev:
+                yield ": keepalive\n\n"
+                continue
+            delta = changes.since(rev)
+            if delta is None:
+                yield sse("resync", {"revision": current})
+                return
+            yield sse("changes", delta)
+            rev = delta["revision"]
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.get("/neighbors/{node_id}")
+def get_neighbors(node_id: str):
+    view = snapshot_view
+    if view is not None:
+        if node_id not in view:
+            raise HTTPException(status_code=404, detail="Node not found")
+        out, into = view.successors(node_id), view.predecessors(node_id)
+    else:
+        graph_ready.wait()
+        with graph_lock.read:
+            if not G.has_node(node_id):
+                raise HTTPException(status_code=404, detail="Node not found")
+            out = [(v, d.get("relation")) for v, d in G.succ[node_id].items()]
+            into = [(u, d.get("relation")) for u, d in G.pred[node_id].items()]
+    return {
+        "id": node_id,
+        "out": [{"id": v, "relation": r} for v, r in out],
+        "in": [{"id": u, "relation": r} for u, r in into],
+    }
+
+@app.post("/api/graph-query")
+def graph_query(data: GraphQuery):
+    """Nodes matching a chain of filters joined by k-hop traversals, e.g.
+    {"match": {"type": "conversation", "range": {"date": {"since": "2024-03", "until": "2024-03"}}},
+     "traverse": [{"relation": "contains_entity", "match": {"type": "task", "meta": {"priority": "high"}}}]}
+    returns the high-priority tasks of March's conversations, with the plan used."""
+    graph_ready.wait()
+    try:
+        with time_stage("graph_query"), graph_lock.read:
+            return {"revision": revision(G), **run_query(G, attr_index, data.model_dump())}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/graph/layout")
+def get_layout(seed: Optional[str] = None, depth: int = 2, layout: str = "force", limit: int = LAYOUT_NODES):
+    """Ego-subgraph within `depth` hops of seed (default: the most connected
+    node) with per-node group, depth and x/y coordinates. Read-only and cached
+    until the next mutation."""
+    graph_ready.wait()
+    try:
+        return layouts.view(G, seed, max(0, min(depth, 6)), layout, max(1, min(limit, 5000)))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Node not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/save")
 def save():
-    return save_graph(G)
+    graph_ready.wait()
+    return save_checkpoint()
+
+def save_checkpoint(**kwargs):
+    # readers may go on, but the log must not be appended to while it is compacted
+    with time_stage("save"), mutation_lock if SHARED else graph_lock.read:
+        result = checkpoint(G, wal, **kwargs)
+    embedding_index.persist()
+    return result
 
 @app.get("/load")
 def load():
+    global snapshot_view
+    graph_ready.wait()
+    # in shared mode no worker appends while the snapshot and log are read
+    with mutation_lock if SHARED else nullcontext():
+        follower.reset()
+        view = open_snapshot(wal)
+        if view is None:
+            reload_graph()
+            return {"message": "Graph loaded", "revision": revision(G)}
+    snapshot_view = view
+    changes.reset(revision(view))
+    graph_ready.clear()
+    threading.Thread(target=materialize_graph, args=(view,), daemon=True).start()
+    return {"message": "Graph loaded", "revision": revision(view), "nodes": len(view), "materializing": True}
+
+def reload_graph():
+    global G, snapshot_view
+    with time_stage("load"):
+        G = load_graph()
+        index_graph(G)
+    snapshot_view = None
+    changes.reset(revision(G))
+
+def index_graph(graph):
+    embedding_index.sync(graph)
+    embedding_wakeup.set()
+    keyword_index.rebuild(graph)
+    entity_resolver.rebuild(graph)
+    attr_index.rebuild(graph)
+    hygiene.dirty.clear()
+    layouts.clear()
+    context_builder.clear()
+    retriever.clear()
+
+def materialize_graph(view):
     global G
-    G = load_graph()
-    return {"message": "Graph loaded"}
+    try:
+        with time_stage("load"):
+            graph = view.to_compact()
+            index_graph(graph)
+        G = graph
+    finally:
+        graph_ready.set()
+
+@app.post("/verify-then-save")
+def verify_then_save(full: bool = False):
+    """Clean the nodes touched since the last hygiene run, then make the log
+    durable. full=true rescans the whole graph and writes a snapshot."""
+    graph_ready.wait()
+    report = run_hygiene(full=full)
+    result = save_checkpoint(compact_every=0) if full else save_checkpoint()
+    return {"message": "Graph sorted and saved.", "revision": revision(G),
+            "compacted": result["compacted"], "hygiene": summarize(report)}
+
+# ------------------
+# Shared store
+# ------------------
+def follow_log():
+    """Apply what other workers appended to the log since the last look.
+    Runs as the only writer in this process."""
+    if follower.file is None or not graph_ready.is_set():
+        return  # not loaded yet, or a snapshot is still materializing
+    rev = revision(G)
+    for entry in follower.read():
+        if entry.get("rev", 0) <= rev:
+            continue  # ours, or already in the snapshot we loaded
+        if entry["rev"] != rev + 1:
+            follower.reset()  # missed part of the log: start over from disk
+            return reload_graph()
+        apply_mutation(G, entry)
+        G.graph["revision"] = rev = entry["rev"]
+        wal.entries += 1
+        record_mutations(rev, entry["ops"] if entry["op"] == "batch" else [entry])
+
+def follow():
+    graph_ready.wait()
+    with graph_lock.exclusive:
+        follow_log()
+
+class FollowLog:
+    """ASGI middleware: catch up with the log before serving a request, so
+    a write acknowledged by one worker is seen by the next read on any other."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and follower.changed():
+            await asyncio.to_thread(follow)
+        await self.app(scope, receive, send)
+
+if SHARED:
+    app.add_middleware(FollowLog)
+
+def follow_worker():
+    """Keep an idle worker current for change-feed subscribers, and take over
+    as leader when the old one exits."""
+    while True:
+        time.sleep(FOLLOW_INTERVAL)
+        try:
+            if follower.changed():
+                follow()
+            if not is_leader and leader_lock.try_acquire():
+                become_leader()
+        except Exception as e:
+            print(f"⚠️ Following the mutation log failed: {e}")
+
+def become_leader():
+    global is_leader
+    is_leader = True
+    with graph_lock.read:
+        embedding_index.readonly = False
+        embedding_index.load()
+        embedding_index.sync(G)
+    embedding_wakeup.set()
+    if HYGIENE_INTERVAL > 0:
+        threading.Thread(target=hygiene_worker, daemon=True).start()
+    if EMBED_INTERVAL > 0:
+        threading.Thread(target=embedding_worker, daemon=True).start()
+
+@app.on_event("startup")
+async def start_shared_store():
+    """Each worker loads the graph itself, then follows the shared log."""
+    if not SHARED:
+        return
+    await asyncio.to_thread(load)
+    threading.Thread(target=follow_worker, daemon=True).start()
+
+# ------------------
+# Hygiene
+# ------------------
+def run_hygiene(full=False, dry_run=False):
+    """Hygiene over the dirty region (or the whole graph), HYGIENE_BATCH nodes
+    per hold of the mutation lock so writers are not stalled."""
+    report = new_report(dry_run)
+    if full:
+        nodes = list(G.nodes)
+        for start in range(0, len(nodes), HYGIENE_BATCH):
+            apply_hygiene(nodes[start:start + HYGIENE_BATCH], dry_run, report)
+        return report
+    if dry_run:
+        return apply_hygiene(None, True, report)
+    # bounded by the backlog at the start: nodes dirtied meanwhile wait for the next run
+    for _ in range(max(1, -(-len(hygiene.dirty) // HYGIENE_BATCH))):
+        apply_hygiene(None, False, report)
+    return report
+
+def apply_hygiene(nodes, dry_run, report):
+    ops = []
+    with graph_lock.read if dry_run else mutation_lock:
+        hygiene.run(G, nodes, ops, dry_run, limit=None if dry_run else HYGIENE_BATCH, report=report)
+        if ops:
+            log_mutations(ops)
+    return report
+
+def summarize(report):
+    return {**report, "removed": len(report["isolated"]) + len(report["empty"]),
+            "merged": sum(len(m["merged"]) for m in report["merges"])}
+
+def hygiene_tick():
+    """Dry-run the dirty region and keep the report under "last". Nothing is
+    removed or merged here: a node created a moment ago is still unlinked and
+    empty, so only an explicit verify-then-save applies hygiene."""
+    rev = revision(G)
+    if not hygiene.dirty or (hygiene_state["last"] or {}).get("revision") == rev:
+        return
+    with time_stage("hygiene"):
+        report = run_hygiene(dry_run=True)
+    hygiene_state["last"] = {**summarize(report), "revision": rev, "finished": time.time()}
+
+def hygiene_worker():
+    while True:
+        hygiene_wakeup.wait(HYGIENE_INTERVAL)
+        hygiene_wakeup.clear()
+        graph_ready.wait()
+        try:
+            hygiene_tick()
+            hygiene_state["error"] = None
+        except Exception as e:
+            hygiene_state["error"] = str(e)
+
+@app.on_event("startup")
+async def start_hygiene_worker():
+    if HYGIENE_INTERVAL > 0 and is_leader:
+        threading.Thread(target=hygiene_worker, daemon=True).start()
+
+@app.get("/api/hygiene")
+def get_hygiene(full: bool = False):
+    """Dry-run report of what the next hygiene run would remove and merge."""
+    graph_ready.wait()
+    return {"dirty": len(hygiene.dirty), "report": summarize(run_hygiene(full=full, dry_run=True)),
+            "last": hygiene_state["last"], "error": hygiene_state["error"]}
+
+@app.post("/api/hygiene/run")
+def trigger_hygiene():
+    """Wake the background worker; its dry-run report shows up under "last"."""
+    if HYGIENE_INTERVAL <= 0:
+        raise HTTPException(status_code=409, detail="Background hygiene is disabled")
+    hygiene_wakeup.set()
+    return {"scheduled": True, "dirty": len(hygiene.dirty)}
+
+# ------------------
+# Embeddings
+# ------------------
+def embedding_worker():
+    while True:
+        embedding_wakeup.wait(EMBED_INTERVAL)
+        embedding_wakeup.clear()
+        try:
+            if not embedding_index.requeue_missing():
+                embedding_index.persist()  # what searches embedded since the last pass
+                continue
+            started = time.time()
+            with time_stage("embed_backfill"):
+                embedded = embedding_index.backfill()
+            embedding_state["last"] = {"embedded": embedded, "seconds": round(time.time() - started, 3),
+                                       "finished": time.time()}
+            embedding_state["error"] = None
+        except Exception as e:
+            embedding_state["error"] = str(e)
 
-@app.post("verify-then-save")
-def verify_then_save():
-    sort_for_commit(G)
-    save_graph(G)
-    return {"message": "Graph sorted and saved."}
+@app.on_event("startup")
+async def start_embedding_worker():
+    if EMBED_INTERVAL > 0 and is_leader:
+        threading.Thread(target=embedding_worker, daemon=True).start()
+
+@app.on_event("shutdown")
+def persist_embeddings():
+    embedding_index.persist()
+
+@app.get("/api/embeddings")
+def get_embeddings():
+    """Backfill progress of the vector index and embedding service counters."""
+    return {**embedding_index.stats(), "service": embedder.stats(),
+            "last": embedding_state["last"], "error": embedding_state["error"]}
+
+@app.post("/api/embeddings/backfill")
+def trigger_backfill(retry_missing: bool = False):
+    """Wake the backfill worker; retry_missing=true also re-queues failed nodes now."""
+    if EMBED_INTERVAL <= 0:
+        raise HTTPException(status_code=409, detail="Background embedding is disabled")
+    if retry_missing:
+        embedding_index.requeue_missing(force=True)
+    embedding_wakeup.set()
+    return {"scheduled": True, **embedding_index.stats()}
+
+class ResolveRequest(BaseModel):
+    nodes: Optional[List[str]] = None
+    dry_run: bool = False
+
+def resolve_nodes(nodes=None, dry_run=False):
+    """Merge near-duplicates of `nodes` (default: the whole graph) into one survivor each."""
+    ops = []
+    with mutation_lock:
+        merges = resolve_entities(G, entity_resolver, nodes, ops, dry_run)
+        if ops:
+            log_mutations(ops)
+    return merges
+
+@app.post("/api/resolve-entities")
+def resolve_entities_route(data: ResolveRequest):
+    """Find near-duplicate entities and merge them (or just report with dry_run)."""
+    graph_ready.wait()
+    merges = resolve_nodes(data.nodes, data.dry_run)
+    return {"merges": merges, "merged": sum(len(m["merged"]) for m in merges),
+            "dry_run": data.dry_run, "revision": revision(G)}
 
 # ------------------
 # Entity Extraction
@@ -108,14 +729,7 @@ def verify_then_save():
 @app.post("/api/process-chatgpt-message")
 async def process_chatgpt_message(data: ChatGPTMessage):
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": entity_prompt()},
-                {"role": "user", "content": data.content}
-            ]
-        )
-        raw = response.choices[0].message.content
+        raw = await asyncio.to_thread(cached_completion, entity_prompt(), data.content)
         try:
             entities = json.loads(raw.strip())
             return {"entities": entities}
@@ -126,14 +740,84 @@ async def process_chatgpt_message(data: ChatGPTMessage):
 
 @app.post("/api/batch-process-chatgpt")
 async def batch_process_chatgpt(data: ConversationImport):
-    global import_status
-    import_status = ImportStatus(total=len(data.conversations))
-    asyncio.create_task(process_conversations(data.conversations))
-    return {"message": "Started", "total": len(data.conversations)}
+    await asyncio.to_thread(graph_ready.wait)
+    job = jobs.create()
+    with job.stage("upload"):
+        with open(job.source, "w") as f:
+            json.dump(data.conversations, f)
+    start_job(job)
+    return {"message": "Started", "total": len(data.conversations), "job_id": job.id}
+
+@app.post("/api/chatgpt-upload")
+async def upload_chatgpt_export(request: Request, fresh: bool = False):
+    """Import a conversations.json export sent as the raw request body.
+
+    The body is spooled into a new job's directory and parsed one
+    conversation at a time, so memory stays flat however large the export
+    is. Messages already extracted by any job are skipped unless fresh=true.
+    """
+    await asyncio.to_thread(graph_ready.wait)
+    job = jobs.create(fresh=fresh)
+    with job.stage("upload"):
+        with open(job.source, "wb") as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+    start_job(job)
+    return {"message": "Started", "job_id": job.id, "bytes": os.path.getsize(job.source)}
 
 @app.get("/api/chatgpt-import-status")
 async def get_import_status():
-    return import_status
+    """Progress of the most recent import job."""
+    job = jobs.latest()
+    return job.progress if job else ImportStatus(complete=True)
+
+@app.get("/api/jobs")
+async def list_jobs():
+    return [job.to_dict() for job in jobs.list()]
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress counters and per-stage timings of one import job."""
+    return find_job(job_id).to_dict()
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = find_job(job_id)
+    task = job_tasks.get(job_id)
+    if task is None or task.done():
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    task.cancel()
+    return {"message": "Cancelling", "job_id": job_id}
+
+@app.post("/api/jobs/{job_id}/resume")
+async def resume_job(job_id: str):
+    """Run a cancelled, failed or interrupted job again; extracted messages are skipped."""
+    job = find_job(job_id)
+    if job_id in job_tasks and not job_tasks[job_id].done():
+        raise HTTPException(status_code=409, detail="Job is already running")
+    if job.status == "complete":
+        raise HTTPException(status_code=409, detail="Job is already complete")
+    if not os.path.exists(job.source):
+        raise HTTPException(status_code=410, detail="Job input is no longer available")
+    start_job(job)
+    return {"message": "Resumed", "job_id": job_id}
+
+@app.on_event("startup")
+async def resume_interrupted_jobs():
+    if RESUME_JOBS and is_leader:
+        for job in jobs.list():
+            if job.status == "interrupted" and os.path.exists(job.source):
+                start_job(job)
+
+def find_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/llm-cache")
+def get_llm_cache_stats():
+    return llm_cache.stats()
 
 # ------------------
 # Query & GPT Answer
@@ -141,33 +825,71 @@ async def get_import_status():
 @app.post("/api/query")
 async def query_knowledge_graph(data: QueryRequest):
     try:
-        nodes = search_graph(data.query, data.max_results)
-        context = format_knowledge_for_gpt(nodes)
-        response = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": f"""You are Orin, a memory assistant. Use this graph context:
+        system, sources, stats = await asyncio.to_thread(prepare_query, data)
+        answer = "".join([token async for token in answer_tokens(system, data.query)])
+        return {"answer": answer, "sources": sources, "context": stats}
+    except Exception as e:
+        return {"error": str(e)}
+
+@app.post("/api/query/stream")
+async def stream_query(data: QueryRequest):
+    """Server-sent events: "sources" as soon as retrieval is done, then one
+    "token" event per answer fragment, then "done" (or "error")."""
+    async def events():
+        started = time.monotonic()
+        first_token = None
+        try:
+            system, sources, stats = await asyncio.to_thread(prepare_query, data)
+            yield sse("sources", {"sources": sources, "context": stats})
+            async for token in answer_tokens(system, data.query):
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                yield sse("token", {"text": token})
+            yield sse("done", {"first_token_s": None if first_token is None else round(first_token, 3),
+                               "total_s": round(time.monotonic() - started, 3)})
+        except Exception as e:
+            yield sse("error", {"error": str(e)})
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def prepare_query(data):
+    """Search hits, budgeted context and the answer prompt. Blocking: run in a thread."""
+    graph_ready.wait()
+    with time_stage("search"):
+        nodes = semantic_search(data.query, G, data.max_results)
+    with time_stage("context"):
+        context, stats = context_builder.build(G, nodes, data.query, keyword_index.idf)
+    system = f"""You are Orin, a memory assistant. Use this graph context:
 
 {context}
 
-Answer the user’s question below using the knowledge above. If uncertain, say so."""},
-                {"role": "user", "content": data.query}
-            ]
-        )
-        answer = response.choices[0].message.content
-        return {
-            "answer": answer,
-            "sources": [{"id": n["id"], "label": n["label"], "type": n["type"]} for n in nodes]
-        }
-    except Exception as e:
-        return {"error": str(e)}
+Answer the user’s question below using the knowledge above. If uncertain, say so."""
+    sources = [{"id": n["id"], "label": n["label"], "type": n.get("type")} for n in nodes]
+    return system, sources, stats
+
+async def answer_tokens(system, query):
+    """A cached answer in one piece, else tokens as the model produces them
+    (cached once the answer is complete)."""
+    cached = await asyncio.to_thread(llm_cache.get, CHAT_MODEL, system, query)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    started = time.perf_counter()
+    with time_stage("llm"):
+        async for token in stream_completion(system, query):
+            if not parts:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_first_token")
+            parts.append(token)
+            yield token
+    await asyncio.to_thread(llm_cache.put, CHAT_MODEL, system, query, "".join(parts))
 
 # ------------------
 # Internals
 # ------------------
 def entity_prompt():
     return """
-You are an entity extraction assistant. Given a message, identify projects, tasks, concepts, or technologies. 
+You are an entity extraction assistant. Given a message (or several messages separated by ---), identify projects, tasks, concepts, or technologies. 
 Respond with an array of objects like:
 [
   {"label": "Project X", "type": "project", "meta": {"desc": "machine learning pipeline"}},
@@ -176,22 +898,88 @@ Respond with an array of objects like:
 If no entities are found, return an empty array.
 """
 
-async def process_conversations(conversations):
-    global import_status
-    for convo in conversations:
+def chat_completion(system, content, model=CHAT_MODEL):
+    with time_stage("llm"):
+        response = openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": content}
+            ]
+        )
+    count_tokens(model, response.usage)
+    return response.choices[0].message.content
+
+async def stream_completion(system, content, model=CHAT_MODEL):
+    stream = await async_openai_client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": content}
+        ],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    async for chunk in stream:
+        if chunk.usage:
+            count_tokens(model, chunk.usage)  # the last chunk, with no choices
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def cached_completion(system, content, model=CHAT_MODEL):
+    return llm_cache.complete(
+        lambda s, c: chat_completion(s, c, model), model, system, content
+    )
+
+def parse_entities(raw):
+    """The entity list of an extraction answer; ValueError unless it is a
+    JSON array of objects."""
+    entities = json.loads(raw.strip())
+    if not isinstance(entities, list) or not all(isinstance(e, dict) for e in entities):
+        raise ValueError("Extraction answer is not a list of entities")
+    return entities
+
+def add_entities(title, entities, status):
+    for e in entities:
         try:
+            create_node(NodeCreate(
+                label=e.get("label", "Unnamed"),
+                type=e.get("type", "concept"),
+                meta=e.get("meta", {})
+            ))
+            status.created_nodes += 1
+        except HTTPException:
+            pass
+        try:
+            create_link(LinkCreate(
+                source=title,
+                target=e.get("label", "Unnamed"),
+                relation="contains_entity"
+            ))
+            status.created_links += 1
+        except:
+            status.errors += 1
+    if RESOLVE_ON_IMPORT:
+        merges = resolve_nodes([e.get("label", "Unnamed") for e in entities])
+        status.merged_nodes += sum(len(m["merged"]) for m in merges)
+
+def conversation_jobs(conversations, status, ledger=None):
+    """Create conversation nodes and yield one (state, keys, prompt) job per message batch.
+
+    Messages whose key is already in the ledger are skipped.
+    """
+    for index, convo in enumerate(conversations):
+        try:
+            cid = conversation_id(convo, index)
             title = convo.get("title", "Unnamed Conversation")
             mapping = convo.get("mapping", {})
-            messages = [
-                m for k, m in mapping.items()
-                if m.get("message", {}).get("content", {}).get("parts")
-            ]
-            messages.sort(key=lambda x: x.get("create_time", ""))
+            messages = [(k, m) for k, m in mapping.items() if message_parts(m)]
+            messages.sort(key=lambda x: message_time(x[1]))
             if not messages:
-                import_status.processed += 1
+                status.processed += 1
                 continue
 
-            date = messages[0].get("create_time", "").split("T")[0] if messages else ""
+            date = message_time(messages[0][1]).split("T")[0]
 
             try:
                 create_node(NodeCreate(
@@ -199,81 +987,216 @@ async def process_conversations(conversations):
                     type="conversation",
                     meta={"source": "ChatGPT", "date": date, "messageCount": len(messages)}
                 ))
-                import_status.created_nodes += 1
+                status.created_nodes += 1
             except HTTPException:
                 pass
 
-            for msg in messages:
+            contents = []
+            for k, msg in messages:
                 if msg["message"]["author"]["role"] != "user":
                     continue
-                content = "\n".join(msg["message"]["content"]["parts"])
-                if len(content) < 10:
-                    continue
-
-                try:
-                    response = openai_client.chat.completions.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": entity_prompt()},
-                            {"role": "user", "content": content}
-                        ]
-                    )
-                    raw = response.choices[0].message.content
-                    try:
-                        entities = json.loads(raw.strip())
-                        for e in entities:
-                            try:
-                                create_node(NodeCreate(
-                                    label=e.get("label", "Unnamed"),
-                                    type=e.get("type", "concept"),
-                                    meta=e.get("meta", {})
-                                ))
-                                import_status.created_nodes += 1
-                            except HTTPException:
-                                pass
-                            try:
-                                create_link(LinkCreate(
-                                    source=title,
-                                    target=e.get("label", "Unnamed"),
-                                    relation="contains_entity"
-                                ))
-                                import_status.created_links += 1
-                            except:
-                                import_status.errors += 1
-                    except:
-                        import_status.errors += 1
-                except:
-                    import_status.errors += 1
-
-            import_status.processed += 1
+                content = "\n".join(p for p in msg["message"]["content"]["parts"] if isinstance(p, str))
+                if len(content) >= 10:
+                    key = message_key(cid, msg.get("id", k), content)
+                    if ledger is not None and key in ledger:
+                        status.skipped += 1
+                    else:
+                        contents.append((key, content))
+            batches = list(batch_keyed(contents, EXTRACT_BATCH_CHARS))
         except:
-            import_status.errors += 1
-            import_status.processed += 1
-    import_status.complete = True
-    save()
-
-def search_graph(query, max_results=5):
-    terms = query.lower().split()
-    nodes = [{"id": n, **G.nodes[n]} for n in G.nodes]
-    scored = []
-    for node in nodes:
-        blob = f"{node['label']} {node['type']} " + " ".join(
-            f"{k} {v}" for k, v in node.get("meta", {}).items()
-        )
-        score = sum(1 for t in terms if t in blob.lower())
-        scored.append((node, score))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return [n for n, s in scored[:max_results] if s > 0]
-
-def format_knowledge_for_gpt(nodes):
-    if not nodes:
-        return "No relevant nodes found."
-    lines = []
-    for n in nodes:
-        lines.append(f"Node: {n['label']} ({n['type']})")
-        if n.get("meta"):
-            lines.extend([f"- {k}: {v}" for k, v in n["meta"].items()])
-    return "\n".join(lines)
+            status.errors += 1
+            status.processed += 1
+            continue
+
+        if not batches:
+            status.processed += 1
+            continue
+        state = {"title": title, "remaining": len(batches)}
+        for keys, batch in batches:
+            yield state, keys, batch
+
+async def process_conversations(conversations, llm=None, status=None, job=None):
+    """Extract entities from an iterable of conversations (a list or a lazy stream).
+
+    With a job, progress and stage timings go to the job and extracted
+    messages are recorded in (and skipped via) the shared ledger.
+    """
+    llm = llm or chat_completion
+    status = job.progress if job else status or ImportStatus()
+    ledger = jobs.ledger if job and not job.options.get("fresh") else None
+    job_stage = job.stage if job else lambda name, count=1: nullcontext()
+    bucket = llm_bucket()
+    started = time.monotonic()
+    # the graph, the ledger and the conversation stream are written from worker threads, one at a time
+    graph_writes = threading.Lock()
+
+    @contextmanager
+    def stage(name, count=1):
+        with time_stage(f"import_{name}"), job_stage(name, count):
+            yield
+
+    def on_retry():
+        status.retries += 1
+
+    def on_depth(depth):
+        status.queue_depth = depth
+
+    def store(title, entities, keys):
+        with graph_writes:
+            add_entities(title, entities, status)
+            if job:
+                jobs.ledger.mark_many(keys)
+
+    async def extract(item):
+        state, keys, text = item
+        status.in_flight += 1
+        try:
+            system = entity_prompt()
+            with stage("cache"):
+                raw = await asyncio.to_thread(llm_cache.get, CHAT_MODEL, system, text)
+            fresh = raw is None
+            if fresh:
+                with stage("rate_limit"):
+                    await bucket.acquire()
+                with stage("llm"):
+                    raw = await call_with_retry(llm, system, text, on_retry=on_retry)
+                status.llm_calls += 1
+            entities = parse_entities(raw)
+            if fresh:
+                # only a usable answer is cached, so a retry asks the model again
+                await asyncio.to_thread(llm_cache.put, CHAT_MODEL, system, text, raw)
+            try:
+                with stage("graph"):
+                    await asyncio.to_thread(store, state["title"], entities, keys)
+            except Exception:
+                status.errors += 1
+        except Exception:
+            status.errors += 1
+        finally:
+            status.in_flight -= 1
+            status.batches += 1
+            state["remaining"] -= 1
+            if state["remaining"] == 0:
+                status.processed += 1
+            status.throughput = round(status.batches / (time.monotonic() - started), 2)
+            if job:
+                job.save(force=False)
+
+    def next_job(items):
+        with graph_writes:
+            return next(items, None)
+
+    async def pull(items):
+        """Advance the job generator (parsing, conversation nodes) off the event loop."""
+        while True:
+            item = await asyncio.to_thread(next_job, items)
+            if item is None:
+                return
+            yield item
+
+    try:
+        await run_pipeline(pull(conversation_jobs(conversations, status, ledger)), extract,
+                           concurrency=EXTRACT_CONCURRENCY, on_depth=on_depth)
+    finally:
+        status.complete = True
+        await asyncio.to_thread(save)
+    return status
+
+# ------------------
+# Import jobs
+# ------------------
+_buckets = {}
+
+def llm_bucket():
+    """One token bucket shared by every running import."""
+    if LLM_RPS not in _buckets:
+        _buckets[LLM_RPS] = TokenBucket(LLM_RPS)
+    return _buckets[LLM_RPS]
+
+def start_job(job, llm=None):
+    job.progress = ImportStatus()
+    job.transition("queued")
+    job_tasks[job.id] = asyncio.create_task(run_job(job, llm))
+    return job
+
+def stream_conversations(job):
+    """Conversations parsed lazily from the job's export, timed as the "parse" stage."""
+    def on_read(n):
+        job.progress.bytes_read += n
+
+    job.progress.bytes_total = os.path.getsize(job.source)
+    convos = iter_conversations(iter_file_chunks(job.source, on_read=on_read))
+    while True:
+        with time_stage("import_parse"), job.stage("parse"):
+            convo = next(convos, None)
+        if convo is None:
+            return
+        job.progress.total += 1
+        yield convo
+
+async def run_job(job, llm=None):
+    job.transition("running")
+    try:
+        await process_conversations(stream_conversations(job), llm=llm, job=job)
+    except asyncio.CancelledError:
+        job.transition("cancelled")
+        raise
+    except Exception as e:
+        job.transition("failed", error=str(e))
+    else:
+        job.transition("complete")
+
+# ------------------
+# Metrics & profiling
+# ------------------
+def cache_stats():
+    return {"llm": llm_cache.stats(), "retrieval": retriever.stats(),
+            "layout": layouts.stats(), "context": context_builder.stats()}
+
+def per_cache(key):
+    return lambda: [({"cache": name}, stats[key]) for name, stats in cache_stats().items()]
+
+registry.collect("mnemos_graph_nodes", "Nodes in the in-memory graph", lambda: G.number_of_nodes())
+registry.collect("mnemos_graph_edges", "Edges in the in-memory graph", lambda: G.number_of_edges())
+registry.collect("mnemos_graph_revision", "Revision of the in-memory graph", lambda: revision(G))
+registry.collect("mnemos_wal_entries", "Mutation log entries since the last snapshot", lambda: wal.entries)
+registry.collect("mnemos_hygiene_dirty", "Nodes waiting for the next hygiene run", lambda: len(hygiene.dirty))
+registry.collect("mnemos_embeddings", "Nodes by embedding state",
+                 lambda: [({"state": k}, v) for k, v in embedding_index.stats().items()])
+registry.collect("mnemos_embedding_service_total", "Embedding service counters",
+                 lambda: [({"counter": k}, v) for k, v in embedder.stats().items() if isinstance(v, int)],
+                 kind="counter")
+registry.collect("mnemos_cache_hits_total", "Cache hits", per_cache("hits"), kind="counter")
+registry.collect("mnemos_cache_misses_total", "Cache misses", per_cache("misses"), kind="counter")
+registry.collect("mnemos_cache_hit_ratio", "Cache hits over lookups", per_cache("hit_rate"))
+registry.collect("mnemos_import_in_flight", "Extraction batches awaiting the LLM",
+                 lambda: sum(j.progress.in_flight for j in jobs.list() if j.id in job_tasks))
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of this process's metrics."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.get("/debug/profile")
+def sample_profile(seconds: float = 10):
+    """Sample every thread for `seconds` (say, during an import) and return
+    folded stacks for flamegraph.pl or speedscope."""
+    if not PROFILING:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (MNEMOS_PROFILING=1)")
+    sampler = Sampler(ignore={threading.get_ident()}).start()
+    time.sleep(max(0.0, min(seconds, 300)))
+    return PlainTextResponse(sampler.stop().folded())
+
+@app.get("/debug/profiles/{name}")
+def get_profile(name: str):
+    """Folded stacks of a request sent with X-Mnemos-Profile: 1 (named in its response header)."""
+    path = profile_path(name) if PROFILING else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
+
+# outermost, so the latency covers every other middleware
+app.add_middleware(Instrument)
 
 # ------------------
 # Launch
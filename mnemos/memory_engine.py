@@ -2,23 +2,33 @@ import os
 import json
 from openai import OpenAI
 from dotenv import load_dotenv
+from embedding_index import EmbeddingIndex, INDEX_PATH
+from ann_index import IVFFlatIndex
+from keyword_index import KeywordIndex
+from context_builder import ContextBuilder
+from retrieval import HybridRetriever
+from embeddings import EmbeddingService, make_backend, EMBED_BACKEND
+from metrics import time_stage
 
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
+ANN_NPROBE = int(os.getenv("MNEMOS_ANN_NPROBE", "8"))
 
 openai_client = OpenAI(api_key=api_key)
+embedder = EmbeddingService(make_backend(EMBED_BACKEND, openai_client))
 
-def get_embedding(text: str) -> list:
-    try:
-        response = openai_client.embeddings.create(
-            input=text,
-            model="text-embedding-ada-002"
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error getting embedding: {e}")
-        return [0] * 1536
+def get_embedding(text: str):
+    """Vector for one text, or None when it could not be embedded."""
+    with time_stage("embed"):
+        return embedder.embed(text)
+
+# Each backend gets its own index: vectors from different models do not mix
+_index_path = INDEX_PATH if EMBED_BACKEND == "openai" else f"{INDEX_PATH}.{EMBED_BACKEND}"
+embedding_index = EmbeddingIndex(embedder, path=_index_path,
+                                 ann=IVFFlatIndex(_index_path + ".ann", nprobe=ANN_NPROBE))
+keyword_index = KeywordIndex()
+retriever = HybridRetriever(keyword_index, embedding_index, get_embedding)
 
 def cosine_similarity(vec1: list, vec2: list) -> float:
     dot_product = sum(a * b for a, b in zip(vec1, vec2))
@@ -28,55 +38,20 @@ def cosine_similarity(vec1: list, vec2: list) -> float:
         return 0
     return dot_product / (magnitude1 * magnitude2)
 
-def fallback_keyword_search(query: str, nodes: list, max_results=5) -> list:
-    terms = query.lower().split()
-    scored = []
-    for node in nodes:
-        text = f"{node['label'].lower()} {node['type'].lower()}"
-        if node.get("meta"):
-            text += " " + " ".join(f"{k} {str(v)}".lower() for k, v in node["meta"].items())
-        score = sum(1 for term in terms if term in text)
-        scored.append((node, score))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return [n for n, s in scored[:max_results] if s > 0]
+def fallback_keyword_search(query: str, graph, max_results=5) -> list:
+    if keyword_index._graph is not graph:
+        keyword_index.rebuild(graph)
+    hits = keyword_index.search(query, max_results)
+    return [{"id": n, "label": n, **graph.nodes[n]} for n, _ in hits if n in graph]
 
 def search_graph(query: str, graph, max_results=5) -> list:
-    all_nodes = [{"id": n, **graph.nodes[n]} for n in graph.nodes]
-    if not all_nodes:
+    """Fused keyword, vector and graph-proximity hits (see retrieval.py)."""
+    if graph.number_of_nodes() == 0:
         return []
-    try:
-        query_embedding = get_embedding(query)
-        scored = []
-        for node in all_nodes:
-            text = f"{node['label']} ({node['type']})"
-            if node.get("meta"):
-                meta_str = "; ".join(f"{k}: {v}" for k, v in node["meta"].items())
-                text += f" | {meta_str}"
-            node_embedding = get_embedding(text)
-            similarity = cosine_similarity(query_embedding, node_embedding)
-            scored.append((node, similarity))
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return [n for n, _ in scored[:max_results]]
-    except Exception as e:
-        print(f"Semantic search error: {e}")
-        return fallback_keyword_search(query, all_nodes, max_results)
+    hits = retriever.search(graph, query, max_results)
+    with retriever.lock:
+        return [{"id": n, "label": n, **graph.nodes[n]} for n, _, _ in hits if n in graph]
 
-def format_knowledge_for_gpt(nodes: list, graph) -> str:
-    if not nodes:
-        return "No relevant information found in your memory."
-    parts = []
-    for node in nodes:
-        entry = f"Node: {node['label']} (Type: {node['type']})\n"
-        if node.get("meta"):
-            entry += "Metadata:\n" + "\n".join(f"- {k}: {v}" for k, v in node["meta"].items()) + "\n"
-        connections = []
-        for u, v, data in graph.out_edges(node['id'], data=True):
-            t_node = graph.nodes[v]
-            connections.append(f"- Related to {v} ({t_node.get('type', 'unknown')}) via {data.get('relation', 'link')}")
-        for u, v, data in graph.in_edges(node['id'], data=True):
-            s_node = graph.nodes[u]
-            connections.append(f"- {u} ({s_node.get('type', 'unknown')}) is related via {data.get('relation', 'link')}")
-        if connections:
-            entry += "Connections:\n" + "\n".join(connections) + "\n"
-        parts.append(entry)
-    return "\n\n".join(parts)
+def format_knowledge_for_gpt(nodes: list, graph, query: str = "") -> str:
+    context, _ = ContextBuilder().build(graph, nodes, query, keyword_index.idf)
+    return context
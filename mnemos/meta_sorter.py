@@ -1,28 +1,346 @@
-def prune_disconnected_nodes(graph):
-    to_remove = [n for n in graph.nodes if graph.degree(n) == 0]
-    graph.remove_nodes_from(to_remove)
-
-def remove_empty_nodes(graph):
-    to_remove = []
-    for node in graph.nodes:
-        meta = graph.nodes[node].get("meta", {})
-        if not meta or all(v in ["", None] for v in meta.values()):
-            to_remove.append(node)
-    graph.remove_nodes_from(to_remove)
-
-def deduplicate_nodes(graph):
-    seen = {}
-    to_remove = []
-    for node in list(graph.nodes):
-        label = graph.nodes[node].get("label", node).lower()
-        if label in seen:
-            to_remove.append(node)
+import re
+import time
+import zlib
+import unicodedata
+import numpy as np
+
+# ------------------
+# Entity resolution
+# ------------------
+# Candidate duplicates come from two blocks, so no pass compares all pairs:
+#   - exact: nodes sharing a canonical key ("React", "React.js", "ReactJS" -> "react";
+#     "+" and "#" are kept, so "C", "C#" and "C++" stay apart)
+#   - fuzzy: MinHash LSH over character trigrams of the key, verified by
+#     trigram Jaccard similarity ("Postgres" ~ "PostgreSQL") between keys of
+#     similar length whose words are not a subset of one another, so a name
+#     absorbs neither a longer one that contains it ("Kubernetes" and
+#     "Kubernetes API") nor its words reordered
+# Both must share a type ("Next.js" the technology is not "Next" the task),
+# and fuzzy ones their digits and symbols too ("GPT-3" and "GPT-4" stay apart).
+
+NOISE_TOKENS = {"the"}
+PROTECTED_TYPES = {"conversation"}
+FUZZY_THRESHOLD = 0.7
+FUZZY_LENGTH_RATIO = 0.8  # shorter key / longer key
+MIN_FUZZY_LEN = 5
+NUM_PERM = 48
+BANDS = 12
+_MARKS = re.compile(r"[^0-9+#]")
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(0)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+_ROWS = NUM_PERM // BANDS
+# band key = one 64-bit mix of the band's rows, offset per band
+_MIX = _rng.integers(1, 1 << 63, _ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.integers(0, 1 << 63, BANDS, dtype=np.uint64)
+
+def label_tokens(label):
+    """Lowercase ASCII alphanumeric and "+"/"#" runs of a label, noise tokens
+    dropped (unless that leaves nothing)."""
+    text = unicodedata.normalize("NFKD", str(label)).encode("ascii", "ignore").decode().lower()
+    tokens = re.findall(r"[a-z0-9]+|[+#]+", text)
+    return [t for t in tokens if t not in NOISE_TOKENS] or tokens
+
+def canonical_key(label):
+    """The label's tokens run together, with a trailing "js" dropped."""
+    key = "".join(label_tokens(label))
+    if key.endswith("js") and len(key) > 4:
+        key = key[:-2]
+    return key
+
+def trigrams(key):
+    return frozenset(key[i:i + 3] for i in range(max(1, len(key) - 2)))
+
+def jaccard(a, b):
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter) if a or b else 0.0
+
+def minhash_bands(grams):
+    """BANDS band keys of a NUM_PERM MinHash signature over the trigram set."""
+    return minhash_bands_many([grams])[0]
+
+def minhash_bands_many(gram_sets, chunk=4096):
+    """minhash_bands for many sets at once, hashing chunk sets per NumPy pass."""
+    out = []
+    for start in range(0, len(gram_sets), chunk):
+        sets = gram_sets[start:start + chunk]
+        h = np.array([zlib.crc32(g.encode("utf-8")) for gs in sets for g in gs], dtype=np.uint64)
+        offsets = np.cumsum([0] + [len(gs) for gs in sets[:-1]])
+        sig = np.minimum.reduceat((np.outer(_A, h) + _B[:, None]) % _PRIME, offsets, axis=1)
+        bands = (sig.T.reshape(len(sets), BANDS, _ROWS) * _MIX).sum(axis=2) ^ _BAND_SALT
+        out.extend(bands.tolist())
+    return out
+
+class EntityResolver:
+    """Incremental blocking index over node labels for duplicate detection."""
+
+    def __init__(self, threshold=FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self.keys = {}      # node -> canonical key
+        self.grams = {}     # node -> trigram set
+        self.words = {}     # node -> token set, for fuzzy matching
+        self.types = {}     # node -> type
+        self.bands = {}     # node -> LSH band keys
+        self.by_key = {}    # canonical key -> {node}
+        self.buckets = {}   # band key -> {node}
+
+    def rebuild(self, graph):
+        self.__init__(self.threshold)
+        self.add_many((n, graph.nodes[n]) for n in graph.nodes)
+        return self
+
+    def add(self, node_id, data):
+        self.remove(node_id)
+        if self._index(node_id, data):
+            self._bucket(node_id, minhash_bands(self.grams[node_id]))
+
+    def add_many(self, items):
+        """add() for (node_id, data) pairs, hashing their signatures in bulk."""
+        fuzzy = []
+        for node_id, data in items:
+            self.remove(node_id)
+            if self._index(node_id, data):
+                fuzzy.append(node_id)
+        for n, bands in zip(fuzzy, minhash_bands_many([self.grams[n] for n in fuzzy])):
+            self._bucket(n, bands)
+
+    def _index(self, node_id, data):
+        """Index the canonical key; True if the node also takes part in fuzzy matching."""
+        node_type = data.get("type")
+        if node_type in PROTECTED_TYPES:
+            return False
+        label = data.get("label", node_id)
+        key = canonical_key(label)
+        if not key:
+            return False
+        self.keys[node_id] = key
+        self.types[node_id] = node_type
+        self.by_key.setdefault(key, set()).add(node_id)
+        if len(key) < MIN_FUZZY_LEN:
+            return False
+        self.grams[node_id] = trigrams(key)
+        self.words[node_id] = frozenset(label_tokens(label))
+        return True
+
+    def _bucket(self, node_id, bands):
+        # fuzzy matches need equal digits and symbols, so only those share buckets
+        salt = zlib.crc32(_MARKS.sub("", self.keys[node_id]).encode())
+        bands = [band ^ salt for band in bands]
+        self.bands[node_id] = bands
+        for band in bands:
+            self.buckets.setdefault(band, set()).add(node_id)
+
+    def remove(self, node_id):
+        key = self.keys.pop(node_id, None)
+        if key is None:
+            return
+        self.types.pop(node_id, None)
+        self.grams.pop(node_id, None)
+        self.words.pop(node_id, None)
+        self.by_key[key].discard(node_id)
+        if not self.by_key[key]:
+            del self.by_key[key]
+        for band in self.bands.pop(node_id, ()):
+            self.buckets[band].discard(node_id)
+            if not self.buckets[band]:
+                del self.buckets[band]
+
+    def candidates(self, node_id):
+        found = set(self.by_key.get(self.keys.get(node_id), ()))
+        for band in self.bands.get(node_id, ()):
+            found |= self.buckets[band]
+        found.discard(node_id)
+        return found
+
+    def similar(self, a, b):
+        if self.types[a] != self.types[b]:
+            return False
+        if self.keys[a] == self.keys[b]:
+            return True
+        if a not in self.grams or b not in self.grams:
+            return False
+        if _MARKS.sub("", self.keys[a]) != _MARKS.sub("", self.keys[b]):
+            return False
+        ka, kb = self.keys[a], self.keys[b]
+        if min(len(ka), len(kb)) < FUZZY_LENGTH_RATIO * max(len(ka), len(kb)):
+            return False
+        wa, wb = self.words[a], self.words[b]
+        if wa <= wb or wb <= wa:  # words added to a name, or reordered
+            return False
+        ga, gb = self.grams[a], self.grams[b]
+        # |A ∩ B| <= min size, so the size ratio bounds the similarity
+        if min(len(ga), len(gb)) < self.threshold * max(len(ga), len(gb)):
+            return False
+        return jaccard(ga, gb) >= self.threshold
+
+    def duplicates(self, nodes=None):
+        """Groups of duplicate nodes (each of size > 1) touching `nodes` (default: all)."""
+        parent = {}
+
+        def find(x):
+            while parent.get(x, x) != x:
+                parent[x] = parent.get(parent[x], parent[x])
+                x = parent[x]
+            return x
+
+        checked = set()
+        for a in (self.keys if nodes is None else [n for n in nodes if n in self.keys]):
+            checked.add(a)
+            for b in self.candidates(a):
+                if b not in checked and find(a) != find(b) and self.similar(a, b):
+                    parent.setdefault(b, b)
+                    parent[find(a)] = find(b)
+        groups = {}
+        for n in parent:
+            groups.setdefault(find(n), set()).add(n)
+        return [g for g in groups.values() if len(g) > 1]
+
+def choose_survivor(graph, group):
+    """The most connected node, then the shortest label, then alphabetical."""
+    return min(group, key=lambda n: (-graph.degree(n), len(str(n)), str(n)))
+
+def merge_nodes(graph, survivor, duplicates, ops=None):
+    """Fold duplicates into survivor: meta is combined (survivor wins conflicts,
+    merged labels are kept as aliases) and edges are rewired to the survivor."""
+    data = graph.nodes[survivor]
+    meta = dict(data.get("meta") or {})
+    aliases = list(meta.get("aliases", []))
+    for d in duplicates:
+        for k, v in (graph.nodes[d].get("meta") or {}).items():
+            if k == "aliases":
+                aliases.extend(a for a in v if a not in aliases)
+            elif meta.get(k) in ("", None):
+                meta[k] = v
+        if d not in aliases:
+            aliases.append(d)
+    meta["aliases"] = aliases
+    data["meta"] = meta
+    if "type" not in data and any("type" in graph.nodes[d] for d in duplicates):
+        data["type"] = next(graph.nodes[d]["type"] for d in duplicates if "type" in graph.nodes[d])
+    if ops is not None:
+        ops.append({"op": "add_node", "id": survivor, "attrs": dict(data)})
+
+    group = set(duplicates) | {survivor}
+    for d in duplicates:
+        rewired = [(survivor, v, attrs) for _, v, attrs in graph.out_edges(d, data=True)]
+        rewired += [(u, survivor, attrs) for u, _, attrs in graph.in_edges(d, data=True)]
+        for u, v, attrs in rewired:
+            u, v = (survivor if u in group else u), (survivor if v in group else v)
+            if u == v or graph.has_edge(u, v):
+                continue
+            graph.add_edge(u, v, **dict(attrs))
+            if ops is not None:
+                ops.append({"op": "add_edge", "source": u, "target": v, "attrs": dict(attrs)})
+    for d in duplicates:
+        graph.remove_node(d)
+        if ops is not None:
+            ops.append({"op": "remove_node", "id": d})
+
+def resolve_entities(graph, resolver=None, nodes=None, ops=None, dry_run=False):
+    """Find and merge near-duplicate nodes; returns [{"survivor", "merged"}].
+
+    With `nodes`, only groups touching those (e.g. newly inserted) nodes are
+    resolved. A caller-owned resolver is not updated here; keep it in sync
+    from the recorded ops.
+    """
+    resolver = resolver or EntityResolver().rebuild(graph)
+    merges = []
+    for group in resolver.duplicates(nodes):
+        group = {n for n in group if graph.has_node(n)}
+        if len(group) < 2:
+            continue
+        survivor = choose_survivor(graph, group)
+        duplicates = sorted(group - {survivor}, key=str)
+        merges.append({"survivor": survivor, "merged": duplicates})
+        if not dry_run:
+            merge_nodes(graph, survivor, duplicates, ops)
+    return merges
+
+# ------------------
+# Commit hygiene
+# ------------------
+# Hygiene removes isolated nodes and nodes with empty meta, then merges
+# duplicates. HygieneEngine applies it to the nodes touched since the last
+# run, so a run costs O(changed region) rather than O(graph).
+
+def is_empty(data):
+    meta = data.get("meta", {})
+    return not meta or all(v in ["", None] for v in meta.values())
+
+def _remove(graph, nodes, ops):
+    for n in nodes:
+        graph.remove_node(n)
+        if ops is not None:
+            ops.append({"op": "remove_node", "id": n})
+
+def new_report(dry_run=False):
+    return {"dry_run": dry_run, "inspected": 0, "isolated": [], "empty": [], "merges": [], "seconds": 0.0}
+
+class HygieneEngine:
+    """Commit hygiene over a dirty set fed by the mutation path."""
+
+    def __init__(self, resolver=None):
+        self.resolver = resolver
+        self.dirty = set()
+
+    def mark(self, nodes):
+        self.dirty.update(nodes)
+
+    def take(self, limit=None):
+        if limit is None or limit >= len(self.dirty):
+            nodes, self.dirty = self.dirty, set()
+            return list(nodes)
+        return [self.dirty.pop() for _ in range(limit)]
+
+    def run(self, graph, nodes=None, ops=None, dry_run=False, limit=None, report=None):
+        """One pass over `nodes`, by default up to `limit` nodes taken from the
+        dirty set (a dry run only peeks at it). Returns the report, extended
+        in place when one is passed in."""
+        t0 = time.perf_counter()
+        report = report or new_report(dry_run)
+        if nodes is None:
+            nodes = list(self.dirty)[:limit] if dry_run else self.take(limit)
+        if not dry_run:
+            self.dirty.difference_update(nodes)
+        nodes = [n for n in nodes if graph.has_node(n)]
+        isolated = [n for n in nodes if graph.degree(n) == 0]
+        empty = [n for n in nodes if graph.degree(n) and is_empty(graph.nodes[n])]
+        removed = set(isolated) | set(empty)
+        keep = [n for n in nodes if n not in removed]
+        if dry_run:
+            merges = []
+            for m in resolve_entities(graph, self.resolver, keep, dry_run=True):
+                merged = [d for d in m["merged"] if d not in removed]
+                if m["survivor"] not in removed and merged:
+                    merges.append({"survivor": m["survivor"], "merged": merged})
         else:
-            seen[label] = node
-    graph.remove_nodes_from(to_remove)
-
-def sort_for_commit(graph):
-    prune_disconnected_nodes(graph)
-    remove_empty_nodes(graph)
-    deduplicate_nodes(graph)
-    return graph
+            # neighbours of dropped nodes may be left isolated: check them next run
+            for n in empty:
+                self.dirty.update(graph.successors(n))
+                self.dirty.update(graph.predecessors(n))
+            _remove(graph, isolated + empty, ops)
+            self.dirty -= removed
+            merges = resolve_entities(graph, self.resolver, keep, ops)
+        report["inspected"] += len(nodes)
+        report["isolated"].extend(isolated)
+        report["empty"].extend(empty)
+        report["merges"].extend(merges)
+        report["seconds"] = round(report["seconds"] + time.perf_counter() - t0, 4)
+        return report
+
+def prune_disconnected_nodes(graph, ops=None):
+    to_remove = [n for n in graph.nodes if graph.degree(n) == 0]
+    _remove(graph, to_remove, ops)
+
+def remove_empty_nodes(graph, ops=None):
+    to_remove = [n for n in graph.nodes if is_empty(graph.nodes[n])]
+    _remove(graph, to_remove, ops)
+
+def deduplicate_nodes(graph, ops=None):
+    return resolve_entities(graph, ops=ops)
+
+def sort_for_commit(graph, ops=None, dry_run=False):
+    """Full hygiene pass over every node; mutations are appended to `ops` as
+    WAL entries when given. Returns the report."""
+    return HygieneEngine().run(graph, list(graph.nodes), ops, dry_run)
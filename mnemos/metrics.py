@@ -0,0 +1,282 @@
+# spellbook/mnemos/metrics.py
+# Performance instrumentation: counters and latency histograms exposed in the
+# Prometheus text format, and an opt-in sampling profiler.
+#
+#   mnemos_request_seconds{route,method,status}   per-route latency
+#   mnemos_stage_seconds{stage}                    search, embed, context, llm, serialize, save, ...
+#   mnemos_llm_tokens_total{model,kind}            prompt / completion tokens
+# plus gauges (graph size, queues, cache hit rates) read at scrape time from
+# collectors registered by main. Values are per process; with several
+# workers each one reports its own.
+#
+# With MNEMOS_PROFILING=1, a request sent with `X-Mnemos-Profile: 1` (or
+# ?profile=1) is sampled while it runs and its stacks are written in the
+# folded format read by flamegraph.pl and speedscope. When profiling is off
+# the cost is one boolean check per request.
+
+import os
+import sys
+import time
+import bisect
+import threading
+from collections import Counter as Tally
+from contextlib import contextmanager
+
+PROFILING = os.getenv("MNEMOS_PROFILING", "0") == "1"
+PROFILE_INTERVAL = float(os.getenv("MNEMOS_PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = "../db/profiles"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ------------------
+# Metrics
+# ------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+def _number(v):
+    return "+Inf" if v == float("inf") else repr(float(v)) if isinstance(v, float) else str(v)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, n=1, **labels):
+        key = tuple(labels.get(l, "") for l in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + n
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, key, v) for key, v in self.values.items()]
+
+class Histogram(Counter):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(l, "") for l in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def samples(self):
+        out = []
+        with self.lock:
+            for key, (counts, total, n) in self.values.items():
+                cumulative = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += c
+                    out.append((self.name + "_bucket", key + (_number(bound),), cumulative))
+                out.append((self.name + "_sum", key, total))
+                out.append((self.name + "_count", key, n))
+        return out
+
+class Registry:
+    """Metrics owned here plus collectors: fn() -> number or [(labels, number)],
+    called on every scrape for values that live elsewhere (sizes, cache stats)."""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        self.metrics.append(Counter(name, help, labelnames))
+        return self.metrics[-1]
+
+    def histogram(self, name, help, labelnames=(), buckets=BUCKETS):
+        self.metrics.append(Histogram(name, help, labelnames, buckets))
+        return self.metrics[-1]
+
+    def collect(self, name, help, fn, kind="gauge"):
+        self.collectors.append((name, help, kind, fn))
+
+    def render(self):
+        lines = []
+        for m in self.metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for sample, key, v in m.samples():
+                names = m.labelnames + ("le",) if sample.endswith("_bucket") else m.labelnames
+                lines.append(f"{sample}{_labels(names, key)} {_number(v)}")
+        for name, help, kind, fn in self.collectors:
+            try:
+                value = fn()
+            except Exception:
+                continue  # a collector must not break the scrape
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, v in (value if isinstance(value, list) else [({}, value)]):
+                lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(v)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+REQUEST_SECONDS = registry.histogram("mnemos_request_seconds", "HTTP request latency by route",
+                                     ("route", "method", "status"))
+STAGE_SECONDS = registry.histogram("mnemos_stage_seconds", "Time spent per pipeline stage", ("stage",))
+LLM_TOKENS = registry.counter("mnemos_llm_tokens_total", "Tokens sent to and received from the LLM",
+                              ("model", "kind"))
+
+def time_stage(name):
+    """Time a block as one observation of mnemos_stage_seconds{stage=name}."""
+    return STAGE_SECONDS.time(stage=name)
+
+def timed_chunks(chunks, name):
+    """Pass a generator through, timing only the work done to produce each item."""
+    it = iter(chunks)
+    spent = 0.0
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                spent += time.perf_counter() - t0
+            yield item
+    finally:
+        STAGE_SECONDS.observe(spent, stage=name)
+
+def count_tokens(model, usage):
+    """Record an OpenAI usage object (or None when the API sent none)."""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, model=model, kind="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens or 0, model=model, kind="completion")
+
+def resident_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+registry.collect("mnemos_process_resident_bytes", "Resident memory of this process", resident_bytes)
+
+# ------------------
+# Profiling
+# ------------------
+IDLE = ("threading.py", "selectors.py", "queue.py", "thread.py")  # thread.py: an idle executor worker
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Sampler:
+    """Samples every thread's stack each `interval` seconds and tallies them
+    as folded stacks (thread;outer;...;inner). Threads parked in a wait are
+    left out, so an idle pool does not drown the flame graph."""
+
+    def __init__(self, interval=PROFILE_INTERVAL, ignore=()):
+        self.interval = interval
+        self.ignore = set(ignore)
+        self.stacks = Tally()
+        self.samples = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mnemos-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if ident in self.ignore or name == "mnemos-profiler" or os.path.basename(frame.f_code.co_filename) in IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(name)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self):
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+def save_profile(name, sampler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, name), "w") as f:
+        f.write(sampler.folded())
+
+def profile_path(name):
+    """Path of a saved profile, or None for names that are not one."""
+    if os.path.basename(name) != name or not name.endswith(".folded"):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.exists(path) else None
+
+def _wants_profile(scope):
+    if b"profile=1" in scope.get("query_string", b"").split(b"&"):
+        return True
+    return any(k == b"x-mnemos-profile" and v == b"1" for k, v in scope.get("headers", ()))
+
+# ------------------
+# Middleware
+# ------------------
+class Instrument:
+    """ASGI middleware: per-route latency (labelled by route template, so
+    /neighbors/{node_id} is one series), and per-request profiles when asked."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [500]
+        sampler = name = None
+        if PROFILING and _wants_profile(scope):
+            slug = scope["path"].strip("/").replace("/", "_") or "root"
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{slug[:60]}-{os.getpid()}-{id(scope) % 10**6}.folded"
+            sampler = Sampler().start()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if name:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"x-mnemos-profile", name.encode())]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, route=getattr(route, "path", "unmatched"),
+                                    method=scope["method"], status=status[0])
+            if sampler:
+                save_profile(name, sampler.stop())
@@ -0,0 +1,194 @@
+# spellbook/mnemos/retrieval.py
+# Hybrid retrieval: BM25 keyword hits, ANN vector hits and graph proximity,
+# fused by reciprocal rank.
+#
+# The keyword and vector hits seed a personalized PageRank over the
+# undirected graph, so nodes linked to several hits (a project using both
+# technologies a question names) rank even when their own text never matches.
+# Propagation is a sparse matrix-vector product over the edge columns per
+# step; the transition weights and fused results are cached per revision.
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+import numpy as np
+from ann_index import top_k
+
+RRF_K = int(os.getenv("MNEMOS_RRF_K", "60"))
+PPR_ALPHA = float(os.getenv("MNEMOS_PPR_ALPHA", "0.5"))
+PPR_ITERATIONS = int(os.getenv("MNEMOS_PPR_ITERATIONS", "20"))
+PPR_SEEDS = int(os.getenv("MNEMOS_PPR_SEEDS", "8"))
+# A node only the graph finds competes with nodes both text channels agree on
+GRAPH_WEIGHT = float(os.getenv("MNEMOS_GRAPH_WEIGHT", "1.5"))
+RETRIEVAL_CACHE = int(os.getenv("MNEMOS_RETRIEVAL_CACHE", "256"))
+CHANNELS = ("bm25", "vector", "graph")
+
+def rrf(rankings, weights=None, k=RRF_K):
+    """{id: fused score} from {channel: [id, ...best first]}: sum of w / (k + rank)."""
+    fused = {}
+    for channel, ids in rankings.items():
+        w = (weights or {}).get(channel, 1.0)
+        for rank, node_id in enumerate(ids, 1):
+            fused[node_id] = fused.get(node_id, 0.0) + w / (k + rank)
+    return fused
+
+class Transition:
+    """Random-walk step over a graph's live edges, both directions, as COO
+    arrays: walking sends r[src] * weight along each entry into dst."""
+
+    def __init__(self, graph):
+        m = graph._n_edges
+        alive = graph._alive[:m]
+        src, dst = graph._src[:m][alive], graph._dst[:m][alive]
+        self.n = len(graph._ids)
+        self.src = np.concatenate([src, dst]).astype(np.int64)
+        self.dst = np.concatenate([dst, src]).astype(np.int64)
+        degree = np.bincount(self.src, minlength=self.n).astype(np.float32)
+        self.weight = 1.0 / degree[self.src]
+        self.dangling = np.flatnonzero(degree == 0)
+
+    def step(self, r):
+        return np.bincount(self.dst, weights=r[self.src] * self.weight, minlength=self.n)
+
+    def ppr(self, seeds, alpha=PPR_ALPHA, iterations=PPR_ITERATIONS, tol=1e-4):
+        """Personalized PageRank for a restart vector `seeds` (sums to 1).
+        Mass stranded on dangling nodes restarts at the seeds. Stops once an
+        iteration moves less than `tol` of the mass; ranks are settled by then."""
+        r = seeds.copy()
+        for _ in range(iterations):
+            nxt = alpha * seeds + (1 - alpha) * (self.step(r) + r[self.dangling].sum() * seeds)
+            done = np.abs(nxt - r).sum() < tol
+            r = nxt
+            if done:
+                break
+        return r
+
+class HybridRetriever:
+    """One retrieval engine over a KeywordIndex, an EmbeddingIndex and the graph.
+
+    `embed_fn(text)` gives the query vector; the vector channel is skipped
+    when it fails or returns None. `lock` guards reads of the graph
+    columns and of the keyword index, which writers update under the write
+    side (the read side of the graph lock in main). The query is embedded
+    outside it; the embedding index locks its own vectors.
+    """
+
+    def __init__(self, keywords, embeddings, embed_fn, lock=None, weights=None,
+                 depth=None, size=RETRIEVAL_CACHE):
+        self.keywords = keywords
+        self.embeddings = embeddings
+        self.embed_fn = embed_fn
+        self.lock = lock or nullcontext()
+        self.weights = weights or {"graph": GRAPH_WEIGHT}
+        self.depth = depth
+        self.size = size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.build_lock = threading.Lock()  # one reader builds a missing keyword index
+        self.transition = None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, graph):
+        return (id(graph), graph.graph.get("revision", 0))
+
+    def _transition(self, graph):
+        key = self._key(graph)
+        cached = self.transition
+        if cached is None or cached[0] != key:
+            with self.lock:
+                cached = self.transition = (key, Transition(graph))
+        return cached[1]
+
+    # ------------------
+    # Channels
+    # ------------------
+    def keyword_hits(self, graph, query, k):
+        with self.lock:
+            if self.keywords._graph is not graph:
+                with self.build_lock:
+                    if self.keywords._graph is not graph:
+                        self.keywords.rebuild(graph)
+            return [n for n, _ in self.keywords.search(query, k)]
+
+    def vector_hits(self, graph, query, k):
+        if self.embeddings is None:
+            return []
+        try:
+            vec = self.embed_fn(query)
+            if vec is None:
+                return []
+            vec = np.asarray(vec, dtype=np.float32)
+            if not vec.any():
+                return []
+            if self.embeddings._graph is not graph:
+                with self.lock:
+                    self.embeddings.sync(graph)
+            return [n for n, _ in self.embeddings.search(vec, k)]
+        except Exception as e:
+            print(f"Vector search error: {e}")
+            return []
+
+    def graph_hits(self, graph, seeds, k):
+        """Nodes other than the seeds ranked by personalized PageRank from the
+        seed ids (weighted): what the hits point at, not the hits again."""
+        if not seeds or not hasattr(graph, "_src"):
+            return []
+        walk = self._transition(graph)
+        restart = np.zeros(walk.n)
+        for node_id, w in seeds.items():
+            slot = graph._index.get(node_id)
+            if slot is not None and slot < walk.n:
+                restart[slot] += w
+        if not restart.any():
+            return []
+        scores = walk.ppr(restart / restart.sum())
+        scores[restart > 0] = 0
+        ids = graph._ids
+        return [ids[s] for s in top_k(scores, k).tolist() if scores[s] > 0 and ids[s] is not None]
+
+    # ------------------
+    # Query
+    # ------------------
+    def search(self, graph, query, k=5, channels=CHANNELS):
+        """[(node_id, fused score, {channel: rank})] best first, at most k."""
+        key = (*self._key(graph), query, k, tuple(channels))
+        with self.cache_lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        depth = self.depth or max(4 * k, 20)
+        rankings = {}
+        if "bm25" in channels:
+            rankings["bm25"] = self.keyword_hits(graph, query, depth)
+        if "vector" in channels:
+            rankings["vector"] = self.vector_hits(graph, query, depth)
+        if "graph" in channels:
+            seeds = sorted(rrf(rankings, self.weights).items(), key=lambda item: -item[1])
+            rankings["graph"] = self.graph_hits(graph, dict(seeds[:PPR_SEEDS]), depth)
+        fused = rrf(rankings, self.weights)
+        ranks = {c: {n: i for i, n in enumerate(ids, 1)} for c, ids in rankings.items()}
+        best = sorted(fused.items(), key=lambda item: -item[1])
+        result = [(n, score, {c: r[n] for c, r in ranks.items() if n in r})
+                  for n, score in best if n in graph][:k]
+
+        with self.cache_lock:
+            self.cache[key] = result
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self.cache_lock:
+            self.cache.clear()
+        self.transition = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self.cache), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
@@ -0,0 +1,231 @@
+# spellbook/mnemos/shared_store.py
+# Concurrency around the graph store: a readers-writer lock for the threads
+# of one process, and a shared write-ahead log for several worker processes.
+#
+# With MNEMOS_SHARED=1 every uvicorn worker keeps its own copy of the graph,
+# loaded from the snapshot (memory-mapped when binary), and follows the log
+# the others append to. Writers serialize on an exclusive flock and catch up
+# with the log before they mutate, so there is one writer at a time and one
+# global, monotonic revision sequence that every worker applies in order.
+# Readers catch up before they start, so a read that begins after a write was
+# acknowledged sees it whichever worker serves it.
+
+import os
+import json
+import fcntl
+import threading
+from itertools import islice
+
+SHARED = os.getenv("MNEMOS_SHARED", "0") == "1"
+FOLLOW_INTERVAL = float(os.getenv("MNEMOS_FOLLOW_INTERVAL", "0.5"))
+
+# ------------------
+# In-process locking
+# ------------------
+class _Side:
+    """Context manager for one side of an RWLock; reusable and reentrant."""
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class RWLock:
+    """Many readers or one writer. Waiting writers block new readers, so a
+    stream of queries cannot starve an import. Both sides are reentrant per
+    thread and a writer may take the read side too; upgrading a read hold to
+    a write raises rather than deadlocking.
+
+    `on_write` / `on_release` run when a thread takes / gives up its outermost
+    write hold, still as the only writer (cross-process locking in shared mode).
+    `exclusive` is the write side without them, for work that must keep
+    readers out but writes nothing of its own (applying other workers' log).
+    """
+
+    def __init__(self, on_write=None, on_release=None):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}   # thread id -> read depth
+        self._writer = None
+        self._depth = 0
+        self._waiting = 0
+        self._hooked = False
+        self.on_write = on_write
+        self.on_release = on_release
+        self.read = _Side(self.acquire_read, self.release_read)
+        self.write = _Side(self.acquire_write, self.release_write)
+        self.exclusive = _Side(lambda: self.acquire_write(hooks=False), self.release_write)
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            self._cond.wait_for(lambda: self._writer is None and not self._waiting)
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+            else:
+                del self._readers[me]
+                self._cond.notify_all()
+
+    def acquire_write(self, hooks=True):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                if hooks and not self._hooked:
+                    raise RuntimeError("Cannot take the write side inside an exclusive hold")
+                self._depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._waiting += 1
+            try:
+                self._cond.wait_for(lambda: self._writer is None and not self._readers)
+            finally:
+                self._waiting -= 1
+            self._writer = me
+            self._depth = 1
+            self._hooked = hooks
+        if hooks and self.on_write:
+            try:
+                self.on_write()
+            except BaseException:
+                self._depth = 1
+                self.release_write()
+                raise
+
+    def release_write(self):
+        if self._depth > 1:
+            self._depth -= 1
+            return
+        try:
+            if self._hooked and self.on_release:
+                self.on_release()
+        finally:
+            with self._cond:
+                self._depth = 0
+                self._writer = None
+                self._cond.notify_all()
+
+def read_locked(chunks, lock, batch=256):
+    """Re-chunk a lazy generator over the graph so each batch of `batch`
+    items is produced under `lock`, with writers free to run in between.
+    Every acquire and release happens within one next() call, so it is safe
+    when a server resumes the generator on different threads."""
+    it = iter(chunks)
+    while True:
+        with lock:
+            items = list(islice(it, batch))
+        if not items:
+            return
+        yield "".join(items)
+
+# ------------------
+# Cross-process
+# ------------------
+class FileLock:
+    """Exclusive advisory flock, shared by every process that opens `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def _open(self):
+        if self.fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def acquire(self):
+        self._open()
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def try_acquire(self):
+        self._open()
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def release(self):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class LogFollower:
+    """Reads the entries appended to a MutationLog, by any process, in order.
+
+    Compaction swaps in a fresh log file (a new inode); the follower finishes
+    the old file through its open handle before moving on, so no entry is
+    skipped. A torn final line is held back until it is complete.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.inode = None
+        self.partial = b""
+
+    def reset(self):
+        """Start over from the beginning of the current log file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.partial = b""
+        try:
+            self.file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        self.inode = os.fstat(self.file.fileno()).st_ino
+
+    def changed(self):
+        """Cheap check (one stat) for anything new to read."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return self.file is None or st.st_ino != self.inode or st.st_size != self.file.tell()
+
+    def _drain(self):
+        data = self.partial + self.file.read()
+        lines = data.split(b"\n")
+        self.partial = lines.pop()
+        entries = []
+        for line in lines:
+            if line:
+                entries.append(json.loads(line))
+        return entries
+
+    def read(self):
+        """Complete entries appended since the last call, oldest first."""
+        if self.file is None:
+            self.reset()
+            if self.file is None:
+                return []
+        try:
+            rotated = os.stat(self.path).st_ino != self.inode
+        except FileNotFoundError:
+            rotated = False
+        entries = self._drain()
+        if rotated:
+            self.reset()
+            if self.file is not None:
+                entries += self._drain()
+        return entries
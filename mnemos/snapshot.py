@@ -0,0 +1,246 @@
+# spellbook/mnemos/snapshot.py
+# Compact, memory-mappable binary graph snapshots.
+#
+# Layout: 8-byte magic, 8-byte header length, JSON header, then 64-byte
+# aligned NumPy sections. Node ids, types and relations share one interned
+# string table; adjacency is stored as CSR in both directions; every node's
+# remaining attributes (meta, label, ...) are a JSON blob addressed by
+# offset. Edges keep their relation only.
+
+import os
+import sys
+import json
+import numpy as np
+import networkx as nx
+from graph_store import CompactGraph
+
+MAGIC = b"MNEMSNP1"
+ALIGN = 64
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+def write_snapshot(graph, path):
+    """Atomically write a NetworkX graph as a binary snapshot."""
+    strings = {}
+
+    def intern(s):
+        if s is None:
+            return -1
+        if s not in strings:
+            strings[s] = len(strings)
+        return strings[s]
+
+    ids = list(graph.nodes)
+    index = {n: i for i, n in enumerate(ids)}
+    node_name = np.array([intern(n) for n in ids], dtype=np.int32)
+    node_type = np.array([intern(graph.nodes[n].get("type")) for n in ids], dtype=np.int32)
+    order = np.array(sorted(range(len(ids)), key=ids.__getitem__), dtype=np.int32)
+
+    # Blobs are laid out as one JSON array so a full load is a single json.loads;
+    # blob i spans meta_offsets[i] up to the separator before meta_offsets[i + 1].
+    blobs = [json.dumps({k: v for k, v in graph.nodes[n].items() if k != "type"}).encode("utf-8")
+             for n in ids]
+    meta_offsets = np.zeros(len(ids) + 1, dtype=np.uint64)
+    meta_offsets[0] = 1
+    meta_offsets[1:] = 1 + np.cumsum([len(b) + 1 for b in blobs], dtype=np.uint64)
+    meta_data = b"[" + b",".join(blobs) + b"]"
+
+    def csr(adjacency):
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        targets, rels = [], []
+        for i, n in enumerate(ids):
+            for other, data in adjacency[n].items():
+                targets.append(index[other])
+                rels.append(intern(data.get("relation")))
+            indptr[i + 1] = len(targets)
+        return indptr, np.array(targets, dtype=np.int32), np.array(rels, dtype=np.int32)
+
+    out_indptr, out_target, out_rel = csr(graph.succ)
+    in_indptr, in_source, in_rel = csr(graph.pred)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    str_offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    str_offsets[1:] = np.cumsum([len(s) for s in encoded], dtype=np.uint64)
+
+    sections = {
+        "str_offsets": str_offsets,
+        "str_data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "node_name": node_name,
+        "node_type": node_type,
+        "node_order": order,
+        "meta_offsets": meta_offsets,
+        "meta_data": np.frombuffer(meta_data, dtype=np.uint8),
+        "out_indptr": out_indptr,
+        "out_target": out_target,
+        "out_rel": out_rel,
+        "in_indptr": in_indptr,
+        "in_source": in_source,
+        "in_rel": in_rel,
+    }
+    header = {"nodes": len(ids), "edges": len(out_target), "strings": len(encoded),
+              "graph": dict(graph.graph), "sections": {}}
+    # Offsets depend on the header size, so size it with placeholder offsets first
+    for name, arr in sections.items():
+        header["sections"][name] = [0, arr.dtype.str, int(arr.size)]
+    header_len = _aligned(16 + len(json.dumps(header)) + 24 * len(sections)) - 16
+    offset = 16 + header_len
+    for name, arr in sections.items():
+        header["sections"][name][0] = offset
+        offset = _aligned(offset + arr.nbytes)
+    raw_header = json.dumps(header).encode("utf-8").ljust(header_len, b" ")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(header_len).tobytes())
+        f.write(raw_header)
+        for name, arr in sections.items():
+            f.seek(header["sections"][name][0])
+            f.write(arr.tobytes())
+        f.truncate(max(offset, f.tell()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return {"message": f"Graph saved to {path}"}
+
+class SnapshotGraph:
+    """Read-only, memory-mapped view of a binary snapshot.
+
+    Nothing is decoded up front: lookups binary-search the sorted id table
+    and node attributes are parsed from their blob on access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self.buf[:8]) != MAGIC:
+            raise ValueError(f"{path} is not a mnemos snapshot")
+        header_len = int(self.buf[8:16].view(np.uint64)[0])
+        header = json.loads(bytes(self.buf[16:16 + header_len]).decode("utf-8"))
+        self.num_nodes = header["nodes"]
+        self.num_edges = header["edges"]
+        self.graph = header.get("graph", {})
+        for name, (offset, dtype, count) in header["sections"].items():
+            dt = np.dtype(dtype)
+            setattr(self, name, self.buf[offset:offset + count * dt.itemsize].view(dt))
+        self._strings = memoryview(self.str_data)
+        self._meta = memoryview(self.meta_data)
+
+    def __len__(self):
+        return self.num_nodes
+
+    def __contains__(self, node_id):
+        return self.index(node_id) is not None
+
+    def number_of_nodes(self):
+        return self.num_nodes
+
+    def number_of_edges(self):
+        return self.num_edges
+
+    def string(self, i):
+        if i < 0:
+            return None
+        return str(self._strings[int(self.str_offsets[i]):int(self.str_offsets[i + 1])], "utf-8")
+
+    def name(self, i):
+        return self.string(int(self.node_name[i]))
+
+    def all_strings(self):
+        raw = bytes(self._strings)
+        offsets = self.str_offsets.tolist()
+        return [raw[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def index(self, node_id):
+        """Position of a node id, or None; O(log n) string comparisons."""
+        lo, hi = 0, self.num_nodes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self.name(int(self.node_order[mid]))
+            if name < node_id:
+                lo = mid + 1
+            elif name > node_id:
+                hi = mid
+            else:
+                return int(self.node_order[mid])
+        return None
+
+    def attrs(self, i):
+        start, end = int(self.meta_offsets[i]), int(self.meta_offsets[i + 1]) - 1
+        data = json.loads(str(self._meta[start:end], "utf-8"))
+        node_type = self.string(int(self.node_type[i]))
+        if node_type is not None:
+            data["type"] = node_type
+        return data
+
+    def node(self, node_id):
+        i = self.index(node_id)
+        return None if i is None else {"id": node_id, **self.attrs(i)}
+
+    def _adjacent(self, node_id, indptr, others, rels):
+        i = self.index(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        start, end = int(indptr[i]), int(indptr[i + 1])
+        return [(self.name(o), self.string(r))
+                for o, r in zip(others[start:end].tolist(), rels[start:end].tolist())]
+
+    def successors(self, node_id):
+        """(target, relation) pairs for a node's outgoing edges."""
+        return self._adjacent(node_id, self.out_indptr, self.out_target, self.out_rel)
+
+    def predecessors(self, node_id):
+        """(source, relation) pairs for a node's incoming edges."""
+        return self._adjacent(node_id, self.in_indptr, self.in_source, self.in_rel)
+
+    def iter_nodes(self):
+        for i in range(self.num_nodes):
+            yield {"id": self.name(i), **self.attrs(i)}
+
+    def iter_edges(self):
+        for i in range(self.num_nodes):
+            source = self.name(i)
+            start, end = int(self.out_indptr[i]), int(self.out_indptr[i + 1])
+            for t, r in zip(self.out_target[start:end].tolist(), self.out_rel[start:end].tolist()):
+                yield {"from": source, "to": self.name(t), "relation": self.string(r)}
+
+    def _columns(self):
+        strings = self.all_strings()
+        names = [strings[s] for s in self.node_name.tolist()]
+        types = [strings[t] if t >= 0 else None for t in self.node_type.tolist()]
+        metas = json.loads(str(self._meta, "utf-8"))
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.out_indptr))
+        relations = [strings[r] if r >= 0 else None for r in self.out_rel.tolist()]
+        return names, types, metas, sources, np.asarray(self.out_target), relations
+
+    def to_compact(self):
+        """Materialize as a CompactGraph straight from the stored columns."""
+        graph = CompactGraph.from_arrays(*self._columns())
+        graph.graph.update(self.graph)
+        return graph
+
+    def to_networkx(self):
+        names, types, metas, sources, targets, relations = self._columns()
+        for data, node_type in zip(metas, types):
+            if node_type is not None:
+                data["type"] = node_type
+        graph = nx.DiGraph(**self.graph)
+        graph.add_nodes_from(zip(names, metas))
+        graph.add_edges_from(
+            (names[s], names[t], {"relation": r} if r is not None else {})
+            for s, t, r in zip(sources.tolist(), targets.tolist(), relations)
+        )
+        return graph
+
+def convert_json(json_path, snapshot_path):
+    """Convert a node-link JSON save file into a binary snapshot."""
+    with open(json_path, "r") as f:
+        graph = nx.node_link_graph(json.load(f))
+    return write_snapshot(graph, snapshot_path)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python snapshot.py <orin_memory.json> <orin_memory.mnem>")
+        sys.exit(1)
+    print(convert_json(sys.argv[1], sys.argv[2]))
@@ -2,21 +2,186 @@
 
 import os
 import json
-import networkx as nx
+from snapshot import write_snapshot, SnapshotGraph
+from graph_store import CompactGraph
 
 SAVE_PATH = "../db/orin_memory.json"
+BINARY_PATH = "../db/orin_memory.mnem"
+WAL_PATH = SAVE_PATH + ".wal"
+COMPACT_EVERY = int(os.getenv("MNEMOS_COMPACT_EVERY", "10000"))
+SNAPSHOT_FORMAT = os.getenv("MNEMOS_SNAPSHOT_FORMAT", "json")
+SNAPSHOT_PATH = BINARY_PATH if SNAPSHOT_FORMAT == "binary" else SAVE_PATH
 
-def save_graph(graph, path=SAVE_PATH):
-    """Save a NetworkX graph to a JSON file."""
-    data = nx.node_link_data(graph)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+def is_binary(path):
+    return path.endswith(".mnem")
+
+def has_snapshot(path):
+    """Whether `path` holds a snapshot; a missing or empty file counts as none."""
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+def revision(graph):
+    """Monotonic revision of a graph, bumped by every logged mutation."""
+    return graph.graph.get("revision", 0)
+
+def node_link_data(graph):
+    """Node-link JSON structure, as nx.node_link_data writes it, for any mnemos graph."""
+    return {
+        "directed": True,
+        "multigraph": False,
+        "graph": dict(graph.graph),
+        "nodes": [{**graph.nodes[n], "id": n} for n in graph.nodes],
+        "links": [{**d, "source": u, "target": v} for u, v, d in graph.edges(data=True)],
+    }
+
+def graph_from_node_link(data):
+    """Build a CompactGraph from node-link JSON (either "links" or "edges" key)."""
+    nodes = data.get("nodes", [])
+    ids = [n.pop("id") for n in nodes]
+    types = [n.pop("type", None) for n in nodes]
+    index = {n: i for i, n in enumerate(ids)}
+    links = data.get("links", data.get("edges", []))
+    graph = CompactGraph.from_arrays(
+        ids, types, nodes,
+        [index[e["source"]] for e in links],
+        [index[e["target"]] for e in links],
+        [e.get("relation") for e in links],
+    )
+    graph.graph.update(data.get("graph") or {})
+    for e in links:
+        extra = {k: v for k, v in e.items() if k not in ("source", "target", "relation")}
+        if extra:
+            graph.edges[e["source"], e["target"]].update(extra)
+    return graph
+
+def save_graph(graph, path=SNAPSHOT_PATH):
+    """Atomically write a full snapshot of a graph (JSON or binary by extension)."""
+    if is_binary(path):
+        return write_snapshot(graph, path)
+    data = node_link_data(graph)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
     return {"message": f"Graph saved to {path}"}
 
-def load_graph(path=SAVE_PATH):
-    """Load a graph from a JSON file."""
-    if not os.path.exists(path):
+def load_graph(path=SNAPSHOT_PATH, wal_path=WAL_PATH):
+    """Load a graph from its snapshot plus any logged mutations since. An
+    empty snapshot file counts as an empty graph; one that does not parse
+    raises rather than being overwritten by the next checkpoint."""
+    if not has_snapshot(path) and has_snapshot(SAVE_PATH):
+        path = SAVE_PATH  # not converted to the binary format yet
+    if not os.path.exists(path) and not os.path.exists(wal_path):
         raise FileNotFoundError(f"No saved graph at {path}")
-    with open(path, "r") as f:
-        data = json.load(f)
-    return nx.node_link_graph(data)
+    graph = CompactGraph()
+    if is_binary(path) and has_snapshot(path):
+        graph = SnapshotGraph(path).to_compact()
+    elif has_snapshot(path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        graph = graph_from_node_link(data)
+    return replay(graph, wal_path)
+
+def replay(graph, wal_path=WAL_PATH):
+    """Apply a log's entries to a graph, reading the file only."""
+    if not os.path.exists(wal_path):
+        return graph
+    with open(wal_path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn final write from a crash
+            apply_mutation(graph, entry)
+            graph.graph["revision"] = entry.get("rev", revision(graph) + 1)
+    return graph
+
+class MutationLog:
+    """Append-only JSON-lines log of graph mutations.
+
+    Every entry is idempotent, so replaying a log over a snapshot that
+    already contains some of its entries is harmless.
+    """
+
+    def __init__(self, path=WAL_PATH):
+        self.path = path
+        self.entries = 0
+        self.compacted = False  # whether this process has seen a snapshot written
+        if os.path.exists(path):
+            with open(path, "r+b") as f:
+                valid = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # drop a torn final write so new entries start clean
+                    valid += len(line)
+                    self.entries += 1
+                f.truncate(valid)
+        self.file = open(path, "a")
+
+    def append(self, op, **fields):
+        """Log one mutation; callers pass rev= so replay restores the revision."""
+        self.file.write(json.dumps({"op": op, **fields}) + "\n")
+        self.file.flush()
+        self.entries += 1
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def truncate(self):
+        # A fresh file swapped in rather than truncated in place, so processes
+        # following the log see a new inode and finish the old one first
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.file.close()
+        self.file = open(self.path, "a")
+        self.entries = 0
+        self.compacted = True
+
+    def reopen(self):
+        """Append to the current log file if another process has rotated it."""
+        if os.fstat(self.file.fileno()).st_ino != os.stat(self.path).st_ino:
+            self.file.close()
+            self.file = open(self.path, "a")
+            self.entries = 0
+            self.compacted = True  # rotated by the process that wrote the snapshot
+
+    def replay(self, graph):
+        return replay(graph, self.path)
+
+def apply_mutation(graph, entry):
+    op = entry["op"]
+    if op == "batch":
+        for sub in entry["ops"]:
+            apply_mutation(graph, sub)
+    elif op == "add_node":
+        graph.add_node(entry["id"], **entry.get("attrs", {}))
+    elif op == "remove_node":
+        if graph.has_node(entry["id"]):
+            graph.remove_node(entry["id"])
+    elif op == "add_edge":
+        graph.add_edge(entry["source"], entry["target"], **entry.get("attrs", {}))
+    elif op == "remove_edge":
+        if graph.has_edge(entry["source"], entry["target"]):
+            graph.remove_edge(entry["source"], entry["target"])
+
+def open_snapshot(log, path=SNAPSHOT_PATH):
+    """Memory-map the binary snapshot if it is current (nothing logged since)."""
+    # the file, not log.entries: other processes may have appended to it
+    if not is_binary(path) or not has_snapshot(path) or os.path.getsize(log.path):
+        return None
+    return SnapshotGraph(path)
+
+def checkpoint(graph, log, path=SNAPSHOT_PATH, compact_every=COMPACT_EVERY):
+    """Make logged mutations durable, compacting into a snapshot when the log is
+    long, on the first checkpoint of the process, or when there is no usable
+    snapshot yet. compact_every=0 always compacts."""
+    log.sync()
+    if log.entries >= compact_every or not log.compacted or not has_snapshot(path):
+        save_graph(graph, path)
+        log.truncate()
+        return {"message": f"Graph saved to {path}", "compacted": True}
+    return {"message": f"Graph changes logged to {log.path}", "compacted": False}
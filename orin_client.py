@@ -1,28 +1,222 @@
 # spellbook/orin/orin_client.py
+# requests and .env are loaded on the first call, not at import, so short
+# CLI runs (orinctl --help, argument errors) start in tens of milliseconds.
 import os
-import requests
-from dotenv import load_dotenv
+import csv
+import json
+import queue
+import threading
 
-load_dotenv()
-BASE = os.getenv("MNEMOS_API", "http://localhost:8000")
+BASE = None
+_session = None
+
+def session():
+    """One pooled keep-alive session for every call, created on first use."""
+    global BASE, _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from dotenv import load_dotenv
+        load_dotenv()
+        BASE = os.getenv("MNEMOS_API", "http://localhost:8000")
+        s = requests.Session()
+        s.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        _session = s
+    return _session
+
+def call(method, path, **kwargs):
+    s = session()
+    return s.request(method, BASE + path, **kwargs)
 
 def remember(label, type_, meta=None):
     meta = meta or {}
     data = {"label": label, "type": type_, "meta": meta}
-    res = requests.post(f"{BASE}/node", json=data)
+    res = call("POST", "/node", json=data)
     return res.json()
 
 def link(source, target, relation):
     data = {"source": source, "target": target, "relation": relation}
-    res = requests.post(f"{BASE}/link", json=data)
+    res = call("POST", "/link", json=data)
     return res.json()
 
 def recall():
-    res = requests.get(f"{BASE}/graph")
+    res = call("GET", "/graph")
     return res.json()
 
 def save():
-    return requests.post(f"{BASE}/save").json()
+    return call("POST", "/save").json()
 
 def load():
-    return requests.get(f"{BASE}/load").json()
+    return call("GET", "/load").json()
+
+# ------------------
+# Bulk upserts
+# ------------------
+def bulk(items, atomic=True, ndjson=False):
+    """POST one batch of node/edge items to /bulk; returns the per-item results.
+
+    A rejected atomic batch (422) returns its results too, with applied=False.
+    """
+    params = {"atomic": str(atomic).lower()}
+    if ndjson:
+        lines = (json.dumps(item) + "\n" for item in items)
+        res = call("POST", "/bulk", params=params, data=lines,
+                   headers={"Content-Type": "application/x-ndjson"})
+    else:
+        res = call("POST", "/bulk", params=params, json=list(items))
+    if res.status_code == 422:
+        return res.json()["detail"]
+    res.raise_for_status()
+    return res.json()
+
+def node_item(label, type_=None, meta=None):
+    item = {"kind": "node", "label": label}
+    if type_ is not None:
+        item["type"] = type_
+    if meta is not None:
+        item["meta"] = meta
+    return item
+
+def link_item(source, target, relation):
+    return {"kind": "edge", "source": source, "target": target, "relation": relation}
+
+def remember_many(nodes, batch_size=None, atomic=True):
+    """Upsert (label, type, meta) tuples in batches; returns one response per batch."""
+    return BulkWriter(batch_size, atomic).extend(node_item(*n) for n in nodes).close()
+
+def link_many(links, batch_size=None, atomic=True):
+    """Upsert (source, target, relation) tuples in batches; returns one response per batch."""
+    return BulkWriter(batch_size, atomic).extend(link_item(*l) for l in links).close()
+
+class BulkWriter:
+    """Buffers remember/link calls and sends them to /bulk batch_size at a time
+    (default MNEMOS_BULK_BATCH, or 5000).
+
+        with BulkWriter() as w:
+            w.remember("Project X", "project")
+            w.link("Conversation 1", "Project X", "contains_entity")
+
+    With pipeline=N a background thread sends the batches, in order, over the
+    keep-alive session while up to N more are filled, so reading the input
+    overlaps with the server applying it. A failed send stops the rest and is
+    raised from the next add, flush or close.
+    """
+
+    def __init__(self, batch_size=None, atomic=True, pipeline=0):
+        session()  # loads .env before the default batch size is read
+        self.batch_size = batch_size or int(os.getenv("MNEMOS_BULK_BATCH", "5000"))
+        self.atomic = atomic
+        self.items = []
+        self.responses = []
+        self.error = None
+        self.queue = None
+        if pipeline:
+            self.queue = queue.Queue(maxsize=pipeline)
+            self.sender = threading.Thread(target=self._send, daemon=True)
+            self.sender.start()
+
+    def _send(self):
+        while True:
+            items = self.queue.get()
+            if items is None:
+                return
+            if self.error is None:
+                try:
+                    self.responses.append(bulk(items, self.atomic))
+                except Exception as e:
+                    self.error = e
+
+    def remember(self, label, type_=None, meta=None):
+        return self.add(node_item(label, type_, meta))
+
+    def link(self, source, target, relation):
+        return self.add(link_item(source, target, relation))
+
+    def add(self, item):
+        self.items.append(item)
+        if len(self.items) >= self.batch_size:
+            self.flush()
+        return self
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+        return self
+
+    def flush(self):
+        if self.error is not None:
+            raise self.error
+        if self.items:
+            items, self.items = self.items, []
+            if self.queue is not None:
+                self.queue.put(items)
+            else:
+                self.responses.append(bulk(items, self.atomic))
+        return self.responses
+
+    def close(self):
+        self.flush()
+        if self.queue is not None:
+            self.queue.put(None)
+            self.sender.join()
+            self.queue = None
+            if self.error is not None:
+                raise self.error
+        return self.responses
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+# ------------------
+# File ingest
+# ------------------
+NODE_COLUMNS = {"kind", "label", "id", "type", "meta"}
+EDGE_COLUMNS = {"kind", "source", "from", "target", "to", "relation"}
+
+def read_items(f, fmt):
+    """/bulk items from an open JSONL or CSV file, one at a time.
+
+    JSONL lines are items as /bulk takes them (a /graph?format=ndjson dump
+    replays as-is). CSV rows with source and target are links; other rows
+    are nodes, with a JSON "meta" column and/or extra columns as meta.
+    """
+    if fmt == "jsonl":
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                if item.get("kind") in ("revision", "page"):
+                    continue  # framing lines of an NDJSON dump
+                yield item
+        return
+    for row in csv.DictReader(f):
+        row = {k: v for k, v in row.items() if k and v not in (None, "")}
+        if (row.get("source") or row.get("from")) and (row.get("target") or row.get("to")):
+            yield link_item(row.get("source", row.get("from")), row.get("target", row.get("to")),
+                            row.get("relation"))
+            continue
+        meta = json.loads(row["meta"]) if "meta" in row else None
+        extra = {k: v for k, v in row.items() if k not in NODE_COLUMNS | EDGE_COLUMNS}
+        if extra:
+            meta = {**(meta or {}), **extra}
+        yield node_item(row.get("label", row.get("id")), row.get("type"), meta)
+
+def ingest(f, fmt, batch_size=None, atomic=True, pipeline=2):
+    """Stream a file's items to /bulk; returns counts by result status and
+    (item number, detail) for each item that failed."""
+    counts = {"created": 0, "updated": 0, "error": 0, "skipped": 0}
+    errors = []
+    with BulkWriter(batch_size, atomic, pipeline) as writer:
+        writer.extend(read_items(f, fmt))
+    offset = 0
+    for response in writer.responses:
+        for result in response["results"]:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            if result["status"] == "error":
+                errors.append((offset + result["index"], result["detail"]))
+        offset += len(response["results"])
+    return counts, errors
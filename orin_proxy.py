@@ -1,48 +1,155 @@
 # spellbook/orin/orin_proxy.py
+# Interactive by default: one GPT round-trip per typed line. With --pipe (or
+# when stdin is not a terminal) lines are read in batches, each batch's
+# intents are extracted by one call and written by one /bulk request, and a
+# JSON result per input line is printed. openai is imported on the first
+# call the cache cannot answer; .env and the cache database are loaded on
+# the first completion, so importing this module touches neither.
 import os
+import sys
 import json
-from dotenv import load_dotenv
-from openai import OpenAI
-from orin_client import remember, link
+import argparse
+from orin_client import remember, link, bulk, node_item, link_item
+from mnemos.llm_cache import LLMCache
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = None
+_cache = None
 MODEL = os.getenv("GPT_MODEL", "gpt-4")
 
-print("🔮 Orin Proxy active. Type a memory, link, or idea. Type 'exit' to quit.")
+def load_env():
+    global MODEL
+    from dotenv import load_dotenv
+    load_dotenv()
+    MODEL = os.getenv("GPT_MODEL", "gpt-4")
 
-while True:
-    try:
-        user_input = input("🗣️ > ").strip()
-        if user_input.lower() in ["exit", "quit"]:
-            print("🧠 Orin session closed.")
-            break
+def cache():
+    """The LLM response cache, opened on first use."""
+    global _cache
+    if _cache is None:
+        load_env()
+        _cache = LLMCache(os.getenv("ORIN_LLM_CACHE", "db/llm_cache.sqlite"))
+    return _cache
+
+def complete(system, content):
+    llm = cache()
+    return llm.complete(ask, MODEL, system, content)
 
-        messages = [
-            {"role": "system", "content": "You are Orin, a memory archivist. When a user gives you input, extract the intent as either 'remember' or 'link'. Respond ONLY with a JSON object like: {'intent': 'remember', 'label': '...', 'type': '...', 'meta': {...}} or {'intent': 'link', 'source': '...', 'target': '...', 'relation': '...'}. Do not add any commentary."},
-            {"role": "user", "content": user_input}
+SYSTEM_PROMPT = "You are Orin, a memory archivist. When a user gives you input, extract the intent as either 'remember' or 'link'. Respond ONLY with a JSON object like: {'intent': 'remember', 'label': '...', 'type': '...', 'meta': {...}} or {'intent': 'link', 'source': '...', 'target': '...', 'relation': '...'}. Do not add any commentary."
+PIPE_PROMPT = "You are Orin, a memory archivist. The user gives you numbered input lines. For each line, extract the intent as either 'remember' or 'link'. Respond ONLY with a JSON array holding one object per line, in order, like: [{\"line\": 1, \"intent\": \"remember\", \"label\": \"...\", \"type\": \"...\", \"meta\": {...}}, {\"line\": 2, \"intent\": \"link\", \"source\": \"...\", \"target\": \"...\", \"relation\": \"...\"}]. Use {\"line\": n, \"intent\": \"none\"} for a line with neither. Do not add any commentary."
+
+def ask(system, content):
+    global client
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    res = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": content}
         ]
+    )
+    return res.choices[0].message.content
 
-        res = client.chat.completions.create(
-            model=MODEL,
-            messages=messages
-        )
-
-        content = res.choices[0].message.content
-        print("🧾 GPT →", content)
-        parsed = json.loads(content.replace("'", '"'))
-
-        if parsed["intent"] == "remember":
-            result = remember(parsed["label"], parsed["type"], parsed.get("meta", {}))
-            print("✅ Memory saved:", result)
-        elif parsed["intent"] == "link":
-            result = link(parsed["source"], parsed["target"], parsed["relation"])
-            print("🔗 Link saved:", result)
-        else:
-            print("⚠️ Unknown intent type.")
+def parse(content):
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return json.loads(content.replace("'", '"'))
+
+# ------------------
+# Pipe mode
+# ------------------
+def extract_batch(lines):
+    """One intent dict per line, from a single (cached) completion."""
+    numbered = "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+    parsed = parse(complete(PIPE_PROMPT, numbered))
+    by_line = {p.get("line"): p for p in parsed if isinstance(p, dict)}
+    return [by_line.get(i, {"intent": "none"}) for i in range(1, len(lines) + 1)]
 
-    except KeyboardInterrupt:
-        print("\n🧠 Orin session closed.")
-        break
+def store_batch(lines):
+    """Extract and write one batch; prints a JSON result per input line."""
+    try:
+        intents = extract_batch(lines)
     except Exception as e:
-        print("❌ Error:", e)
+        for line in lines:
+            print(json.dumps({"input": line, "status": "error", "detail": f"extraction failed: {e}"}))
+        return
+    items, rows = [], []
+    for line, p in zip(lines, intents):
+        row = {"input": line, **p}
+        row.pop("line", None)
+        if p.get("intent") == "remember" and p.get("label"):
+            items.append(node_item(p["label"], p.get("type"), p.get("meta") or {}))
+        elif p.get("intent") == "link" and p.get("source") and p.get("target"):
+            items.append(link_item(p["source"], p["target"], p.get("relation")))
+        else:
+            row["status"] = "skipped"
+        rows.append(row)
+    try:
+        results = iter(bulk(items, atomic=False)["results"] if items else [])
+    except Exception as e:
+        results = iter([{"status": "error", "detail": f"write failed: {e}"}] * len(items))
+    for row in rows:
+        if "status" not in row:
+            result = next(results)
+            row["status"] = result["status"]
+            if "detail" in result:
+                row["detail"] = result["detail"]
+        print(json.dumps(row), flush=True)
+
+def pipe(batch_size):
+    batch = []
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        batch.append(line)
+        if len(batch) == batch_size:
+            store_batch(batch)
+            batch = []
+    if batch:
+        store_batch(batch)
+
+# ------------------
+# Interactive mode
+# ------------------
+def interactive():
+    print("🔮 Orin Proxy active. Type a memory, link, or idea. Type 'exit' to quit.")
+
+    while True:
+        try:
+            user_input = input("🗣️ > ").strip()
+            if user_input.lower() in ["exit", "quit"]:
+                print("🧠 Orin session closed.")
+                break
+
+            content = complete(SYSTEM_PROMPT, user_input)
+            print("🧾 GPT →", content)
+            parsed = parse(content)
+
+            if parsed["intent"] == "remember":
+                result = remember(parsed["label"], parsed["type"], parsed.get("meta", {}))
+                print("✅ Memory saved:", result)
+            elif parsed["intent"] == "link":
+                result = link(parsed["source"], parsed["target"], parsed["relation"])
+                print("🔗 Link saved:", result)
+            else:
+                print("⚠️ Unknown intent type.")
+
+        except (KeyboardInterrupt, EOFError):
+            print("\n🧠 Orin session closed.")
+            break
+        except Exception as e:
+            print("❌ Error:", e)
+
+if __name__ == "__main__":
+    load_env()
+    parser = argparse.ArgumentParser(description="🔮 Orin natural-language memory proxy")
+    parser.add_argument("--pipe", action="store_true", help="Batch lines from stdin (default when stdin is not a terminal)")
+    parser.add_argument("--batch", type=int, default=int(os.getenv("ORIN_PIPE_BATCH", "20")), help="Lines per LLM call in pipe mode")
+    args = parser.parse_args()
+    if args.pipe or not sys.stdin.isatty():
+        pipe(max(1, args.batch))
+    else:
+        interactive()
@@ -1,7 +1,11 @@
 # spellbook/orin/orinctl.py
+# orin_client defers requests and .env to the first call; keep this file's
+# imports as light, since scripts run it thousands of times.
 
+import sys
+import time
 import argparse
-from orin_client import remember, link, recall, save, load
+from orin_client import remember, link, recall, save, load, ingest
 
 parser = argparse.ArgumentParser(description="🧠 Orin Memory CLI")
 subparsers = parser.add_subparsers(dest="command")
@@ -23,6 +27,14 @@ subparsers.add_parser("view", help="View full graph JSON")
 subparsers.add_parser("save", help="Save graph to file")
 subparsers.add_parser("load", help="Load graph from file")
 
+# Batch ingest
+ingest_parser = subparsers.add_parser("ingest", help="Upsert nodes and links from a JSONL or CSV file")
+ingest_parser.add_argument("file", help="JSONL (one /bulk item per line) or CSV file, - for stdin")
+ingest_parser.add_argument("--format", choices=["jsonl", "csv"], help="Default: from the file extension")
+ingest_parser.add_argument("--batch", type=int, help="Items per /bulk request (default MNEMOS_BULK_BATCH)")
+ingest_parser.add_argument("--pipeline", type=int, default=2, help="Batches read ahead while one is sent")
+ingest_parser.add_argument("--no-atomic", action="store_true", help="Apply the valid items of a batch with errors")
+
 args = parser.parse_args()
 
 if args.command == "add-node":
@@ -52,6 +64,26 @@ elif args.command == "save":
 elif args.command == "load":
     print(load())
 
+elif args.command == "ingest":
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "jsonl")
+    started = time.perf_counter()
+    try:
+        with sys.stdin if args.file == "-" else open(args.file, newline="") as f:
+            counts, errors = ingest(f, fmt, args.batch, not args.no_atomic, args.pipeline)
+    except Exception as e:
+        print("❌ Ingest failed:", e)
+        sys.exit(1)
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - started
+    print(f"✅ Ingested {total} items in {elapsed:.2f}s ({total / elapsed:.0f}/s):",
+          ", ".join(f"{n} {status}" for status, n in counts.items() if n))
+    for index, detail in errors[:10]:
+        print(f"⚠️ item {index + 1}: {detail}")
+    if len(errors) > 10:
+        print(f"⚠️ ... and {len(errors) - 10} more errors")
+    if errors:
+        sys.exit(1)
+
 else:
     parser.print_help()
     
\ No newline at end of file
@@ -0,0 +1,34 @@
+# spellbook/tests/conftest.py
+# The mnemos modules import each other as siblings and resolve their files
+# (../db/...) against the working directory, so the suite runs from a scratch
+# work/ dir next to a scratch db/ before anything is imported.
+
+import os
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "mnemos"), ROOT]
+
+SCRATCH = tempfile.mkdtemp(prefix="mnemos-tests-")
+os.makedirs(os.path.join(SCRATCH, "db"))
+os.makedirs(os.path.join(SCRATCH, "work"))
+os.chdir(os.path.join(SCRATCH, "work"))
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("MNEMOS_EMBED_BACKEND", "hashing")
+# background workers are driven by hand in the tests
+os.environ["MNEMOS_HYGIENE_INTERVAL"] = "0"
+os.environ["MNEMOS_EMBED_INTERVAL"] = "0"
+
+@pytest.fixture(scope="session")
+def main():
+    import main
+    return main
+
+@pytest.fixture(scope="session")
+def client(main):
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as c:
+        yield c
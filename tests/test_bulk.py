@@ -0,0 +1,53 @@
+import json
+
+def test_bulk_upserts_in_one_revision(client, main):
+    rev = client.get("/load").json()["revision"]
+    items = [
+        {"kind": "edge", "source": "Bulk A", "target": "Bulk B", "relation": "uses"},  # nodes come later
+        {"kind": "node", "label": "Bulk A", "type": "concept", "meta": {"a": 1}},
+        {"id": "Bulk B", "type": "tool"},
+    ]
+    r = client.post("/bulk", json=items)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["applied"] and body["revision"] == rev + 1 and body["errors"] == 0
+    assert [x["status"] for x in body["results"]] == ["created"] * 3
+    assert main.G.edges["Bulk A", "Bulk B"]["relation"] == "uses"
+
+    # upserting again updates: meta is merged, an omitted type kept, the relation replaced
+    r = client.post("/bulk", json={"nodes": [{"label": "Bulk A", "meta": {"b": 2}}],
+                                   "edges": [{"from": "Bulk A", "to": "Bulk B", "relation": "depends_on"}]})
+    assert [x["status"] for x in r.json()["results"]] == ["updated", "updated"]
+    assert main.G.nodes["Bulk A"]["meta"] == {"a": 1, "b": 2}
+    assert main.G.nodes["Bulk A"]["type"] == "concept"
+    assert main.G.edges["Bulk A", "Bulk B"]["relation"] == "depends_on"
+    assert r.json()["revision"] == rev + 2
+
+def test_bulk_atomic_rejects_the_whole_batch(client, main):
+    rev = client.get("/load").json()["revision"]
+    items = [{"label": "Bulk Ok", "type": "concept"},
+             {"label": "Bulk Untyped"},
+             {"source": "Bulk Ok", "target": "Bulk Nowhere", "relation": "uses"}]
+    r = client.post("/bulk", json=items)
+    assert r.status_code == 422
+    statuses = [x["status"] for x in r.json()["detail"]["results"]]
+    assert statuses == ["skipped", "error", "error"]
+    assert not main.G.has_node("Bulk Ok") and main.revision(main.G) == rev
+
+    # non-atomic applies the valid items and reports the rest
+    r = client.post("/bulk", params={"atomic": "false"}, json=items)
+    assert r.status_code == 200
+    assert [x["status"] for x in r.json()["results"]] == ["created", "error", "error"]
+    assert main.G.has_node("Bulk Ok") and not main.G.has_node("Bulk Untyped")
+
+def test_bulk_accepts_ndjson_and_rejects_bad_bodies(client, main):
+    client.get("/load")
+    lines = [{"kind": "node", "id": "Bulk Line", "type": "concept"},
+             {"kind": "edge", "from": "Bulk Line", "to": "Bulk Line", "relation": "self"}]
+    r = client.post("/bulk", content="\n".join(json.dumps(x) for x in lines) + "\n",
+                    headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 200 and r.json()["errors"] == 0
+    assert main.G.has_edge("Bulk Line", "Bulk Line")
+
+    assert client.post("/bulk", content="{not json").status_code == 400
+    assert client.post("/bulk", json="a string").status_code == 400
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+class Request:
+    """Stands in for a client that disconnects after `reads` events."""
+
+    def __init__(self, reads=1):
+        self.reads = reads
+
+    async def is_disconnected(self):
+        self.reads -= 1
+        return self.reads < 0
+
+def events(main, since, reads=1):
+    async def collect():
+        response = await main.graph_events(Request(reads), since)
+        return [chunk async for chunk in response.body_iterator]
+    out = []
+    for chunk in asyncio.run(collect()):
+        name, data = chunk.strip().split("\n")
+        out.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return out
+
+def test_change_feed_reports_latest_state_per_revision(client, main):
+    rev = client.get("/load").json()["revision"]
+    client.post("/node", json={"label": "Feed A", "type": "concept"})
+    client.post("/node", json={"label": "Feed B", "type": "concept"})
+    client.post("/link", json={"source": "Feed A", "target": "Feed B", "relation": "uses"})
+
+    delta = client.get("/graph/changes", params={"since": rev}).json()
+    assert delta["revision"] == rev + 3 and delta["since"] == rev
+    assert sorted(n["id"] for n in delta["nodes"]) == ["Feed A", "Feed B"]
+    assert delta["edges"] == [{"from": "Feed A", "to": "Feed B", "relation": "uses"}]
+
+    # only what changed after the given revision
+    later = client.get("/graph/changes", params={"since": rev + 2}).json()
+    assert later["nodes"] == [] and len(later["edges"]) == 1
+
+    with main.mutation_lock:
+        main.G.remove_node("Feed B")
+        main.log_mutation("remove_node", id="Feed B")
+    delta = client.get("/graph/changes", params={"since": rev}).json()
+    assert delta["revision"] == rev + 4
+    assert [n["id"] for n in delta["nodes"]] == ["Feed A"]
+    assert delta["removed_nodes"] == ["Feed B"]
+
+    current = client.get("/graph/changes", params={"since": rev + 4}).json()
+    assert current["nodes"] == current["edges"] == current["removed_nodes"] == []
+    ahead = client.get("/graph/changes", params={"since": rev + 5})
+    assert ahead.status_code == 410 and ahead.json()["detail"]["revision"] == rev + 4
+
+def test_events_stream_deltas_then_resync(client, main):
+    rev = client.get("/load").json()["revision"]
+    client.post("/node", json={"label": "Event Node", "type": "concept"})
+
+    [(name, delta)] = events(main, rev)
+    assert name == "changes" and delta["revision"] == rev + 1
+    assert [n["id"] for n in delta["nodes"]] == ["Event Node"]
+
+    # a reload forgets history, so an older revision can only resync
+    current = client.get("/load").json()["revision"]
+    assert events(main, rev) == [("resync", {"revision": current})]
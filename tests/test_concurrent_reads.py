@@ -0,0 +1,72 @@
+import random
+import threading
+import numpy as np
+from graph_store import CompactGraph
+from graph_layout import LayoutService
+from shared_store import RWLock
+
+THREADS = 4
+
+def build(seed=11, nodes=2000, edges=6000):
+    """A graph whose edge index is stale: pending edges, relabels and
+    tombstones, so the first reads have to re-index it."""
+    rng = random.Random(seed)
+    graph = CompactGraph()
+    for i in range(nodes):
+        graph.add_node(f"n{i}", type=rng.choice(["task", "concept", "conversation"]))
+    for _ in range(edges):
+        graph.add_edge(f"n{rng.randrange(nodes)}", f"n{rng.randrange(nodes)}", relation=rng.choice("ab"))
+    graph.bfs_slots("n0", 1)  # index what is there so far, then make it stale again
+    edge_list = list(graph.edges())
+    for u, v in rng.sample(edge_list, 500):
+        graph.remove_edge(u, v)
+    for u, v in rng.sample(edge_list, 200):
+        if graph.has_edge(u, v):
+            graph.edges[u, v]["relation"] = "c"
+    for _ in range(300):
+        graph.add_edge(f"n{rng.randrange(nodes)}", f"n{rng.randrange(nodes)}", relation="c")
+    return graph
+
+def reads(graph, layouts, seeds):
+    out = []
+    for seed in seeds:
+        slots = np.array([graph._index[seed]])
+        out.append((
+            graph.bfs_depths(seed, 3),
+            graph.expand_slots(slots, 2, "both", ["a", "c"]).tolist(),
+            graph.relation_edges(["c"]).tolist(),
+            layouts.view(graph, seed, 2, "radial", 200),
+            sorted(graph.successors(seed)),
+        ))
+    return out
+
+def test_concurrent_readers_match_a_serial_run():
+    seeds = [f"n{i}" for i in random.Random(3).sample(range(2000), 60)]
+    serial = dict(zip(seeds, reads(build(), LayoutService(size=0), seeds)))
+
+    graph, lock = build(), RWLock()
+    layouts = LayoutService(lock=lock.read, size=0)
+    start = threading.Barrier(THREADS)
+    mismatches, errors = [], []
+
+    def reader(order):
+        try:
+            start.wait()
+            with lock.read:
+                for seed, result in zip(order, reads(graph, layouts, order)):
+                    if result != serial[seed]:
+                        mismatches.append(seed)
+        except Exception as e:
+            errors.append(e)
+
+    threads = []
+    for i in range(THREADS):
+        order = seeds[:]
+        random.Random(i).shuffle(order)
+        threads.append(threading.Thread(target=reader, args=(order,)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert not mismatches
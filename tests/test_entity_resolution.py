@@ -0,0 +1,42 @@
+from graph_store import CompactGraph
+from meta_sorter import EntityResolver, canonical_key, resolve_entities
+
+def graph_of(*nodes):
+    graph = CompactGraph()
+    for label, node_type in nodes:
+        graph.add_node(label, type=node_type, meta={"source": "test"})
+    graph.add_node("Conversation", type="conversation")
+    for label, _ in nodes:
+        graph.add_edge("Conversation", label, relation="contains_entity")
+    return graph
+
+def test_same_key_across_types_is_not_merged():
+    graph = graph_of(("Next.js", "technology"), ("Next", "task"))
+    assert resolve_entities(graph) == []
+    assert graph.has_node("Next.js") and graph.has_node("Next")
+
+def test_same_key_and_type_is_merged():
+    graph = graph_of(("React.js", "technology"), ("React", "technology"))
+    assert resolve_entities(graph) == [{"survivor": "React", "merged": ["React.js"]}]
+
+def test_same_label_across_types_is_not_merged():
+    resolver = EntityResolver().rebuild(graph_of(("Python", "technology"), ("python", "concept")))
+    assert resolver.duplicates() == []
+
+def test_js_is_only_dropped_as_a_suffix():
+    assert canonical_key("JS Framework") == "jsframework"
+    assert canonical_key("ReactJS") == canonical_key("React.js") == "react"
+
+def test_symbols_keep_languages_apart():
+    assert len({canonical_key(label) for label in ("C", "C#", "C++")}) == 3
+    graph = graph_of(("C", "technology"), ("C#", "technology"), ("C++", "technology"))
+    assert resolve_entities(graph) == []
+
+def test_fuzzy_match_does_not_absorb_a_longer_name():
+    graph = graph_of(("Kubernetes", "technology"), ("Kubernetes API", "technology"),
+                     ("Xeamvnkag", "concept"), ("Cwr Xeamvnkag", "concept"))
+    assert resolve_entities(graph) == []
+
+def test_fuzzy_match_still_joins_spelling_variants():
+    graph = graph_of(("Postgres", "technology"), ("PostgreSQL", "technology"))
+    assert resolve_entities(graph) == [{"survivor": "Postgres", "merged": ["PostgreSQL"]}]
@@ -0,0 +1,48 @@
+import json
+import pytest
+from export_stream import iter_conversations
+
+CONVOS = [{"id": "c1", "title": "Café ☕ notes", "mapping": {"m": {"message": {"content": {"parts": ["ünïcode 🧠"]}}}}},
+          {"id": "c2", "title": "second", "mapping": {}, "n": 12345},
+          {"id": "c3", "title": "third", "mapping": {}}]
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+def test_any_chunking_decodes_like_json_loads(size):
+    data = json.dumps(CONVOS, ensure_ascii=False, indent=1).encode()  # multi-byte chars split across chunks
+    assert list(iter_conversations(chunked(data, size))) == CONVOS
+    wrapped = json.dumps({"version": [1, {"x": "]"}], "conversations": CONVOS, "after": 1}).encode()
+    assert list(iter_conversations(chunked(wrapped, size))) == CONVOS
+    # numbers may continue into the next chunk
+    assert list(iter_conversations(chunked(b"[12345, 6]", size))) == [12345, 6]
+
+def test_empty_exports():
+    assert list(iter_conversations([b"  [ ]  "])) == []
+    assert list(iter_conversations([b'{"other": [1, 2]}'])) == []
+
+@pytest.mark.parametrize("cut", [0.3, 0.6, 0.95])
+def test_truncated_export_yields_complete_conversations_then_fails(cut):
+    data = json.dumps(CONVOS).encode()
+    truncated = data[:int(len(data) * cut)]
+    seen = []
+    with pytest.raises(ValueError):
+        for convo in iter_conversations(chunked(truncated, 5)):
+            seen.append(convo)
+    assert seen == CONVOS[:len(seen)]
+    assert len(seen) < len(CONVOS)
+
+def test_missing_close_bracket_fails_after_the_last_conversation():
+    data = json.dumps(CONVOS).encode()[:-1]
+    seen = []
+    with pytest.raises(ValueError):
+        for convo in iter_conversations(chunked(data, 5)):
+            seen.append(convo)
+    assert seen == CONVOS
+
+def test_not_an_export_fails_fast():
+    with pytest.raises(ValueError):
+        list(iter_conversations([b'"just a string"']))
+    with pytest.raises(ValueError):
+        list(iter_conversations([b""]))
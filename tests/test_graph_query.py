@@ -0,0 +1,134 @@
+import random
+from attr_index import AttributeIndex, TOP
+from graph_query import run_query, MAX_LIMIT
+from graph_store import CompactGraph
+
+TYPES = ["conversation", "task", "concept", "tool"]
+RELATIONS = ["contains_entity", "uses", "related_to"]
+
+def random_meta(rng):
+    meta = {"date": f"2024-{rng.randint(1, 6):02d}-{rng.randint(1, 28):02d}"}
+    if rng.random() < 0.7:
+        meta["priority"] = rng.choice(["high", "low"])
+    if rng.random() < 0.5:
+        meta["color"] = rng.choice(["red", "blue"])  # not an indexed key
+    return meta
+
+def build(seed=4, nodes=400, edges=1200):
+    """A graph whose attribute index has a settled part, a delta and removed nodes."""
+    rng = random.Random(seed)
+    graph, index = CompactGraph(), AttributeIndex()
+    for i in range(nodes):
+        graph.add_node(f"n{i}", type=rng.choice(TYPES), meta=random_meta(rng))
+    for _ in range(edges):
+        graph.add_edge(f"n{rng.randrange(nodes)}", f"n{rng.randrange(nodes)}", relation=rng.choice(RELATIONS))
+    index.rebuild(graph)
+    for i in rng.sample(range(nodes), 30):
+        graph.remove_node(f"n{i}")
+    for i in range(nodes, nodes + 40):
+        node_id = f"n{i}"
+        graph.add_node(node_id, type=rng.choice(TYPES), meta=random_meta(rng))
+        graph.add_edge(node_id, rng.choice(list(graph)), relation=rng.choice(RELATIONS))
+        index.add(graph, node_id, graph.nodes[node_id])
+    return graph, index
+
+def random_match(rng, ids):
+    match = {}
+    if rng.random() < 0.1:
+        match["ids"] = rng.sample(ids, 20)
+    if rng.random() < 0.6:
+        match["type"] = rng.choice([rng.choice(TYPES), rng.sample(TYPES, 2)])
+    if rng.random() < 0.4:
+        match["meta"] = {"priority": rng.choice(["high", ["high", "low"]])}
+    if rng.random() < 0.2:
+        match.setdefault("meta", {})["color"] = "red"
+    if rng.random() < 0.4:
+        month = rng.randint(1, 6)
+        match["range"] = {"date": {"since": f"2024-{month:02d}", "until": f"2024-{min(6, month + 1):02d}-15"}}
+    return match
+
+def random_query(rng, ids):
+    traverse = []
+    for _ in range(rng.randint(0, 2)):
+        traverse.append({"relation": rng.choice([None, rng.choice(RELATIONS), rng.sample(RELATIONS, 2)]),
+                         "direction": rng.choice(["out", "in", "both"]),
+                         "depth": rng.choice([1, 1, 2, 3]), "match": random_match(rng, ids)})
+    return {"match": random_match(rng, ids), "traverse": traverse, "limit": MAX_LIMIT}
+
+# ------------------
+# Full scan
+# ------------------
+def matches(node_id, data, match):
+    if match.get("ids") is not None and node_id not in match["ids"]:
+        return False
+    types = match.get("type")
+    if types is not None and data.get("type") not in (types if isinstance(types, list) else [types]):
+        return False
+    meta = data.get("meta") or {}
+    for key, value in (match.get("meta") or {}).items():
+        if meta.get(key) not in (value if isinstance(value, list) else [value]):
+            return False
+    for key, bounds in (match.get("range") or {}).items():
+        value, since, until = meta.get(key), bounds.get("since"), bounds.get("until")
+        if value is None or (since is not None and value < since) or (until is not None and value >= until + TOP):
+            return False
+    return True
+
+def walk(graph, start, hop):
+    """Nodes 1..depth hops from `start` along the hop's relations."""
+    relations = hop["relation"]
+    relations = None if relations is None else (relations if isinstance(relations, list) else [relations])
+    ok = lambda u, v: relations is None or graph.edges[u, v]["relation"] in relations
+    reached, frontier = set(), set(start)
+    for _ in range(hop["depth"]):
+        nxt = set()
+        for n in frontier:
+            if hop["direction"] in ("out", "both"):
+                nxt.update(v for v in graph.successors(n) if ok(n, v))
+            if hop["direction"] in ("in", "both"):
+                nxt.update(u for u in graph.predecessors(n) if ok(u, n))
+        reached |= nxt
+        frontier = nxt
+    return reached
+
+def scan(graph, query):
+    found = {n for n in graph if matches(n, graph.nodes[n], query["match"])}
+    for hop in query["traverse"]:
+        found = {n for n in walk(graph, found, hop) if matches(n, graph.nodes[n], hop["match"])}
+    return sorted(found)
+
+def test_planned_queries_match_a_full_scan():
+    graph, index = build()
+    rng = random.Random(9)
+    ids = list(graph)
+    anchors, starts = set(), set()
+    for _ in range(300):
+        query = random_query(rng, ids)
+        result = run_query(graph, index, query)
+        expected = scan(graph, query)
+        assert sorted(n["id"] for n in result["nodes"]) == expected, query
+        assert result["total"] == len(expected)
+        anchors.add(result["plan"]["anchor"])
+        starts.update(step["start"].split(":")[0] for step in result["plan"]["steps"])
+    # the comparison covered plans anchored mid-chain and every kind of start
+    assert {0, 1, 2} <= anchors
+    assert {"scan", "ids", "type", "meta.priority", "meta.date", "relation"} <= starts
+
+def test_graph_query_endpoint(client):
+    client.get("/load")
+    client.post("/bulk", json=[
+        {"label": "GQ Chat", "type": "conversation", "meta": {"date": "2024-03-05"}},
+        {"label": "GQ Old Chat", "type": "conversation", "meta": {"date": "2023-11-01"}},
+        {"label": "GQ Task", "type": "task", "meta": {"priority": "high"}},
+        {"label": "GQ Old Task", "type": "task", "meta": {"priority": "high"}},
+        {"source": "GQ Chat", "target": "GQ Task", "relation": "contains_entity"},
+        {"source": "GQ Old Chat", "target": "GQ Old Task", "relation": "contains_entity"},
+    ])
+    query = {"match": {"type": "conversation", "range": {"date": {"since": "2024-03", "until": "2024-03"}}},
+             "traverse": [{"relation": "contains_entity", "match": {"type": "task", "meta": {"priority": "high"}}}]}
+    r = client.post("/api/graph-query", json=query)
+    assert r.status_code == 200
+    assert [n["id"] for n in r.json()["nodes"]] == ["GQ Task"]
+
+    bad = {**query, "traverse": [{**query["traverse"][0], "depth": 9}]}
+    assert client.post("/api/graph-query", json=bad).status_code == 400
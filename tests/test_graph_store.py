@@ -0,0 +1,34 @@
+import random
+import networkx as nx
+from graph_store import CompactGraph
+
+def neighbours(graph, node):
+    return (sorted(graph.successors(node)), sorted(graph.predecessors(node)),
+            graph.out_degree(node), graph.in_degree(node))
+
+def test_neighbours_match_networkx_through_churn():
+    """Per-hop reads see pending edges, skip tombstones, and agree again once
+    a traversal has re-indexed."""
+    rng = random.Random(5)
+    compact, reference = CompactGraph(), nx.DiGraph()
+    nodes = [f"n{i}" for i in range(300)]
+    for n in nodes:
+        compact.add_node(n)
+        reference.add_node(n)
+
+    def check():
+        for n in rng.sample(nodes, 60):
+            assert neighbours(compact, n) == neighbours(reference, n)
+
+    for step in range(6):
+        for _ in range(400):
+            u, v = rng.choice(nodes), rng.choice(nodes)
+            compact.add_edge(u, v, relation="r")
+            reference.add_edge(u, v, relation="r")
+        check()  # new edges still pending
+        for u, v in rng.sample(list(reference.edges), 150):
+            compact.remove_edge(u, v)
+            reference.remove_edge(u, v)
+        check()  # tombstones in the index
+        compact.bfs_slots(nodes[step], 1)
+        check()  # re-indexed, pending lists skipped
@@ -0,0 +1,19 @@
+def test_new_unlinked_node_survives_a_hygiene_tick(client, main):
+    assert client.get("/load").status_code == 200
+    assert client.post("/node", json={"label": "Fresh thought", "type": "idea"}).status_code == 200
+    assert "Fresh thought" in main.hygiene.dirty
+
+    main.hygiene_tick()
+
+    assert main.G.has_node("Fresh thought")
+    assert "Fresh thought" in main.hygiene_state["last"]["isolated"]
+    assert "Fresh thought" in main.hygiene.dirty  # still up for the next verify-then-save
+
+def test_verify_then_save_applies_hygiene(client, main):
+    assert client.get("/load").status_code == 200
+    assert client.post("/node", json={"label": "Stray note", "type": "idea"}).status_code == 200
+
+    response = client.post("/verify-then-save")
+    assert response.status_code == 200
+    assert "Stray note" in response.json()["hygiene"]["isolated"]
+    assert not main.G.has_node("Stray note")
@@ -0,0 +1,23 @@
+import asyncio
+import json
+
+def conversation(title, text):
+    return {"title": title, "mapping": {"m1": {"id": "m1", "message": {
+        "author": {"role": "user"}, "create_time": 1700000000, "content": {"parts": [text]}}}}}
+
+def test_malformed_extraction_is_not_cached(client, main):
+    assert client.get("/load").status_code == 200
+    convos = [conversation("Cache probe", "a message about the cache probe topic")]
+    answers = iter(["not json at all", json.dumps([{"label": "Cache Probe Topic", "type": "concept"}])])
+    calls = []
+
+    def llm(system, text):
+        calls.append(text)
+        return next(answers)
+
+    status = asyncio.run(main.process_conversations(convos, llm=llm))
+    assert status.errors == 1 and not main.G.has_node("Cache Probe Topic")
+
+    status = asyncio.run(main.process_conversations(convos, llm=llm))
+    assert len(calls) == 2  # asked again rather than replaying the bad answer
+    assert status.errors == 0 and main.G.has_node("Cache Probe Topic")
@@ -0,0 +1,54 @@
+import sys
+import threading
+
+WORDS = ["python", "graph", "memory", "search", "index", "query", "vector", "react", "ledger", "orin"]
+
+def test_queries_during_mutations(client, main):
+    assert client.get("/load").status_code == 200
+    main.retriever.clear()
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        try:
+            previous = None
+            for i in range(1500):
+                words = " ".join(WORDS[(i + j) % len(WORDS)] for j in range(3))
+                label = f"Churn {i} {words}"
+                main.create_node(main.NodeCreate(label=label, type="concept", meta={"note": words}))
+                if previous is not None:
+                    main.create_link(main.LinkCreate(source=previous, target=label, relation="related"))
+                if i % 5 == 4:
+                    with main.mutation_lock:
+                        main.G.remove_node(previous)
+                        main.log_mutation("remove_node", id=previous)
+                    label = None
+                previous = label
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stop.set()
+
+    def read():
+        try:
+            i = 0
+            while not stop.is_set():
+                main.retriever.clear()
+                main.semantic_search(f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]}", main.G, 5)
+                i += 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # switch threads often enough to interleave inside a search
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    hits = main.semantic_search("python graph memory", main.G, 5)
+    assert hits and all(main.G.has_node(h["id"]) for h in hits)
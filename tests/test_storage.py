@@ -0,0 +1,60 @@
+import os
+import pytest
+from storage import MutationLog, SAVE_PATH, checkpoint, load_graph
+from graph_store import CompactGraph
+
+def test_save_then_load_from_empty_snapshot(client, main):
+    open(SAVE_PATH, "w").close()
+    assert client.get("/load").status_code == 200
+    assert client.post("/node", json={"label": "Empty start", "type": "test"}).status_code == 200
+
+    saved = client.post("/save")
+    assert saved.status_code == 200
+    assert saved.json()["compacted"]
+    assert os.path.getsize(SAVE_PATH) > 0
+
+    assert client.get("/load").status_code == 200
+    assert main.G.has_node("Empty start")
+
+def test_load_replays_log_over_empty_snapshot(tmp_path):
+    path, wal_path = str(tmp_path / "g.json"), str(tmp_path / "g.json.wal")
+    open(path, "w").close()
+    log = MutationLog(wal_path)
+    log.append("add_node", id="a", attrs={"type": "test"}, rev=1)
+    log.sync()
+
+    graph = load_graph(path, wal_path)
+    assert graph.has_node("a") and graph.graph["revision"] == 1
+
+def test_unreadable_snapshot_raises_and_is_kept(tmp_path):
+    path, wal_path = str(tmp_path / "g.json"), str(tmp_path / "g.json.wal")
+    with open(path, "w") as f:
+        f.write("{not json")
+    MutationLog(wal_path).append("add_node", id="a", attrs={"type": "test"}, rev=1)
+
+    with pytest.raises(ValueError):
+        load_graph(path, wal_path)
+    with open(path) as f:
+        assert f.read() == "{not json"
+
+def test_first_checkpoint_compacts(tmp_path):
+    path, wal_path = str(tmp_path / "g.json"), str(tmp_path / "g.json.wal")
+    open(path, "w").close()
+    graph = CompactGraph()
+    graph.add_node("a", type="test")
+    log = MutationLog(wal_path)
+    log.append("add_node", id="a", attrs={"type": "test"}, rev=1)
+
+    assert checkpoint(graph, log, path)["compacted"]
+    assert not checkpoint(graph, log, path)["compacted"]
+    assert load_graph(path, wal_path).has_node("a")
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_load_leaves_no_log_handle_open(tmp_path):
+    path, wal_path = str(tmp_path / "g.json"), str(tmp_path / "g.json.wal")
+    open(path, "w").close()
+    MutationLog(wal_path).append("add_node", id="a", attrs={"type": "test"}, rev=1)
+    before = len(os.listdir("/proc/self/fd"))
+    for _ in range(20):
+        load_graph(path, wal_path)
+    assert len(os.listdir("/proc/self/fd")) == before